@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from backend.config import ACCESS_TOKEN_EXPIRE_MINUTES
-from ..models.auth import Token, TokenData, LoginData
+from ..models.auth import Token, TokenData, LoginData, SessionWindow
 from ..models.team import Team
 
 from ..services.auth import AuthService
@@ -86,6 +86,18 @@ async def get_current_team(
     return token_data
 
 
+@api.get("/window", response_model=SessionWindow, tags=["Time"])
+def get_session_window(
+    team: Team = Depends(authed_team),
+    auth_service: AuthService = Depends(),
+) -> SessionWindow:
+    """
+    Returns the logged in team's testing window along with the server's time and the seconds left,
+    so clients can count down without comparing against their own clock.
+    """
+    return auth_service.get_team_window(team)
+
+
 @api.get("/now", tags=["Time"])
 async def get_server_time(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
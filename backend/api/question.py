@@ -1,12 +1,12 @@
 """This API Route handles serving the questions and documentation"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from ..models import QuestionsPublic, Team
 from ..services.questions import QuestionService
 from .auth import active_test
-import sys
+from .scores import etag_matches
 
-__authors__ = ["Nicholas Almy"]
+__authors__ = ["Nicholas Almy", "Andrew Lockard"]
 
 openapi_tags = {
     "name": "Questions",
@@ -18,8 +18,60 @@ api = APIRouter(prefix="/api/questions")
 
 @api.get("", response_model=QuestionsPublic, tags=["Questions"])
 def get_questions(
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
     team: Team = Depends(active_test),
     question_svc: QuestionService = Depends(),
 ):
-    """Get all the questions for the competition"""
-    return question_svc.get_questions()
+    """Get all the questions for the competition
+
+    The response is serialized and compressed once for every team, and is answered with
+    304 Not Modified when the client already holds the current version."""
+    bundle = question_svc.get_bundle()
+    headers = {
+        "ETag": bundle.etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if if_none_match is not None and etag_matches(if_none_match, bundle.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = preferred_encoding(accept_encoding, bundle.encodings)
+    if encoding is None:
+        return Response(
+            content=bundle.body, media_type="application/json", headers=headers
+        )
+    # GZipMiddleware leaves responses that already have a Content-Encoding alone
+    headers["Content-Encoding"] = encoding
+    return Response(
+        content=bundle.encodings[encoding],
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def preferred_encoding(accept_encoding: str | None, available) -> str | None:
+    """Picks the best encoding the client accepts out of the available ones
+
+    Brotli is preferred over gzip. Encodings the client gives a quality of 0 are refused.
+    Returns None when the body should be sent uncompressed.
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
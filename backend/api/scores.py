@@ -1,69 +1,58 @@
-import sys
-import logging
-from fastapi import APIRouter, HTTPException, Response
-import csv
-import subprocess
-from pathlib import Path
+"""This API Route handles grading submissions and serving the scoreboard"""
 
-api = APIRouter(prefix="/api/score", tags=["Score"])
-
-# Configure logging
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+from fastapi import APIRouter, Depends, Header, Response
 
-CSV_PATH = Path("/workspaces/SOTestingEnv/es_files/teams/final_scores.csv")
+from ..models import GradingJob
+from ..services.scores import ScoreService
+from ..services.grading_jobs import GradingJobService
 
+__authors__ = ["Andrew Lockard"]
 
-def refresh_scores():
-    """Run grading script to update scores"""
-    try:
-        result = subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "backend.script.grade_submissions",
-            ],
-            check=True,
-            cwd="/workspaces/SOTestingEnv",
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+api = APIRouter(prefix="/api/score", tags=["Score"])
 
-        logger.info("Grading script output:\n%s", result.stdout)
 
-        if result.stderr:
-            logger.error("Script errors:\n%s", result.stderr)
+@api.post("/refresh", response_model=GradingJob, status_code=202)
+async def refresh_scores(job_svc: GradingJobService = Depends()) -> GradingJob:
+    """Start regrading any submissions that changed since they were last graded.
 
-    except subprocess.CalledProcessError as e:
-        logger.error(
-            "Script failed with code %d:\n%s\n%s", e.returncode, e.stdout, e.stderr
-        )
-        raise HTTPException(
-            status_code=500, detail=f"Grading script failed: {e.stderr}"
-        )
+    Returns the already pending job if a regrade is queued or running."""
+    return job_svc.enqueue_refresh()
 
 
-@api.get("/download", response_class=Response)
-def download_scores():
-    """Generate and return updated CSV file"""
-    refresh_scores()
+@api.get("/jobs/{job_id}", response_model=GradingJob)
+def get_job(job_id: int, job_svc: GradingJobService = Depends()) -> GradingJob:
+    """Get the status and progress of a grading job"""
+    return job_svc.get_job(job_id)
 
-    with open(CSV_PATH, "r") as file:
-        csv_data = file.read()
 
+@api.get("/download", response_class=Response)
+def download_scores(score_svc: ScoreService = Depends()):
+    """Return the last graded scores as a CSV file"""
     return Response(
-        content=csv_data,
+        content=score_svc.get_total_table().write_csv(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=scores.csv"},
     )
 
 
 @api.get("")
-def get_scores():
-    """Return scores for frontend display"""
-    refresh_scores()
-
-    with open(CSV_PATH, "r") as file:
-        reader = csv.DictReader(file)
-        return list(reader)
+def get_scores(
+    if_none_match: str | None = Header(default=None),
+    score_svc: ScoreService = Depends(),
+):
+    """Return the scoreboard ordered by rank for frontend display.
+
+    Responds 304 Not Modified when the client already holds the current version."""
+    etag, body = score_svc.get_scoreboard()
+    # Clients have to revalidate every time, which is cheap as long as nothing was regraded
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Checks an If-None-Match header against an ETag, ignoring weak validator prefixes"""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
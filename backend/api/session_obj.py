@@ -49,6 +49,21 @@ def add_teams_to_session(
     return session_svc.add_teams_to_session(session_id, team_ids)
 
 
+@api.post(
+    "/{session_id}/teams/move/{target_session_id}",
+    response_model=list[SessionPublic],
+    tags=["Sessions"],
+)
+def move_teams(
+    session_id: int,
+    target_session_id: int,
+    team_ids: List[int],
+    session_svc: Session_ObjService = Depends(),
+) -> list[SessionPublic]:
+    """Move teams from one session to another, either all of them move or none do"""
+    return session_svc.move_teams(session_id, target_session_id, team_ids)
+
+
 @api.put("/{session_id}", response_model=SessionPublic, tags=["Sessions"])
 def update_session(
     session_id: int,
@@ -1,8 +1,9 @@
 """This API Route handles question submission and scoring"""
 
-from typing import Dict, List
+from typing import Dict, List, Literal
 from fastapi import APIRouter, Depends, HTTPException
-from ..models import Team, Submission, ConsoleLog
+from fastapi.responses import StreamingResponse
+from ..models import Team, Submission, ConsoleLog, SubmissionRecord
 from ..services.submissions import SubmissionService
 from .auth import active_test
 import sys
@@ -18,37 +19,74 @@ api = APIRouter(prefix="/api/submissions")
 
 
 @api.get("/all", response_model=Dict[str, Dict[int, str]], tags=["Submissions"])
-def get_all_submissions():
-    """Get all teams' submissions across all problems."""
-    return SubmissionService.get_all_submissions()
+def get_all_submissions(submission_svc: SubmissionService = Depends()):
+    """Get all teams' latest submissions across all problems."""
+    return submission_svc.get_all_submissions()
+
+
+@api.get("/export", response_class=StreamingResponse, tags=["Submissions"])
+def export_submissions(
+    format: Literal["zip", "ndjson"] = "zip",
+    submission_svc: SubmissionService = Depends(),
+):
+    """Stream all teams' latest submissions as a zip (`q{n}/{team}.py`) or as NDJSON."""
+    if format == "ndjson":
+        return StreamingResponse(
+            submission_svc.stream_ndjson(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=submissions.ndjson"},
+        )
+    return StreamingResponse(
+        submission_svc.stream_zip(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": "attachment; filename=submissions.zip",
+            # The zip is already compressed, this keeps GZipMiddleware from compressing it again
+            "Content-Encoding": "identity",
+        },
+    )
 
 
 @api.get("/team/{team_name}", response_model=Dict[int, str], tags=["Submissions"])
-def get_team_submissions(team_name: str):
-    """Get a specific team's submissions across all problems."""
+def get_team_submissions(team_name: str, submission_svc: SubmissionService = Depends()):
+    """Get a specific team's latest submissions across all problems."""
     try:
-        return SubmissionService.get_team_submissions(team_name)
+        return submission_svc.get_team_submissions(team_name)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @api.get("/team/{team_name}/problem/{p_num}", response_model=str, tags=["Submissions"])
-def get_specific_submission(team_name: str, p_num: int):
-    """Get a specific team's submission for a specific problem."""
+def get_specific_submission(
+    team_name: str, p_num: int, submission_svc: SubmissionService = Depends()
+):
+    """Get a specific team's latest submission for a specific problem."""
     try:
-        return SubmissionService.get_specific_submission(team_name, p_num)
+        return submission_svc.get_specific_submission(team_name, p_num)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@api.get(
+    "/team/{team_name}/problem/{p_num}/history",
+    response_model=List[SubmissionRecord],
+    tags=["Submissions"],
+)
+def get_submission_history(
+    team_name: str, p_num: int, submission_svc: SubmissionService = Depends()
+):
+    """Get every submission a team made for a specific problem, oldest first."""
+    return submission_svc.get_submission_history(team_name, p_num)
+
+
 @api.post("/submit", response_model=ConsoleLog, tags=["Submissions"])
-def submit_and_run(
+async def submit_and_run(
     submission: Submission,
     team: Team = Depends(active_test),
     submission_svc: SubmissionService = Depends(),
 ) -> ConsoleLog:
     """Store and sample grade a submission."""
-    return submission_svc.submit_and_run(team, submission)
+    return await submission_svc.submit_and_run(team, submission)
 
 
 @api.delete("", tags=["Submissions"])
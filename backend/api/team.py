@@ -1,13 +1,17 @@
 """API Routes associated with Teams and TeamMember data objects"""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from backend.services.exceptions import ResourceNotAllowedException
 from ..models.team import TeamPublic, Team, TeamData
 from ..services.team import TeamService
 from ..services.submissions import SubmissionService
-from ..models.team_members import TeamMemberCreate, TeamMemberPublic
+from ..models.team_members import (
+    TeamMemberCreate,
+    TeamMemberPublic,
+    TeamWithMembers,
+)
 from .auth import authed_team
 
 __authors__ = ["Andrew Lockard", "Mustafa Aljumayli", "Tsering Lama"]
@@ -29,6 +33,23 @@ def get_all_teams(team_svc: TeamService = Depends()):
     return team_svc.get_all_teams()
 
 
+@api.get("/details", response_model=list[TeamWithMembers], tags=["Teams"])
+def get_teams_with_members(
+    session_id: Optional[int] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    team_svc: TeamService = Depends(),
+):
+    """Gets teams with their members and session, optionally one page or session at a time
+
+    Args:
+        session_id (Optional[int]): Only list the teams assigned to this session
+        offset (int): Number of teams to skip
+        limit (Optional[int]): Maximum number of teams to list
+    """
+    return team_svc.get_teams_with_members(session_id, offset, limit)
+
+
 @api.get("/members", response_model=list[TeamMemberPublic], tags=["Teams"])
 def get_team_members(
     team_id: int = None,
@@ -64,10 +85,6 @@ def get_team_members_by_id(
         list[TeamMemberPublic]: A list of team members for the specified team.
     """
     team = team_svc.get_team(team_id)
-
-    print(f"Team found: {team}")
-    print(f"Members: {team.members}")
-
     return team.members
 
 
@@ -112,14 +129,18 @@ def create_batch_teams(
 
 
 @api.delete("/{team_id}", tags=["Teams"])
-def delete_team(team_id: int, team_svc: TeamService = Depends()):
+def delete_team(
+    team_id: int,
+    team_svc: TeamService = Depends(),
+    submission_svc: SubmissionService = Depends(),
+):
     """Delete a specific team"""
     team_name = team_svc.get_team_name_by_id(team_id)
 
     if not team_name:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    success_delete_submissions = SubmissionService.delete_submissions(team_name)
+    success_delete_submissions = submission_svc.delete_submissions(team_name)
     if not success_delete_submissions:
         raise HTTPException(
             status_code=500, detail=f"Failed to delete submissions for team {team_name}"
@@ -135,13 +156,16 @@ def delete_team(team_id: int, team_svc: TeamService = Depends()):
 
 
 @api.delete("", tags=["Teams"])
-def delete_all_teams(team_svc: TeamService = Depends()):
+def delete_all_teams(
+    team_svc: TeamService = Depends(),
+    submission_svc: SubmissionService = Depends(),
+):
     """Delete all teams"""
     teams = team_svc.get_all_teams()
 
     for team in teams:
         team_name = team.name
-        success_delete_submissions = SubmissionService.delete_submissions(team_name)
+        success_delete_submissions = submission_svc.delete_submissions(team_name)
         if not success_delete_submissions:
             raise HTTPException(
                 status_code=500,
@@ -72,6 +72,25 @@ class hide_errors(object):
         return func
 
 
+class timeout(object):
+    """Simple decorator to add a __timeout__ property to a function or class
+
+    Usage: @timeout(2.5)
+
+    If the test runs for longer than this many seconds it fails with a score
+    of 0 and the remaining tests still run. Overrides the suite's timeout.
+    On a TestCase class it sets the timeout of every test in the class that
+    does not set its own.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, func):
+        func.__timeout__ = self.seconds
+        return func
+
+
 class tags(object):
     """Simple decorator to add a __tags__ property to a function
 
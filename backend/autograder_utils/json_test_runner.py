@@ -8,10 +8,26 @@ from __future__ import print_function
 import sys
 import time
 import json
+import signal
+import threading
 
+from functools import wraps
 from unittest import result
 from unittest.signals import registerResult
 
+try:
+    import resource
+except ImportError:  # Not available on Windows, peak memory is not reported there
+    resource = None
+
+
+class TestTimeoutError(BaseException):
+    """Raised inside a test that runs for longer than its timeout.
+
+    Derives from BaseException so that a submission catching Exception
+    cannot swallow it.
+    """
+
 
 class JSONTestResult(result.TestResult):
     """A test result class that can print formatted text results to a stream.
@@ -19,12 +35,14 @@ class JSONTestResult(result.TestResult):
     Used by JSONTestRunner.
     """
     def __init__(self, stream, descriptions, verbosity, results, leaderboard,
-                 failure_prefix):
+                 failure_prefix, timeout=None):
         super(JSONTestResult, self).__init__(stream, descriptions, verbosity)
         self.descriptions = descriptions
         self.results = results
         self.leaderboard = leaderboard
         self.failure_prefix = failure_prefix
+        self.timeout = timeout
+        self.started = None  # (test, wall clock, CPU time) when the test started
 
     def getDescription(self, test):
         doc_first_line = test.shortDescription()
@@ -48,6 +66,14 @@ class JSONTestResult(result.TestResult):
     def getVisibility(self, test):
         return getattr(getattr(test, test._testMethodName), '__visibility__', None)
 
+    def getTimeout(self, test):
+        # A @timeout on the test wins over one on its class, which wins over the runner's
+        for source in (getattr(test, test._testMethodName), type(test)):
+            timeout = getattr(source, '__timeout__', None)
+            if timeout is not None:
+                return timeout
+        return self.timeout
+
     def getHideErrors(self, test):
         return getattr(getattr(test, test._testMethodName), '__hide_errors__', None)
 
@@ -57,8 +83,79 @@ class JSONTestResult(result.TestResult):
         value = getattr(getattr(test, test._testMethodName), '__leaderboard_value__', None)
         return (column_name, sort_order, value)
 
+    def getUsage(self):
+        """Returns the process's (wall clock, CPU time) in seconds"""
+        if resource is None:
+            return time.perf_counter(), time.process_time()
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return time.perf_counter(), usage.ru_utime + usage.ru_stime
+
+    def getPeakRss(self):
+        """Returns the peak resident set size of the process so far in KB"""
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+    def getTestUsage(self, test):
+        """Returns the wall time, CPU time and peak RSS of a test since it started
+
+        The peak RSS is the process's high water mark, so a test only raises it
+        above earlier tests if it used more memory than they did.
+        """
+        if self.started is None or self.started[0] is not test:
+            return {}  # Class and module fixture errors are reported without starting a test
+        wall, cpu = self.getUsage()
+        usage = {
+            "wall_time": round(wall - self.started[1], 6),
+            "cpu_time": round(cpu - self.started[2], 6),
+        }
+        peak_rss = self.getPeakRss()
+        if peak_rss is not None:
+            usage["peak_rss_kb"] = peak_rss
+        return usage
+
     def startTest(self, test):
         super(JSONTestResult, self).startTest(test)
+        wall, cpu = self.getUsage()
+        self.started = (test, wall, cpu)
+        timeout = self.getTimeout(test)
+        # Alarms are only delivered to the main thread, and not at all on Windows
+        if (timeout and hasattr(signal, 'setitimer')
+                and threading.current_thread() is threading.main_thread()):
+            self.limitTime(test, timeout)
+
+    def limitTime(self, test, timeout):
+        """Makes the test method raise TestTimeoutError after `timeout` seconds
+
+        Only the test method is timed, not setUp or tearDown. The method is
+        replaced on the instance for this run only, so the decorators' values
+        (like the score set by partial_credit) are still read from the original.
+        """
+        method = getattr(test, test._testMethodName)
+
+        def expire(signum, frame):
+            raise TestTimeoutError(
+                "Test timed out after {0} seconds".format(timeout))
+
+        @wraps(method)
+        def limited(*args, **kwargs):
+            previous = signal.signal(signal.SIGALRM, expire)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+                test.__dict__.pop(test._testMethodName, None)
+
+        setattr(test, test._testMethodName, limited)
+
+    def stopTest(self, test):
+        # Skipped tests never call their method, so it is not restored by it
+        test.__dict__.pop(test._testMethodName, None)
+        super(JSONTestResult, self).stopTest(test)
 
     def getOutput(self):
         if self.buffer:
@@ -71,13 +168,16 @@ class JSONTestResult(result.TestResult):
             return out
 
     def buildResult(self, test, err=None):
+        usage = self.getTestUsage(test)
         failed = err is not None
+        timed_out = failed and issubclass(err[0], TestTimeoutError)
         weight = self.getWeight(test)
         tags = self.getTags(test)
         number = self.getNumber(test)
         visibility = self.getVisibility(test)
         hide_errors_message = self.getHideErrors(test)
-        score = self.getScore(test)
+        # A test that timed out gets nothing, even if it set a partial score
+        score = 0.0 if timed_out else self.getScore(test)
         output = self.getOutput() or ""
         if err:
             if hide_errors_message:
@@ -113,6 +213,7 @@ class JSONTestResult(result.TestResult):
             result["visibility"] = visibility
         if number:
             result["number"] = number
+        result.update(usage)
         return result
 
     def buildLeaderboardEntry(self, test):
@@ -153,7 +254,7 @@ class JSONTestRunner(object):
     def __init__(self, stream=sys.stdout, descriptions=True, verbosity=1,
                  failfast=False, buffer=True, visibility=None,
                  stdout_visibility=None, post_processor=None,
-                 failure_prefix="Test Failed: "):
+                 failure_prefix="Test Failed: ", timeout=None):
         """
         Set buffer to True to include test output in JSON
 
@@ -164,6 +265,11 @@ class JSONTestRunner(object):
         dict in the first argument.
 
         failure_prefix: prepended to the output of each test's json
+
+        timeout: seconds each test may run for before it fails with a score of
+        0 and the next test starts, unless it or its class sets its own with
+        @timeout.
+        None (the default) lets tests run for as long as they need.
         """
         self.stream = stream
         self.descriptions = descriptions
@@ -180,11 +286,12 @@ class JSONTestRunner(object):
         if stdout_visibility:
             self.json_data["stdout_visibility"] = stdout_visibility
         self.failure_prefix = failure_prefix
+        self.timeout = timeout
 
     def _makeResult(self):
         return self.resultclass(self.stream, self.descriptions, self.verbosity,
                                 self.json_data["tests"], self.json_data["leaderboard"],
-                                self.failure_prefix)
+                                self.failure_prefix, self.timeout)
 
     def run(self, test):
         "Run the given test case or test suite."
@@ -1,6 +1,12 @@
 import unittest
 from json_test_runner import JSONTestRunner
 
+# Seconds a test may run for unless it or its class sets its own with @timeout. Kept well below
+# the CPU and wall clock limits of a whole run (Judge0 and the local sandbox both allow 5 CPU
+# seconds), so a looping test fails on its own instead of getting the entire run killed.
+TEST_TIMEOUT = 2
+
+
 if __name__ == '__main__':
     suite = unittest.defaultTestLoader.discover('.', pattern="*_cases.py")
-    JSONTestRunner(visibility='visible').run(suite)
\ No newline at end of file
+    JSONTestRunner(visibility='visible', timeout=TEST_TIMEOUT).run(suite)
\ No newline at end of file
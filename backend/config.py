@@ -15,6 +15,23 @@ load_dotenv(ENV_PATH)
 # Access the environment variables
 SECRET_KEY = os.getenv("SECRET_KEY")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+JUDGE0_URL = os.getenv("JUDGE0_URL", "http://host.docker.internal:2358")
+
+# Database settings, DB_PROFILE is either "development" (SQL echo, default pooling) or "production"
+DB_PROFILE = os.getenv("DB_PROFILE", "development")
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///backend/database.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+
+# Executor for demo case runs, "judge0" or "local" to use the warm sandbox worker pool
+DEMO_EXECUTOR = os.getenv("DEMO_EXECUTOR", "judge0")
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", 4))
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", 5))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", 512))
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", 10))
+# Sandbox workers run as uids SANDBOX_FIRST_UID to SANDBOX_FIRST_UID + 999, which no account may use
+SANDBOX_FIRST_UID = int(os.getenv("SANDBOX_FIRST_UID", 100000))
 
 # Debugging: Check if the variables are loaded properly
 if not SECRET_KEY:
@@ -1,15 +1,108 @@
 """Creates the SQLModel Engine to be used across the application."""
 
-from sqlmodel import create_engine, Session
+from sqlalchemy import Engine, event, inspect, text
+from sqlmodel import create_engine, Session, SQLModel
+
+from .config import (
+    DB_PROFILE,
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_BUSY_TIMEOUT_MS,
+)
 
 __authors__ = ["Andrew Lockard, Ivan Wu"]
 
-sqlite_file_name = "database.db"
-sqlite_url = f"sqlite:///backend/{sqlite_file_name}"
 
+def create_app_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE) -> Engine:
+    """Creates the engine for a database url with the settings of a profile
+
+    The "development" profile echoes every statement and otherwise keeps SQLAlchemy's defaults.
+    The "production" profile turns echo off and sizes the connection pool for a room full of teams.
+    SQLite databases in production enforce foreign keys and are switched to WAL journaling, so logins
+    can read while another request writes, with `synchronous=NORMAL` and a busy timeout so writers wait
+    for each other instead of failing.
+
+    Args:
+        url (str): SQLAlchemy database url, either SQLite or Postgres (which needs the psycopg package)
+        profile (str): "development" or "production"
+    Returns:
+        Engine: The configured engine
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile == "development":
+        # Async routes run their database work on worker threads, see SubmissionService.run_blocking
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        return create_engine(url, echo=True, connect_args=connect_args)
+    if profile != "production":
+        raise ValueError(f"Unknown database profile {profile}")
+
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,  # Drops connections the server closed while idle
+        )
+
+    engine = create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        connect_args={
+            "timeout": DB_BUSY_TIMEOUT_MS / 1000,
+            # Pooled connections are handed to whichever worker thread serves the request
+            "check_same_thread": False,
+        },
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to per connection
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+
+engine = create_app_engine()
+
+
+def migrate(target: Engine = engine) -> None:
+    """Brings an existing database up to date with the models without touching its data
+
+    Tables added since the database was created are created, nullable columns added to existing
+    tables are added, and indexes added to existing tables are built, so databases made by an
+    older version do not need to be reset.
+
+    Args:
+        target (Engine): The engine of the database to migrate
+    """
+    from . import models  # Registers every table on the metadata
 
-# TODO: Create script to turn off echo when NOT in development mode
-engine = create_engine(sqlite_url, echo=True)
+    SQLModel.metadata.create_all(target)
+    inspector = inspect(target)
+    quote = target.dialect.identifier_preparer.quote
+    with target.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue  # Required columns cannot be added to rows that already exist
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                        f"{column.type.compile(target.dialect)}"
+                    )
+                )
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(target, checkfirst=True)
 
 
 def db_session():
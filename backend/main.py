@@ -1,10 +1,12 @@
 """Entry of the backend for the SOTesting Environment. Sets up FastAPI and exception handlers"""
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 
 from .services.exceptions import (
     InvalidCredentialsException,
@@ -23,6 +25,13 @@ from .api import (
     problem,
     scores,
 )
+from .services.judge0 import Judge0Service
+from .services.sandbox import SandboxService
+from .services.grading_jobs import GradingJobService
+from .services.session_schedule import SessionSchedule
+from .services.problem_store import ProblemStore
+from .config import DEMO_EXECUTOR
+from .db import engine, migrate
 
 __authors__ = ["Andrew Lockard", "Mustafa Aljumayli"]
 
@@ -30,7 +39,28 @@ description = """
 This RESTful API is designed to allow Science Olympiad students to submit code for grading purposes as a part of a coding competition.
 """
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Sets up and tears down shared resources for the lifetime of the server"""
+    # Adds tables and indexes introduced since the database was last reset, data is untouched
+    migrate(engine)
+    with Session(engine) as session:
+        SessionSchedule.load(session)
+    GradingJobService.start()
+    ProblemStore.start_watching()
+    if DEMO_EXECUTOR == "local":
+        # Refuses to start if the workers cannot be isolated
+        await SandboxService.start()
+    yield
+    await ProblemStore.stop_watching()
+    await GradingJobService.stop()
+    await SandboxService.close()
+    await Judge0Service.close()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Science Olympiad Testing Environment API",
     version="1.0.0",
     description=description,
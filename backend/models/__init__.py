@@ -13,12 +13,25 @@ __all__ = [
     "submission",
     "session_obj",
     "problem",
+    "grading_job",
 ]
 
 from .team import Team, TeamData
-from .team_members import TeamMember, TeamMemberCreate, TeamMemberPublic
+from .team_members import (
+    TeamMember,
+    TeamMemberCreate,
+    TeamMemberPublic,
+    TeamWithMembers,
+)
 from .word import Word
 from .question import Document, Question, QuestionsPublic
-from .submission import Submission, ConsoleLog, ScoredTest
+from .submission import (
+    Submission,
+    ConsoleLog,
+    ScoredTest,
+    SubmissionRecord,
+    SubmissionResult,
+)
 from .session_obj import Session_Obj, SessionPublic
 from .problem import Problem
+from .grading_job import GradingJob
@@ -27,3 +27,15 @@ class LoginData(SQLModel, table=False):
     name: str
     password: str
     is_team: bool = Field(default=True)
+
+
+class SessionWindow(SQLModel, table=False):
+    """Response Model for the testing window of the logged in team"""
+
+    start_time: datetime
+    end_time: datetime
+    now: datetime
+    active: bool
+    seconds_remaining: float = Field(
+        description="Seconds until the test ends while it is active, otherwise 0"
+    )
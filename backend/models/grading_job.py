@@ -0,0 +1,23 @@
+"""Model for background grading jobs run by the server"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+__authors__ = ["Andrew Lockard"]
+
+
+class GradingJob(SQLModel):
+    """Model to define the API response shape of a grading job"""
+
+    id: int
+    status: str = "queued"  # queued, running, finished or failed
+    completed: int = 0  # Submissions graded so far
+    total: int = 0  # Submissions that need grading, known once the job is running
+    regraded: Optional[int] = None
+    failed: Optional[int] = None  # Pairs whose grader could not run, known once the job finishes
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,9 +1,13 @@
-"""Model for the Team table that stores official team information"""
+"""Models for submitting code and storing submissions and their graded results"""
 
-from sqlmodel import SQLModel
+from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
 
-__authors__ = ["Nicholas Almy"]
+
+__authors__ = ["Nicholas Almy", "Andrew Lockard"]
 
 
 class Submission(SQLModel):
@@ -25,3 +29,43 @@ class ScoredTest(ConsoleLog):
     question_num: int
     score: float
     max_score: float
+    # Measured by the autograder, None when the test did not run
+    wall_time: Optional[float] = None  # Seconds
+    cpu_time: Optional[float] = None  # Seconds
+    peak_rss_kb: Optional[int] = None  # The process's peak memory by the end of the test
+    error: Optional[str] = None  # Why the grader could not run, None when it ran
+
+
+class SubmissionRecord(SQLModel, table=True):
+    """Table Model for a stored submission, every submit adds a new row so history is kept"""
+
+    __table_args__ = (
+        Index("ix_submissionrecord_team_question", "team_id", "question_num", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    team_id: int = Field(foreign_key="team.id", ondelete="CASCADE")
+    question_num: int
+    content: str
+    content_hash: str
+    submitted_at: datetime = Field(default_factory=datetime.now)
+
+
+class SubmissionResult(ScoredTest, table=True):
+    """Table Model for a stored graded test.
+
+    Every test of a (team, question) pair shares the fingerprint of the tests and submission that
+    were graded, so the pair only needs regrading once that fingerprint changes.
+    """
+
+    __table_args__ = (
+        Index("ix_submissionresult_team_question", "team_id", "question_num"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    team_id: int = Field(foreign_key="team.id", ondelete="CASCADE")
+    submission_id: Optional[int] = Field(
+        default=None, foreign_key="submissionrecord.id", ondelete="CASCADE"
+    )
+    fingerprint: str
+    graded_at: datetime = Field(default_factory=datetime.now)
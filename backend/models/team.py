@@ -19,7 +19,9 @@ class TeamBase(SQLModel):
     """Base model for Team table, this model should not be exported"""
 
     name: str = Field(unique=True)
-    session_id: Optional[int] = Field(foreign_key="session_obj.id", nullable=True)
+    session_id: Optional[int] = Field(
+        foreign_key="session_obj.id", nullable=True, index=True
+    )
 
 
 class Team(TeamBase, table=True):
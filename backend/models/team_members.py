@@ -3,8 +3,11 @@
 Multiple models designed as per: https://sqlmodel.tiangolo.com/tutorial/fastapi/multiple-models/#use-multiple-models-to-create-a-hero
 """
 
+from typing import Optional
+
 from sqlmodel import Field, SQLModel, Relationship
-from .team import Team
+from .session_obj import Session_Obj
+from .team import Team, TeamBase
 
 __authors__ = ["Andrew Lockard"]
 
@@ -20,7 +23,7 @@ class TeamMember(TeamMemberBase, table=True):
     """Table Model for a Team Member"""
 
     id: int | None = Field(default=None, primary_key=True)
-    team_id: int = Field(foreign_key="team.id", ondelete="CASCADE")
+    team_id: int = Field(foreign_key="team.id", ondelete="CASCADE", index=True)
     team: Team = Relationship(back_populates="members")
 
 
@@ -34,3 +37,12 @@ class TeamMemberPublic(TeamMemberBase):
     """Model to define API response shape"""
 
     id: int
+
+
+class TeamWithMembers(TeamBase):
+    """Model to define the API response shape of a team listed with its members and session"""
+
+    id: int
+    password: str
+    session: Optional[Session_Obj]
+    members: list[TeamMemberPublic]
@@ -9,4 +9,4 @@ __authors__ = ["Nicholas Almy"]
 class Word(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     word: str
-    used: bool = Field(default=False)
+    used: bool = Field(default=False, index=True)
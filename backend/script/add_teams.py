@@ -38,11 +38,7 @@ def add_teams():
         )
         
         # Create batch of teams
-        teams = team_svc.create_batch_teams(
-            template_name=args.prefix,
-            batch_size=int(args.number),
-            template=template
-        )
+        teams = team_svc.create_batch_teams(args.prefix, int(args.number), template)
         
         # Get all teams for saving to file
         all_teams = team_svc.get_all_teams()
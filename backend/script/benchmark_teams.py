@@ -0,0 +1,125 @@
+"""Script to measure login and session listing latency for large numbers of teams"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlmodel import Session, insert, text
+
+from ..db import create_app_engine, migrate
+from ..models import Team, TeamMember, Session_Obj
+from ..services import TeamService, Session_ObjService
+
+__authors__ = ["Andrew Lockard"]
+
+# Indexes behind these lookups, dropped afterwards to measure the difference they make
+INDEXES = ["ix_team_session_id", "ix_teammember_team_id"]
+
+
+def fill_database(session: Session, team_count: int, session_count: int) -> None:
+    """Inserts sessions, teams spread evenly over them and two members per team"""
+    now = datetime.now()
+    session_ids = session.scalars(
+        insert(Session_Obj).returning(Session_Obj.id),
+        [
+            {
+                "name": f"Session {i}",
+                "start_time": now,
+                "end_time": now + timedelta(hours=1),
+            }
+            for i in range(session_count)
+        ],
+    ).all()
+    team_ids = session.scalars(
+        insert(Team).returning(Team.id),
+        [
+            {
+                "name": f"T{i}",
+                "password": f"word{i}-word{i + 1}-word{i + 2}",
+                "session_id": session_ids[i % session_count],
+            }
+            for i in range(team_count)
+        ],
+    ).all()
+    session.execute(
+        insert(TeamMember),
+        [
+            {"first_name": "First", "last_name": f"Last{i}", "team_id": team_id}
+            for team_id in team_ids
+            for i in range(2)
+        ],
+    )
+    session.commit()
+
+
+def time_ms(action, repeat: int) -> float:
+    """Returns the median time of an action in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def measure(session: Session, team_count: int, repeat: int) -> tuple[float, float]:
+    """Returns the median (login, session listing) latency in milliseconds"""
+    team_svc = TeamService(session)
+    session_svc = Session_ObjService(session)
+
+    def login():
+        i = random.randrange(team_count)
+        password = f"word{i}-word{i + 1}-word{i + 2}"
+        team_svc.get_team_with_credentials(f"T{i}", password)
+
+    def list_sessions():
+        session_svc.get_all_session_objs()
+        # Start every listing from an empty identity map like a fresh request would
+        session.expunge_all()
+
+    return time_ms(login, repeat), time_ms(list_sessions, max(1, repeat // 10))
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark Teams: This script times team logins and session listing on a throwaway database, with and without the team indexes",
+)
+parser.add_argument(
+    "-t",
+    "--teams",
+    type=int,
+    nargs="+",
+    default=[1000, 10000],
+    help="Numbers of teams to benchmark with",
+)
+parser.add_argument(
+    "-s", "--sessions", type=int, default=10, help="Number of testing sessions"
+)
+parser.add_argument(
+    "-r", "--repeat", type=int, default=200, help="Number of logins timed per run"
+)
+args = parser.parse_args()
+
+print(f"{'Teams':>8} {'Indexes':>8} {'Login (ms)':>12} {'Sessions (ms)':>14}")
+with tempfile.TemporaryDirectory() as tmp:
+    for team_count in args.teams:
+        engine = create_app_engine(
+            f"sqlite:///{Path(tmp) / f'bench_{team_count}.db'}", "production"
+        )
+        migrate(engine)
+        with Session(engine) as session:
+            fill_database(session, team_count, args.sessions)
+
+            login, listing = measure(session, team_count, args.repeat)
+        print(f"{team_count:>8} {'yes':>8} {login:>12.3f} {listing:>14.3f}")
+
+        with engine.begin() as conn:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+        with Session(engine) as session:
+            login, listing = measure(session, team_count, args.repeat)
+        print(f"{team_count:>8} {'no':>8} {login:>12.3f} {listing:>14.3f}")
+        engine.dispose()
@@ -1,55 +1,68 @@
 """This script runs all (or specific) tests on student submitted code"""
 
+import argparse
+import asyncio
+import sys
+
 from sqlmodel import Session
-import polars as pl
 
-from ..services import SubmissionService, TeamService, QuestionService
-from ..models import Team, ScoredTest
+from ..services.scores import ScoreService
+from ..services.judge0 import Judge0Service
 from ..db import engine
 
 DEFAULT_BY_TEST_FILE = "es_files/teams/scored_tests.csv"
 DEFAULT_TOTAL_FILE = "es_files/teams/final_scores.csv"
+DEFAULT_QUESTION_FILE = "es_files/teams/question_scores.csv"
+DEFAULT_TEST_STATS_FILE = "es_files/teams/test_pass_rates.csv"
 
 
 def main():
-    q_svc = QuestionService()
-    sub_svc = SubmissionService()
+    args = parse_cli()
+
     with Session(engine) as session:
-        team_svc = TeamService(session)
-        teams = team_svc.get_all_teams()
-
-    # TODO: Could make this multithreaded
-    test_list: list[pl.DataFrame] = []
-    for team in teams:
-        for q_num in range(1, q_svc.get_question_count() + 1):
-            dfs = [
-                create_test_df(team.name, test)
-                for test in sub_svc.grade_submission(q_num, team.name)
-            ]
-            test_list.extend(dfs)
-
-    test_table = pl.concat(test_list)
-    test_table.write_csv(DEFAULT_BY_TEST_FILE)
-
-    # Calculate the Total File
-    total_table = test_table.group_by("Team Number").agg(
-        pl.col("Score").sum(), pl.col("Max Score").sum()
+        score_svc = ScoreService(session)
+        regraded = asyncio.run(refresh_and_close(score_svc, args.workers))
+        sys.stdout.write(f"Regraded {regraded} submission(s)\n")
+        failed = score_svc.count_failures()
+        if failed:
+            sys.stdout.write(f"The grader failed to run on {failed} submission(s)\n")
+
+        score_svc.write_csv(score_svc.scan_tests(), DEFAULT_BY_TEST_FILE)
+        score_svc.write_csv(score_svc.get_total_table(), DEFAULT_TOTAL_FILE)
+        score_svc.write_csv(score_svc.get_question_table(), DEFAULT_QUESTION_FILE)
+        score_svc.write_csv(score_svc.get_test_stats_table(), DEFAULT_TEST_STATS_FILE)
+
+
+async def refresh_and_close(score_svc: ScoreService, workers: int) -> int:
+    """Runs an incremental regrade from the command line, closing the Judge0 connection pool afterwards"""
+    try:
+        return await score_svc.refresh(workers, report_progress)
+    finally:
+        await Judge0Service.close()
+
+
+def report_progress(completed: int, total: int) -> None:
+    """Writes a single updating progress line to stdout"""
+    sys.stdout.write(f"\rGraded {completed}/{total} submissions")
+    if completed == total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def parse_cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="This script grades every team's submission for every question."
     )
-    total_table.write_csv(DEFAULT_TOTAL_FILE)
-
-
-def create_test_df(team_name: str, test: ScoredTest) -> pl.DataFrame:
-    """Creates a DataFrame for a test case"""
-    return pl.DataFrame(
-        {
-            "Team Number": [team_name],
-            "Question Number": [test.question_num],
-            "Test Name": [test.test_name],
-            "Score": [test.score],
-            "Max Score": [test.max_score],
-            "Test Output": [test.console_log],
-        }
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=ScoreService.DEFAULT_WORKERS,
+        help=f"The number of submissions sent to Judge0 at once. Defaults to {ScoreService.DEFAULT_WORKERS}.",
     )
+    args = parser.parse_args()
+    return args
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""This script stores submission files from es_files/submissions in the database"""
+
+import argparse
+import os
+import sys
+
+from sqlmodel import Session, select
+
+from ..services.submissions import SubmissionService, submissions_dir
+from ..models import Team, SubmissionRecord
+from ..db import engine
+
+__authors__ = ["Andrew Lockard"]
+
+
+def main():
+    args = parse_cli()
+
+    with Session(engine) as session:
+        teams = {team.name: team for team in session.exec(select(Team)).all()}
+        latest = SubmissionService(session).get_latest_hashes()
+
+        imported = 0
+        for question_dir in sorted(os.listdir(args.dir)):
+            if not question_dir.startswith("q") or not question_dir[1:].isdigit():
+                continue
+            q_num = int(question_dir[1:])
+
+            for file in sorted(os.listdir(os.path.join(args.dir, question_dir))):
+                team_name, ext = os.path.splitext(file)
+                if ext != ".py":
+                    continue
+                if team_name not in teams:
+                    sys.stdout.write(f"Skipping {file} in {question_dir}, no such team\n")
+                    continue
+
+                with open(os.path.join(args.dir, question_dir, file), "r") as f:
+                    content = f.read()
+
+                # Files matching the team's latest stored submission are already imported
+                content_hash = SubmissionService.hash_content(content)
+                team_id = teams[team_name].id
+                if latest.get((team_id, q_num), (None, None))[1] == content_hash:
+                    continue
+
+                session.add(
+                    SubmissionRecord(
+                        team_id=team_id,
+                        question_num=q_num,
+                        content=content,
+                        content_hash=content_hash,
+                    )
+                )
+                imported += 1
+
+        session.commit()
+
+    sys.stdout.write(f"Imported {imported} submission(s)\n")
+
+
+def parse_cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="This script stores every team's submission files in the database. Files that match a team's latest stored submission are skipped."
+    )
+
+    parser.add_argument(
+        "-d",
+        "--dir",
+        type=str,
+        default=submissions_dir,
+        help=f"Directory holding a q{{n}} folder of team submissions per question. Defaults to {submissions_dir}.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
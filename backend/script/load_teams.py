@@ -46,7 +46,7 @@ def load_teams():
         team_list = team_svc.get_all_teams()
         team_list = team_list + team_svc.df_to_teams(team_table)
 
-        team_list: list[TeamData] = pwd_svc.generate_passwords(
+        team_list: list[TeamData] = pwd_svc.assign_passwords(
             teamList=team_list, team_svc=team_svc
         )
 
@@ -0,0 +1,14 @@
+"""Script to add new tables and indexes to an existing database without losing its data"""
+
+import argparse
+
+from ..db import engine, migrate
+
+__authors__ = ["Andrew Lockard"]
+
+parser = argparse.ArgumentParser(
+    description="Migrate Database: This script creates any tables and indexes added since the database was created. Existing data is kept.",
+).parse_args()
+
+migrate(engine)
+print("Database migrated!")
@@ -41,7 +41,7 @@ def teams_to_db():
             )
             return
 
-        team_list: list[TeamData] = pwd_svc.generate_passwords(
+        team_list: list[TeamData] = pwd_svc.assign_passwords(
             teamList=team_list, team_svc=team_svc
         )
         # Delete teams not in the file
@@ -16,3 +16,6 @@ from .session_obj import Session_ObjService
 from .problems import ProblemService
 from .docs import DocsService
 from .es import ESService
+from .judge0 import Judge0Service
+from .scores import ScoreService
+from .grading_jobs import GradingJobService
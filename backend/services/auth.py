@@ -2,17 +2,21 @@ import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from sqlmodel import Session
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import select
 from ..db import db_session
 
-from ..models.auth import Token, TokenData
+from ..models.auth import Token, TokenData, SessionWindow
 from ..models.team import Team
+from ..models.session_obj import Session_Obj
 
 from ..config import SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES
 
 from .team import TeamService
 from .es import ESService
+from .identity_cache import IdentityCache
+from .session_schedule import SessionSchedule
 from .exceptions import (
     InvalidCredentialsException,
     ResourceNotFoundException,
@@ -35,12 +39,24 @@ class AuthService:
     def __init__(
         self,
         session: Session = Depends(db_session),
-        team_svc: TeamService = Depends(),
-        es_svc: ESService = Depends(),
+        team_svc=None,  # Only built when logging in, most requests just resolve a token
+        es_svc=None,
     ):
         self._session = session
-        self._team_svc = team_svc
-        self._es_svc = es_svc
+        self._team_svc_instance = team_svc
+        self._es_svc_instance = es_svc
+
+    @property
+    def _team_svc(self) -> TeamService:
+        if self._team_svc_instance is None:
+            self._team_svc_instance = TeamService(self._session)
+        return self._team_svc_instance
+
+    @property
+    def _es_svc(self) -> ESService:
+        if self._es_svc_instance is None:
+            self._es_svc_instance = ESService()
+        return self._es_svc_instance
 
     def authenticate_team(self, name: str, password: str) -> Token:
         """
@@ -121,6 +137,8 @@ class AuthService:
     def get_team_from_token(self, token: str) -> Team:
         """Gets a team from the users JWT token
 
+        Teams of recently seen tokens are served from the IdentityCache without touching the database.
+
         Args:
             token: str - the token sent by the browser
         Returns:
@@ -128,6 +146,10 @@ class AuthService:
         Throws:
             InvalidCredientialsException: if JWT did not pass decoding
         """
+        cached = IdentityCache.get(token)
+        if cached is not None:
+            return self._session.merge(cached, load=False)
+
         try:
             data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
             statement = (
@@ -138,15 +160,64 @@ class AuthService:
             team = self._session.exec(statement).first()
             if team == None:
                 raise ResourceNotFoundException("Team assocated with login not found.")
-            return team
         except jwt.ExpiredSignatureError:
             raise InvalidCredentialsException("Login expired, try logging in again.")
         except jwt.InvalidTokenError:
             raise InvalidCredentialsException("Login invalid, try logging in again.")
 
+        IdentityCache.put(token, self._detached_copy(team), data["exp"])
+        return team
+
+    @staticmethod
+    def _detached_copy(team: Team) -> Team:
+        """Copies a team and its session into objects outside of any database session.
+
+        Commits expire the attributes of objects in a database session, so the cache keeps
+        copies that can only change by being replaced.
+        """
+        copy = Team(**team.model_dump())
+        make_transient_to_detached(copy)
+        session_obj = None
+        if team.session is not None:
+            session_obj = Session_Obj(**team.session.model_dump())
+            make_transient_to_detached(session_obj)
+        # Set as if loaded from the database, so merging does not see a pending change
+        set_committed_value(copy, "session", session_obj)
+        return copy
+
     def authenticate_team_time(self, team: Team) -> None:
-        """Authenticates a Teams permissions based on the time."""
-        if team.session.start_time > datetime.now():
+        """Authenticates a Teams permissions based on the time.
+
+        Raises:
+            ResourceNotAllowedException: If the team has no session or its session is not running
+        """
+        window = self.get_team_window(team)
+        if window.now < window.start_time:
             raise ResourceNotAllowedException("Your testing time is not active yet.")
-        elif team.session.end_time < datetime.now():
+        elif window.now > window.end_time:
             raise ResourceNotAllowedException("You have run out of time.")
+
+    def get_team_window(self, team: Team) -> SessionWindow:
+        """Gets a team's testing window and how much of it is left, using the SessionSchedule
+
+        Raises:
+            ResourceNotAllowedException: If the team is not assigned to an existing session
+        """
+        if team.session_id is None:
+            raise ResourceNotAllowedException(
+                "You are not assigned to a testing session."
+            )
+        window = SessionSchedule.get_window(team.session_id, self._session)
+        if window is None:
+            raise ResourceNotAllowedException("Your testing session was not found.")
+
+        start_time, end_time = window
+        now = datetime.now()
+        active = start_time <= now <= end_time
+        return SessionWindow(
+            start_time=start_time,
+            end_time=end_time,
+            now=now,
+            active=active,
+            seconds_remaining=(end_time - now).total_seconds() if active else 0.0,
+        )
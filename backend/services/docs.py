@@ -6,6 +6,7 @@ from typing import List
 from fastapi import HTTPException
 
 from ..models import Document
+from .questions import QuestionService
 
 
 __author__ = ["Michelle Nguyen"]
@@ -100,6 +101,7 @@ class DocsService:
 
             with open(file_path, "w") as f:
                 f.write(content)
+            QuestionService.invalidate()  # Global docs are served in the question bundle
 
             return Document(title=title, content=content)
         except HTTPException:
@@ -127,6 +129,7 @@ class DocsService:
                 )
 
             os.remove(file_path)
+            QuestionService.invalidate()
             return {"message": f"Document '{title}' deleted successfully"}
         except HTTPException:
             raise
@@ -155,6 +158,7 @@ class DocsService:
                     os.remove(file_path)
                     deleted_count += 1
 
+            QuestionService.invalidate()
             return deleted_count
         except Exception as e:
             raise HTTPException(
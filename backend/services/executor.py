@@ -0,0 +1,43 @@
+"""The backends a packaged submission can be run on"""
+
+from typing import Protocol
+
+from .judge0 import Judge0Service
+from .sandbox import SandboxService
+
+__authors__ = ["Andrew Lockard"]
+
+
+class Executor(Protocol):
+    """Runs a packaged submission and returns the autograder's test results"""
+
+    async def run(self, submission_zip: bytes) -> list[dict]:
+        """Runs a single packaged submission.
+
+        Args:
+            submission_zip: base64 encoded zip of the autograder utils, test cases and submission
+        Returns:
+            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+        Raises:
+            RuntimeError: If the submission could not be run
+        """
+        ...
+
+
+EXECUTORS: dict[str, type[Executor]] = {
+    "judge0": Judge0Service,
+    "local": SandboxService,
+}
+
+
+def get_executor(name: str) -> Executor:
+    """Returns the executor configured under a name
+
+    Raises:
+        ValueError: If there is no executor with that name
+    """
+    if name not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {name!r}, expected one of {', '.join(EXECUTORS)}"
+        )
+    return EXECUTORS[name]()
@@ -0,0 +1,127 @@
+"""Service to run grading in the background of the server process"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlmodel import Session
+
+from ..db import engine
+from ..models import GradingJob
+from .exceptions import ResourceNotFoundException
+from .scores import ScoreService
+
+__authors__ = ["Andrew Lockard"]
+
+logger = logging.getLogger(__name__)
+
+
+class GradingJobService:
+    """Queues regrades and runs them on a worker task inside the server's event loop.
+
+    At most one full regrade is queued or running at any time: asking for another one while
+    one is pending returns the pending job instead of starting a second.
+    """
+
+    MAX_FINISHED_JOBS = 50  # Finished jobs kept around so their status can still be read
+
+    _jobs: dict[int, GradingJob] = {}
+    _next_id: int = 1
+    _queue: asyncio.Queue | None = None
+    _worker: asyncio.Task | None = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Starts the worker task on the running event loop if it is not already running"""
+        if cls._worker is None or cls._worker.done():
+            cls._queue = asyncio.Queue()
+            cls._worker = asyncio.create_task(cls._work())
+            # Jobs queued on a previous worker would never run, so fail them
+            for job in cls._jobs.values():
+                if job.status == "queued":
+                    cls._finish(job, error="Grading worker was restarted")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stops the worker task"""
+        if cls._worker is not None:
+            cls._worker.cancel()
+            try:
+                await cls._worker
+            except asyncio.CancelledError:
+                pass
+        cls._worker = None
+        cls._queue = None
+
+    def enqueue_refresh(self) -> GradingJob:
+        """Queues a full incremental regrade, or returns the one already queued or running
+
+        Returns:
+            GradingJob: The job that will perform the regrade
+        """
+        for job in GradingJobService._jobs.values():
+            if job.status in ("queued", "running"):
+                return job
+
+        GradingJobService.start()
+        job = GradingJob(id=GradingJobService._next_id)
+        GradingJobService._next_id += 1
+        GradingJobService._jobs[job.id] = job
+        GradingJobService._queue.put_nowait(job)
+        self._forget_old_jobs()
+        return job
+
+    def get_job(self, job_id: int) -> GradingJob:
+        """Gets a job by its id
+
+        Raises:
+            ResourceNotFoundException: If no job has that id
+        """
+        try:
+            return GradingJobService._jobs[job_id]
+        except KeyError:
+            raise ResourceNotFoundException(f"Grading job {job_id} was not found")
+
+    @classmethod
+    async def _work(cls) -> None:
+        while True:
+            job = await cls._queue.get()
+            try:
+                await cls._run(job)
+            finally:
+                cls._queue.task_done()
+
+    @classmethod
+    async def _run(cls, job: GradingJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+
+        def progress(completed: int, total: int) -> None:
+            job.completed = completed
+            job.total = total
+
+        try:
+            with Session(engine) as session:
+                score_svc = ScoreService(session)
+                job.regraded = await score_svc.refresh(progress=progress)
+                job.failed = await asyncio.to_thread(score_svc.count_failures)
+            cls._finish(job)
+        except Exception as e:
+            logger.exception("Grading job %d failed", job.id)
+            cls._finish(job, error=str(e))
+
+    @staticmethod
+    def _finish(job: GradingJob, error: str | None = None) -> None:
+        job.status = "failed" if error else "finished"
+        job.error = error
+        job.finished_at = datetime.now()
+
+    @classmethod
+    def _forget_old_jobs(cls) -> None:
+        finished = [
+            job_id
+            for job_id, job in cls._jobs.items()
+            if job.status in ("finished", "failed")
+        ]
+        for job_id in finished[: max(0, len(finished) - cls.MAX_FINISHED_JOBS)]:
+            del cls._jobs[job_id]
@@ -0,0 +1,98 @@
+"""Service to remember which team a login token belongs to"""
+
+import threading
+import time
+
+from ..models import Team
+
+__authors__ = ["Andrew Lockard"]
+
+
+class IdentityCache:
+    """A process wide, short lived cache from JWT tokens to the team they belong to.
+
+    Cached teams are detached from any database session and are kept with their session
+    (and so their testing window) loaded. Callers merge them into their own database session
+    with `load=False`, which copies the cached state without querying. Entries expire after
+    TTL seconds or when their token does, and are dropped as soon as the team or its session
+    is written to.
+    """
+
+    TTL = 30  # Seconds a token's team is trusted before it is read from the database again
+    MAX_ENTRIES = 4096
+
+    # Maps token to (expiry as a unix timestamp, detached team)
+    _entries: dict[str, tuple[float, Team]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, token: str) -> Team | None:
+        """Returns the detached team cached for a token, or None if it is missing or expired"""
+        with cls._lock:
+            entry = cls._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del cls._entries[token]
+                return None
+            return entry[1]
+
+    @classmethod
+    def put(cls, token: str, team: Team, token_exp: float) -> None:
+        """Caches a detached team for a token
+
+        Args:
+            token (str): the JWT the team logged in with
+            team (Team): the team, detached from its database session
+            token_exp (float): when the token expires, as a unix timestamp
+        """
+        expires = min(time.time() + cls.TTL, token_exp)
+        with cls._lock:
+            if len(cls._entries) >= cls.MAX_ENTRIES:
+                cls._drop_expired()
+            if len(cls._entries) >= cls.MAX_ENTRIES:
+                # Tokens are added in roughly expiry order, so drop the oldest
+                del cls._entries[next(iter(cls._entries))]
+            cls._entries[token] = (expires, team)
+
+    @classmethod
+    def invalidate_teams(cls, team_ids) -> None:
+        """Drops the cached entries of the given teams"""
+        team_ids = set(team_ids)
+        with cls._lock:
+            for token in [
+                token
+                for token, (_, team) in cls._entries.items()
+                if team.id in team_ids
+            ]:
+                del cls._entries[token]
+
+    @classmethod
+    def invalidate_session(cls, session_id: int) -> None:
+        """Drops the cached entries of every team in a session"""
+        with cls._lock:
+            for token in [
+                token
+                for token, (_, team) in cls._entries.items()
+                if team.session_id == session_id
+            ]:
+                del cls._entries[token]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drops every cached entry"""
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def size(cls) -> int:
+        """Returns the number of cached entries"""
+        return len(cls._entries)
+
+    @classmethod
+    def _drop_expired(cls) -> None:
+        now = time.time()
+        for token in [
+            token for token, (expires, _) in cls._entries.items() if expires <= now
+        ]:
+            del cls._entries[token]
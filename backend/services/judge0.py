@@ -0,0 +1,211 @@
+"""Service to handle asynchronous communication with the Judge0 API"""
+
+import asyncio
+import json
+import logging
+
+import httpx
+
+from ..config import JUDGE0_URL
+
+__authors__ = ["Andrew Lockard"]
+
+logger = logging.getLogger(__name__)
+
+
+class Judge0Service:
+    """Asynchronous Judge0 client.
+
+    Submissions are sent without `?wait=true`. Submissions made at roughly the same time are
+    grouped into a single `/submissions/batch` request, and their results are collected by
+    polling Judge0 with the returned tokens. All instances share one `httpx.AsyncClient`
+    connection pool and one batching queue per event loop.
+    """
+
+    LANGUAGE_ID = 89  # Judge0's "Multi-file program" language
+    BATCH_SIZE = 20  # Judge0's default max_submission_batch_size
+    BATCH_WINDOW = 0.05  # Seconds to wait for more submissions before sending a batch
+    POLL_INTERVAL = 0.5  # Seconds between result polls
+    POLL_TIMEOUT = 120.0  # Seconds before giving up on a submission
+    MAX_CONNECTIONS = 20
+    PENDING_STATUSES = {1, 2}  # In Queue, Processing
+
+    _client: httpx.AsyncClient | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    _pending: list[tuple[bytes, asyncio.Future]] = []
+    _flush_task: asyncio.Task | None = None
+
+    @classmethod
+    def _new_client(cls) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=JUDGE0_URL,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(
+                max_connections=cls.MAX_CONNECTIONS,
+                max_keepalive_connections=cls.MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(30.0),
+        )
+
+    @classmethod
+    def _bind_loop(cls) -> None:
+        """Connection pools and futures belong to an event loop, so reset shared state when the loop changes"""
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            cls._loop = loop
+            cls._client = None
+            cls._pending = []
+            cls._flush_task = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Returns the shared AsyncClient for the running event loop"""
+        cls._bind_loop()
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._new_client()
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        """Closes the shared connection pool"""
+        if cls._client is not None and not cls._client.is_closed:
+            await cls._client.aclose()
+        cls._client = None
+
+    async def run(self, submission_zip: bytes) -> list[dict]:
+        """Runs a single packaged submission, batching it with any other submissions sent at the same time.
+
+        Args:
+            submission_zip: base64 encoded zip containing all code to be executed in the judge0 environment
+        Returns:
+            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+        Raises:
+            RuntimeError: If Judge0 could not run the submission
+        """
+        self._bind_loop()
+        future = asyncio.get_running_loop().create_future()
+        Judge0Service._pending.append((submission_zip, future))
+
+        if len(Judge0Service._pending) >= self.BATCH_SIZE:
+            self._flush()
+        elif Judge0Service._flush_task is None:
+            Judge0Service._flush_task = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def run_many(self, submission_zips: list[bytes]) -> list[list[dict] | Exception]:
+        """Runs several packaged submissions. A failed submission's entry is its exception."""
+        return await asyncio.gather(
+            *(self.run(submission_zip) for submission_zip in submission_zips),
+            return_exceptions=True,
+        )
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.BATCH_WINDOW)
+        Judge0Service._flush_task = None
+        self._flush()
+
+    def _flush(self) -> None:
+        """Sends everything waiting in the queue as batches of at most BATCH_SIZE"""
+        pending, Judge0Service._pending = Judge0Service._pending, []
+        if Judge0Service._flush_task is not None:
+            Judge0Service._flush_task.cancel()
+            Judge0Service._flush_task = None
+        for i in range(0, len(pending), self.BATCH_SIZE):
+            asyncio.create_task(self._run_batch(pending[i : i + self.BATCH_SIZE]))
+
+    async def _run_batch(self, batch: list[tuple[bytes, asyncio.Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            tokens = await self.submit_batch([submission_zip for submission_zip, _ in batch])
+            await self._collect(dict(zip(tokens, futures)))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def submit_batch(self, submission_zips: list[bytes]) -> list[str]:
+        """Creates submissions on Judge0 without waiting for them to finish.
+
+        Returns:
+            list[str]: The token of each submission, in the order they were given
+        """
+        res = await self.get_client().post(
+            "/submissions/batch",
+            params={"base64_encoded": "false"},
+            json={
+                "submissions": [
+                    {
+                        "additional_files": submission_zip.decode("utf-8"),
+                        "language_id": self.LANGUAGE_ID,
+                    }
+                    for submission_zip in submission_zips
+                ]
+            },
+        )
+
+        if res.status_code != 201:
+            raise RuntimeError(
+                "Judge0 did not return as expected, please ensure it is running and try again."
+            )
+
+        tokens = []
+        for entry in res.json():
+            if "token" not in entry:
+                raise RuntimeError(f"Judge0 rejected a submission: {entry}")
+            tokens.append(entry["token"])
+        return tokens
+
+    async def get_batch(self, tokens: list[str]) -> list[dict]:
+        """Fetches the current state of the submissions with the given tokens"""
+        res = await self.get_client().get(
+            "/submissions/batch",
+            params={
+                "tokens": ",".join(tokens),
+                "base64_encoded": "false",
+                "fields": "token,stdout,stderr,status",
+            },
+        )
+
+        if res.status_code != 200:
+            raise RuntimeError(
+                "Judge0 did not return as expected, please ensure it is running and try again."
+            )
+        return res.json()["submissions"]
+
+    async def _collect(self, waiting: dict[str, asyncio.Future]) -> None:
+        """Polls Judge0 until every token has finished, resolving each future as its result arrives"""
+        elapsed = 0.0
+        while waiting:
+            for result in await self.get_batch(list(waiting)):
+                token = result.get("token")
+                if token not in waiting:
+                    # Not asked for, or already resolved by an earlier entry of the response
+                    logger.warning("Skipping Judge0 result for unexpected token %r", token)
+                    continue
+                if result["status"]["id"] in self.PENDING_STATUSES:
+                    continue
+                future = waiting.pop(token)
+                if future.done():
+                    continue
+                try:
+                    future.set_result(self.parse_tests(result))
+                except RuntimeError as e:
+                    future.set_exception(e)
+
+            if not waiting:
+                break
+            if elapsed >= self.POLL_TIMEOUT:
+                raise RuntimeError("Judge0 did not finish running the submission in time.")
+            await asyncio.sleep(self.POLL_INTERVAL)
+            elapsed += self.POLL_INTERVAL
+
+    @staticmethod
+    def parse_tests(result: dict) -> list[dict]:
+        """Extracts the autograder's test list from a finished Judge0 submission"""
+        try:
+            return json.loads(result["stdout"])["tests"]
+        except (TypeError, KeyError, json.JSONDecodeError):
+            raise RuntimeError(
+                f"Judge0 could not run the autograder: {result['status'].get('description', 'Unknown error')}"
+            )
@@ -1,49 +1,72 @@
 """Service to handle password generation and management"""
 
-from backend.services.exceptions import ResourceNotFoundException
+from backend.services.exceptions import (
+    ResourceNotFoundException,
+    ResourceNotAllowedException,
+)
 from ..db import db_session
 from fastapi import Depends
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
 import polars as pl
 import datetime as dt
 import random
+import threading
 
 from ..models import TeamData, Team, Word
 from .team import TeamService
 
 __authors__ = ["Nicholas Almy", "Andrew Lockard", "Tsering Lama"]
 
+# Passwords are credentials, so shuffle the word list with the OS random source
+_random = random.SystemRandom()
+
 
 class PasswordService:
-    """Service that deals with password generation and management"""
+    """Service that deals with password generation and management
+
+    Unused word ids are kept in a shuffled free list shared by every request, so drawing a word
+    is a pop off its end instead of a scan of the whole word table.
+    """
+
+    # Ids of the unused words in a random order, None until loaded from the database
+    _free_words: list[int] | None = None
+    _free_lock = threading.Lock()
 
     def __init__(
         self, session: Session = Depends(db_session)
     ):  # Add all dependencies via FastAPI injection in the constructor
         self._session = session
 
-    def generate_passwords(
+    def assign_passwords(
         self, teamList: list[TeamData], team_svc: TeamService
     ) -> list[TeamData]:
-        """Generates a new password for each user in the list
+        """Fills in the password of each team in the list that does not have one
+
+        Teams already in the database keep their stored password, the rest get a new one. All new
+        passwords are generated together with `generate_passwords`.
         Args:
             teamList (list[Team]): List of teams to generate passwords for
             team_svc (TeamService): Service to interact with the Team table
         Returns:
             list[Team]: List of teams with updated passwords
         """
+        needs_password = []
         for team in teamList:
+            if team.password != None:
+                continue
             try:
-                db_team = team_svc.get_team(team.name)
+                team.password = team_svc.get_team(team.name).password
             except ResourceNotFoundException:
-                if team.password == None:
-                    team.password = self.generate_password()
-
+                pass
             if team.password == None:
-                if db_team.password == None:
-                    team.password = self.generate_password()
-                else:
-                    team.password = db_team.password
+                needs_password.append(team)
+
+        if needs_password:
+            for team, password in zip(
+                needs_password, self.generate_passwords(len(needs_password))
+            ):
+                team.password = password
+            self._session.commit()
         return teamList
 
     def generate_password(self) -> str:
@@ -51,26 +74,93 @@ class PasswordService:
         Returns:
             str: The generated password
         """
-        corpus = self._session.exec(select(Word).where(Word.used == False)).all()
-        if len(corpus) < 3:
-            PasswordService.reset_word_list()
-            corpus = self._session.exec(select(Word).where(Word.used == False)).all()
-        # Randomly select 3 words from the corpus and mark them as used
-        password = []
-        for _ in range(3):
-            word = corpus.pop(random.randint(0, len(corpus) - 1))
-            word.used = True
-            self._session.add(word)
-            self._session.commit()
-            password.append(word.word)
-        password = "-".join(password)
-
+        password = self.generate_passwords(1)[0]
+        self._session.commit()
         return password
 
+    def generate_passwords(self, count: int) -> list[str]:
+        """Generates `count` 3-word passwords, no word is used twice across the batch
+
+        Words are drawn from the shuffled free list and marked as used with one update. Nothing
+        is committed, so the words are only spent if the caller's transaction commits.
+        Args:
+            count (int): Number of passwords to generate
+        Returns:
+            list[str]: The generated passwords
+        Raises:
+            ResourceNotAllowedException: If the word list is too small for that many passwords
+        """
+        needed = 3 * count
+        order: list[int] = []  # Ids of the spent words in the order they were drawn
+        words: dict[int, str] = {}
+        with PasswordService._free_lock:
+            while len(words) < needed:
+                ids = self._take_free_words(needed - len(words), set(words))
+                # The free list may be stale if another process spent words since it was
+                # loaded, so only keep the words this update actually marked
+                marked = dict(
+                    self._session.exec(
+                        update(Word)
+                        .where(Word.id.in_(ids), Word.used == False)
+                        .values(used=True)
+                        .returning(Word.id, Word.word)
+                    ).all()
+                )
+                # RETURNING gives rows in table order, so keep the shuffled order of ids
+                order += [word_id for word_id in ids if word_id in marked]
+                words.update(marked)
+        return [
+            "-".join(words[word_id] for word_id in order[i : i + 3])
+            for i in range(0, needed, 3)
+        ]
+
+    def _take_free_words(self, count: int, taken: set[int]) -> list[int]:
+        """Pops `count` word ids off the free list, reloading it from the database if needed
+
+        Args:
+            count (int): Number of word ids to take
+            taken (set[int]): Ids of words already spent by the current batch
+        """
+        free = PasswordService._free_words
+        if free is None or len(free) < count:
+            free = self._load_free_words(taken)
+            if len(free) < count:
+                # Start reusing words once they run out
+                self._session.exec(
+                    update(Word).where(Word.id.not_in(taken)).values(used=False)
+                )
+                free = self._load_free_words(taken)
+                if len(free) < count:
+                    raise ResourceNotAllowedException(
+                        f"{count + len(taken)} password words are needed but only "
+                        f"{len(free) + len(taken)} exist"
+                    )
+        ids = free[-count:]
+        del free[-count:]
+        PasswordService._free_words = free
+        return ids
+
+    def _load_free_words(self, taken: set[int]) -> list[int]:
+        """Returns the ids of the unused words in a random order"""
+        free = list(
+            self._session.exec(
+                select(Word.id).where(Word.used == False, Word.id.not_in(taken))
+            ).all()
+        )
+        _random.shuffle(free)
+        return free
+
+    @classmethod
+    def clear_free_words(cls) -> None:
+        """Forgets the free list, it is reloaded from the database on next use"""
+        with cls._free_lock:
+            cls._free_words = None
+
     def reset_word_list(self):
         """Resets memory of available password words"""
         words = self._session.exec(select(Word)).all()
         for word in words:
             word.used = False
         self._session.commit()
+        PasswordService.clear_free_words()
         return
@@ -0,0 +1,170 @@
+"""Service to keep every problem's files in memory"""
+
+import asyncio
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+try:
+    from watchfiles import awatch
+except ImportError:  # Without watchfiles only changes made through ProblemService are seen
+    awatch = None
+
+__authors__ = ["Andrew Lockard"]
+
+logger = logging.getLogger(__name__)
+
+
+class ProblemStore:
+    """A process wide index of the problems in a questions directory and their files.
+
+    The index is built from disk the first time a directory is read, after which reading a problem
+    is a dictionary lookup. ProblemService updates it as it writes problems, and while the server
+    runs a watcher drops it whenever anything in the directory is changed by hand.
+
+    The index is never changed in place, updates replace it, so callers get a read-only snapshot
+    that stays consistent while they use it. Anything built from the index registers a listener
+    with `add_listener` to be told when it changes.
+    """
+
+    QUESTIONS_DIR = "es_files/questions"
+    # Files of a problem that are kept in memory, any other file is read from disk
+    PROBLEM_FILES = ("prompt.md", "starter.py", "test_cases.py", "demo_cases.py")
+
+    # Absolute path of the indexed directory, and its problem numbers mapped to their files
+    _directory: str | None = None
+    _problems: Mapping[int, Mapping[str, str]] = MappingProxyType({})
+    _lock = threading.Lock()
+    _watcher: asyncio.Task | None = None
+    # Called without arguments after every change to the index
+    _listeners: list[Callable[[], None]] = []
+
+    @classmethod
+    def get_problems(
+        cls, directory: str = QUESTIONS_DIR
+    ) -> Mapping[int, Mapping[str, str]]:
+        """Gets every problem in a questions directory
+
+        Args:
+            directory (str): the questions directory
+        Returns:
+            Mapping[int, Mapping[str, str]]: a read-only snapshot mapping problem numbers to the
+                contents of their files by name
+        """
+        directory = os.path.abspath(directory)
+        with cls._lock:
+            if cls._directory != directory:
+                cls._problems = cls._load(directory)
+                cls._directory = directory
+            return cls._problems
+
+    @classmethod
+    def get_problem_numbers(cls, directory: str = QUESTIONS_DIR) -> list[int]:
+        """Gets the sorted numbers of the problems in a questions directory"""
+        return sorted(cls.get_problems(directory))
+
+    @classmethod
+    def get_file(
+        cls, q_num: int, filename: str, directory: str = QUESTIONS_DIR
+    ) -> str | None:
+        """Gets the contents of one of a problem's files
+
+        Returns:
+            str | None: the contents, or None if the problem or the file does not exist
+        """
+        return cls.get_problems(directory).get(q_num, {}).get(filename)
+
+    @classmethod
+    def put_file(
+        cls, q_num: int, filename: str, content: str, directory: str = QUESTIONS_DIR
+    ) -> None:
+        """Records a file that was just written to disk"""
+        with cls._lock:
+            # A directory that is not indexed is read from disk when it is
+            if cls._directory == os.path.abspath(directory):
+                files = dict(cls._problems.get(q_num, {}))
+                if filename in cls.PROBLEM_FILES:
+                    files[filename] = content
+                cls._problems = MappingProxyType(
+                    {**cls._problems, q_num: MappingProxyType(files)}
+                )
+        cls._notify()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drops the index, it is rebuilt from disk on next use"""
+        with cls._lock:
+            cls._directory = None
+            cls._problems = MappingProxyType({})
+        cls._notify()
+
+    @classmethod
+    def add_listener(cls, listener: Callable[[], None]) -> None:
+        """Calls `listener` after every change to the index, including it being dropped
+
+        Listeners are called without the store's lock held, so they may read the store.
+        """
+        with cls._lock:
+            if listener not in cls._listeners:
+                cls._listeners.append(listener)
+
+    @classmethod
+    def _notify(cls) -> None:
+        with cls._lock:
+            listeners = list(cls._listeners)
+        for listener in listeners:
+            listener()
+
+    @classmethod
+    def start_watching(cls, directory: str = QUESTIONS_DIR) -> None:
+        """Starts dropping the index whenever a file in the directory changes on disk
+
+        Must be called from the running event loop. Does nothing if watchfiles is not installed.
+        """
+        if awatch is None:
+            logger.warning("watchfiles is not installed, edits made by hand are not seen")
+            return
+        if cls._watcher is None or cls._watcher.done():
+            cls._watcher = asyncio.create_task(cls._watch(directory))
+
+    @classmethod
+    async def stop_watching(cls) -> None:
+        """Stops the watcher task"""
+        if cls._watcher is not None:
+            cls._watcher.cancel()
+            try:
+                await cls._watcher
+            except asyncio.CancelledError:
+                pass
+        cls._watcher = None
+
+    @classmethod
+    async def _watch(cls, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        async for _ in awatch(directory):
+            cls.invalidate()
+
+    @classmethod
+    def _load(cls, directory: str) -> Mapping[int, Mapping[str, str]]:
+        if not os.path.isdir(directory):
+            return MappingProxyType({})
+
+        problems: dict[int, Mapping[str, str]] = {}
+        for entry in os.listdir(directory):
+            if not (entry.startswith("q") and entry[1:].isdigit()):
+                continue
+            files = {}
+            for filename in cls.PROBLEM_FILES:
+                path = os.path.join(directory, entry, filename)
+                try:
+                    with open(path, "r") as f:
+                        files[filename] = f.read()
+                except (FileNotFoundError, NotADirectoryError):
+                    pass
+                except (OSError, UnicodeDecodeError) as e:
+                    # One unreadable file is left out like a missing one instead of failing the load
+                    logger.warning("Skipping unreadable problem file %s: %s", path, e)
+            problems[int(entry[1:])] = MappingProxyType(files)
+        return MappingProxyType(problems)
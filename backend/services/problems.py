@@ -9,6 +9,8 @@ from typing import List
 
 from fastapi import HTTPException
 from ..models import Document, Problem
+from .problem_store import ProblemStore
+from .result_cache import ResultCache
 
 
 __authors__ = ["Michelle Nguyen"]
@@ -23,17 +25,7 @@ class ProblemService:
     def get_problems_list() -> List[int]:
         """Retrieve all available problem numbers."""
         try:
-            if not os.path.exists(ProblemService.QUESTIONS_DIR):
-                return []
-
-            problems = sorted(
-                [
-                    int(f[1:])
-                    for f in os.listdir(ProblemService.QUESTIONS_DIR)
-                    if f.startswith("q") and f[1:].isdigit()
-                ]
-            )
-            return problems
+            return ProblemStore.get_problem_numbers(ProblemService.QUESTIONS_DIR)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Error fetching problems: {str(e)}"
@@ -47,7 +39,7 @@ class ProblemService:
     @staticmethod
     def get_problem(q_num: int) -> Problem:
         """Retrieve all files related to a problem."""
-        if not os.path.exists(os.path.join(ProblemService.QUESTIONS_DIR, f"q{q_num}")):
+        if q_num not in ProblemStore.get_problems(ProblemService.QUESTIONS_DIR):
             raise HTTPException(status_code=404, detail=f"Problem {q_num} not found.")
 
         try:
@@ -66,6 +58,10 @@ class ProblemService:
     @staticmethod
     def read_file(q_num: int, filename: str) -> str:
         """Read content from a specified file in a problem directory."""
+        content = ProblemStore.get_file(q_num, filename, ProblemService.QUESTIONS_DIR)
+        if content is not None:
+            return content
+
         path = ProblemService.get_question_path(q_num, filename)
         if not os.path.exists(path):
             raise HTTPException(
@@ -88,6 +84,7 @@ class ProblemService:
             os.makedirs(os.path.dirname(path), exist_ok=True)
             with open(path, "w") as f:
                 f.write(content)
+            ProblemStore.put_file(q_num, filename, content, ProblemService.QUESTIONS_DIR)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Error writing to {filename}: {str(e)}"
@@ -172,6 +169,8 @@ class ProblemService:
             raise HTTPException(
                 status_code=500, detail=f"Error updating problem {q_num}: {str(e)}"
             )
+        finally:
+            ResultCache.invalidate_question(q_num)
 
     @staticmethod
     def delete_problem(q_num: int):
@@ -183,6 +182,8 @@ class ProblemService:
 
         try:
             shutil.rmtree(problem_path)
+            # Remaining problems are renumbered, so no stored result is known to be valid
+            ResultCache.clear()
 
             # Get remaining problems and sort them
             all_problems = sorted(
@@ -200,6 +201,7 @@ class ProblemService:
 
                 if old_q_num != idx:  # Rename only if needed
                     shutil.move(old_path, new_path)
+            ProblemStore.invalidate()
 
         except Exception as e:
             raise HTTPException(
@@ -1,31 +1,61 @@
-"""Service to handle password generation and management"""
+"""Service to load the questions and documentation served to teams"""
 
+import gzip
+import hashlib
 import os
+import threading
+from dataclasses import dataclass
 from typing import List
 
+try:
+    import brotli
+except ImportError:  # Brotli is optional, clients fall back to gzip without it
+    brotli = None
+
 from ..models import QuestionsPublic, Question, Document
+from .problem_store import ProblemStore
+
+__authors__ = ["Nicholas Almy", "Andrew Lockard"]
+
+
+@dataclass(frozen=True)
+class QuestionBundle:
+    """The questions and global docs serialized once, ready to be sent as is"""
 
-__authors__ = ["Nicholas Almy"]
+    etag: str
+    body: bytes
+    # Maps a Content-Encoding (e.g. "gzip") to the body compressed with it
+    encodings: dict[str, bytes]
 
 
 class QuestionService:
-    """A Singleton service to handle questions for the competition"""
+    """A Singleton service to handle questions for the competition
+
+    Questions are read from ProblemStore, which tells the service to forget them whenever a
+    problem changes.
+    """
 
     _questions: QuestionsPublic = None
+    _bundle: QuestionBundle | None = None
+    _lock = threading.Lock()
 
     def __init__(self):
         pass
 
-    def get_question_count(self) -> int:
-        """Returns the number of questions"""
-        if self._questions != None:
-            return len(self._questions.questions)
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forgets the loaded questions, they are reloaded on next use"""
+        with cls._lock:
+            cls._questions = None
+            cls._bundle = None
 
-        q_count = 1
-        while os.path.exists(f"es_files/questions/q{q_count}"):
+    def get_question_count(self) -> int:
+        """Returns the number of questions, counting up from q1 until one is missing"""
+        problems = ProblemStore.get_problems()
+        q_count = 0
+        while q_count + 1 in problems:
             q_count += 1
-
-        return q_count - 1
+        return q_count
 
     def get_questions(self) -> QuestionsPublic:
         """Get all the questions for the competition"""
@@ -33,12 +63,45 @@ class QuestionService:
             QuestionService._questions = self.load_questions()
         return QuestionService._questions
 
+    def get_bundle(self) -> QuestionBundle:
+        """Gets the questions and global docs as JSON, precompressed and with an ETag
+
+        The bundle is built once and shared by every request. It is rebuilt after a problem
+        changes in ProblemStore (written through ProblemService, or edited by hand while the
+        store's watcher runs) or a global doc is changed through DocsService.
+
+        Returns:
+            QuestionBundle: The current bundle
+        """
+        bundle = QuestionService._bundle
+        if bundle is not None:
+            return bundle
+
+        with QuestionService._lock:
+            if QuestionService._bundle is None:
+                questions = self.load_questions()
+                QuestionService._questions = questions
+                QuestionService._bundle = self.build_bundle(questions)
+            return QuestionService._bundle
+
+    @staticmethod
+    def build_bundle(questions: QuestionsPublic) -> QuestionBundle:
+        """Serializes the questions and compresses them with every supported encoding"""
+        body = questions.model_dump_json().encode("utf-8")
+        encodings = {"gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            encodings["br"] = brotli.compress(body, quality=11)
+        return QuestionBundle(
+            etag=f'"{hashlib.sha256(body).hexdigest()}"',
+            body=body,
+            encodings=encodings,
+        )
+
     def isQuestionDir(self, directory: str) -> bool:
         return directory.startswith("q") and directory[1:].isdigit()
 
     def hasStarterCode(self, question_num: int) -> bool:
-        starter_code_path = f"es_files/questions/q{question_num}/starter.py"
-        return os.path.exists(starter_code_path)
+        return ProblemStore.get_file(question_num, "starter.py") is not None
 
     def read_document(self, path: str, title: str) -> Document:
         try:
@@ -64,11 +127,8 @@ class QuestionService:
 
     def load_question(self, question_num: int) -> Question:
         # Load the question
-        question_path = f"es_files/questions/q{question_num}/prompt.md"
-        try:
-            with open(question_path, "r") as f:
-                question = f.read()
-        except FileNotFoundError:
+        question = ProblemStore.get_file(question_num, "prompt.md")
+        if question is None:
             raise FileNotFoundError(
                 f"Question {question_num} does not contain a prompt.md file"
             )
@@ -85,29 +145,21 @@ class QuestionService:
         )
 
     def load_starter_code(self, question_num: int) -> str:
-        starter_code_path = f"es_files/questions/q{question_num}/starter.py"
-        with open(starter_code_path, "r") as f:
-            return f.read()
+        starter_code = ProblemStore.get_file(question_num, "starter.py")
+        if starter_code is None:
+            raise FileNotFoundError(
+                f"Question {question_num} does not contain a starter.py file"
+            )
+        return starter_code
 
     def load_questions(self):
-        """Load all the questions from the questions directory"""
-        # Get the current working directory
-        questions_dir = "es_files/questions"
+        """Load all the questions from ProblemStore"""
         questions: List[Question] = []
-        # Walk through the directory and load all the questions (questions/q1/q1.md)
-        for root, dirs, files in os.walk(questions_dir):
-            for dir in dirs:
-                # Skip non-question directories
-                if not self.isQuestionDir(dir):
-                    continue
-                question_num = int(dir[1:])
-                try:
-                    question = self.load_question(question_num)
-                    questions.append(question)
-                except FileNotFoundError:
-                    pass
-                except Exception as e:
-                    raise e
+        for question_num in ProblemStore.get_problem_numbers():
+            try:
+                questions.append(self.load_question(question_num))
+            except FileNotFoundError:
+                pass  # Skip questions without a prompt
 
         # Load the global documents
         global_docs = self.load_global_docs()
@@ -116,4 +168,8 @@ class QuestionService:
 
     def refresh_questions(self):
         """Refresh the questions"""
+        QuestionService.invalidate()
         QuestionService._questions = self.load_questions()
+
+
+ProblemStore.add_listener(QuestionService.invalidate)
@@ -0,0 +1,73 @@
+"""Service to remember Judge0 results for submissions that have already been run"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+__authors__ = ["Andrew Lockard"]
+
+
+class ResultCache:
+    """A process wide, size bounded cache of autograder results.
+
+    Entries are keyed by a hash of the question's test package (test file and autograder utils)
+    and of the submitted source. Running identical code against identical tests can then skip
+    Judge0 entirely, without packaging the submission first. The least recently used entry is evicted
+    once MAX_ENTRIES is reached.
+    """
+
+    MAX_ENTRIES = 2048
+
+    # Maps test package and submission hash to (question number, test results)
+    _entries: OrderedDict[str, tuple[int, list[dict]]] = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(test_hash: str, content_hash: str) -> str:
+        """Returns the cache key for running a submission against a test package
+
+        Args:
+            test_hash (str): hash of the question's test package
+            content_hash (str): hash of the submitted source
+        """
+        return hashlib.sha256(f"{test_hash}:{content_hash}".encode()).hexdigest()
+
+    @classmethod
+    def get(cls, key: str) -> list[dict] | None:
+        """Returns the stored results for a key, or None if they are not cached"""
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return None
+            cls._entries.move_to_end(key)
+            return entry[1]
+
+    @classmethod
+    def put(cls, key: str, question_num: int, test_results: list[dict]) -> None:
+        """Stores the results for a key, evicting the least recently used entries if full"""
+        with cls._lock:
+            cls._entries[key] = (question_num, test_results)
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def invalidate_question(cls, question_num: int) -> None:
+        """Removes every stored result for a question, used when its tests are edited"""
+        with cls._lock:
+            stale = [
+                key for key, entry in cls._entries.items() if entry[0] == question_num
+            ]
+            for key in stale:
+                del cls._entries[key]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Removes every stored result"""
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def size(cls) -> int:
+        """Returns the number of stored results"""
+        return len(cls._entries)
@@ -0,0 +1,213 @@
+"""Service to run autograder tests locally in a pool of warm, resource limited worker processes"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from dataclasses import dataclass
+
+from ..config import (
+    SANDBOX_CPU_SECONDS,
+    SANDBOX_FIRST_UID,
+    SANDBOX_MEMORY_MB,
+    SANDBOX_TIMEOUT,
+    SANDBOX_WORKERS,
+)
+
+__authors__ = ["Andrew Lockard"]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Worker:
+    process: asyncio.subprocess.Process
+    directory: str  # The worker's jail, removed once it is done
+
+
+class SandboxService:
+    """Local alternative to Judge0 for runs whose results are not trusted, like demo cases.
+
+    Keeps WORKERS Python processes started ahead of time with the autograder utils already
+    imported, see `sandbox_worker.py`. Each submission is sent over a pipe to an idle worker, which
+    exits once it is done while a replacement is started in the background.
+
+    Before running a submission a worker chroots into a read-only jail holding only the Python
+    installation, the system libraries and the packaged tests, in its own mount and network
+    namespaces. It then drops to a uid of its own, so workers cannot signal or trace each other,
+    and limits its CPU time, memory and child processes. This needs the server to run as root on
+    Linux; `start` refuses to start the pool otherwise.
+    """
+
+    WORKERS = SANDBOX_WORKERS
+    CPU_SECONDS = SANDBOX_CPU_SECONDS
+    MEMORY_MB = SANDBOX_MEMORY_MB
+    TIMEOUT = SANDBOX_TIMEOUT  # Wall clock seconds before a run is killed
+    UTILS_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "autograder_utils"
+    )
+    WORKER_PATH = os.path.join(os.path.dirname(__file__), "sandbox_worker.py")
+    FIRST_UID = SANDBOX_FIRST_UID
+    UIDS = 1000  # Size of the uid range, workers alive at the same time never share a uid
+
+    _loop: asyncio.AbstractEventLoop | None = None
+    _idle: list[_Worker] = []
+    _starting: set[asyncio.Task] = set()
+    _slots: asyncio.Semaphore | None = None
+    _spawned = 0  # Workers started so far, picks the next worker's uid
+
+    @classmethod
+    def _bind_loop(cls) -> None:
+        """Pipes and semaphores belong to an event loop, so reset shared state when the loop changes"""
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            cls._loop = loop
+            cls._idle = []
+            cls._starting = set()
+            cls._slots = asyncio.Semaphore(cls.WORKERS)
+
+    @classmethod
+    async def start(cls) -> None:
+        """Checks that workers can isolate themselves and starts warming up the pool
+
+        Must be called from the running event loop.
+        Raises:
+            RuntimeError: If workers cannot be isolated, e.g. the server is not running as root
+        """
+        cls._bind_loop()
+        cls._idle.append(await cls._spawn())
+        cls._refill()
+
+    @classmethod
+    async def close(cls) -> None:
+        """Stops every idle and starting worker"""
+        if cls._loop is not asyncio.get_running_loop():
+            return
+        for task in list(cls._starting):
+            task.cancel()
+        await asyncio.gather(*cls._starting, return_exceptions=True)
+        idle, cls._idle = cls._idle, []
+        for worker in idle:
+            await cls._stop(worker)
+
+    async def run(self, submission_zip: bytes) -> list[dict]:
+        """Runs a single packaged submission on a warm worker
+
+        Args:
+            submission_zip: base64 encoded zip of the autograder utils, test cases and submission
+        Returns:
+            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+        Raises:
+            RuntimeError: If the worker could not run the submission
+        """
+        self._bind_loop()
+        async with SandboxService._slots:
+            worker = SandboxService._idle.pop() if SandboxService._idle else None
+            self._refill()
+            if worker is None:
+                worker = await self._spawn()
+            try:
+                return await self._run_on(worker, submission_zip)
+            finally:
+                await self._stop(worker)
+
+    async def _run_on(self, worker: _Worker, submission_zip: bytes) -> list[dict]:
+        process = worker.process
+        try:
+            process.stdin.write(submission_zip)
+            await process.stdin.drain()
+            process.stdin.close()
+            output = await asyncio.wait_for(process.stdout.read(), self.TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                "The sandbox did not finish running the submission in time."
+            )
+        except (BrokenPipeError, ConnectionResetError):
+            output = b""
+
+        try:
+            return json.loads(output)["tests"]
+        except (KeyError, TypeError, json.JSONDecodeError):
+            returncode = await process.wait()
+            if returncode == -signal.SIGXCPU:
+                raise RuntimeError("The submission went over its CPU time limit.")
+            raise RuntimeError(
+                f"The sandbox could not run the autograder: worker exited with code {returncode}"
+            )
+
+    @classmethod
+    def _refill(cls) -> None:
+        """Starts workers in the background until WORKERS are idle or starting"""
+        for _ in range(cls.WORKERS - len(cls._idle) - len(cls._starting)):
+            task = asyncio.create_task(cls._spawn())
+            cls._starting.add(task)
+            task.add_done_callback(cls._started)
+
+    @classmethod
+    def _started(cls, task: asyncio.Task) -> None:
+        cls._starting.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("Could not start a sandbox worker: %s", task.exception())
+            return
+        cls._idle.append(task.result())
+
+    @classmethod
+    async def _spawn(cls) -> _Worker:
+        """Starts a worker and waits until it is ready for a submission"""
+        directory = tempfile.mkdtemp(prefix="sandbox-")
+        uid = cls.FIRST_UID + cls._spawned % cls.UIDS
+        cls._spawned += 1
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-I",
+                "-B",  # Never write bytecode into the autograder utils that get packaged
+                cls.WORKER_PATH,
+                cls.UTILS_DIR,
+                directory,
+                str(cls.CPU_SECONDS),
+                str(cls.MEMORY_MB),
+                str(uid),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        worker = _Worker(process, directory)
+        try:
+            status = (await process.stdout.readline()).strip()
+        except BaseException:
+            await cls._stop(worker)
+            raise
+        if status != b"ready":
+            await cls._stop(worker)
+            if status.startswith(b"unisolated"):
+                reason = status.decode(errors="replace")[len("unisolated ") :]
+                raise RuntimeError(
+                    f"Sandbox workers cannot isolate themselves ({reason}), "
+                    "DEMO_EXECUTOR=local needs the server to run as root on Linux"
+                )
+            raise RuntimeError("Sandbox worker exited before it was ready")
+        return worker
+
+    @staticmethod
+    async def _stop(worker: _Worker) -> None:
+        """Kills a worker if it is still running and removes its directory"""
+        if worker.process.returncode is None:
+            # Process.kill() reaps a worker that already exited, racing asyncio's child watcher.
+            # Until the watcher reaps it the pid cannot be reused, so signalling it is safe.
+            try:
+                os.kill(worker.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        await worker.process.wait()
+        shutil.rmtree(worker.directory, ignore_errors=True)
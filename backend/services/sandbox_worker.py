@@ -0,0 +1,164 @@
+"""A sandbox worker, started by SandboxService as
+`python sandbox_worker.py <utils dir> <jail dir> <cpu seconds> <memory mb> <uid>`
+
+The worker imports the autograder utils, then moves into new mount and network namespaces and
+builds a jail in `<jail dir>` holding read-only copies of the Python installation and system
+libraries, before reporting `ready` on stdout. If it cannot isolate itself it reports
+`unisolated <reason>` instead and exits.
+
+It then reads a base64 encoded submission zip from stdin until EOF, extracts it into the jail's
+`/work` directory and makes the whole jail read-only. Finally it chroots into the jail, drops to
+`<uid>` with no supplementary groups, limits its own resources, runs the zip's `*_cases.py`
+tests like `run_tests.py` does and writes the runner's JSON to stdout before exiting. Every
+worker runs exactly one submission.
+
+This file is run as a script, so it must only import the standard library.
+"""
+
+import base64
+import ctypes
+import io
+import os
+import resource
+import sys
+import unittest
+import zipfile
+
+__authors__ = ["Andrew Lockard"]
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWNET = 0x40000000
+
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_REMOUNT = 0x20
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+
+PR_SET_NO_NEW_PRIVS = 38
+
+# Shared libraries extension modules of the standard library may load
+LIBRARY_DIRS = ("/lib", "/lib64", "/usr/lib", "/usr/lib64")
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+def _check(result: int, action: str) -> None:
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"{action} failed: {os.strerror(errno)}")
+
+
+def _encode(value: str | None) -> bytes | None:
+    return None if value is None else os.fsencode(value)
+
+
+def mount(source, target, fstype, flags: int, data=None) -> None:
+    """Calls mount(2), arguments that do not apply to the kind of mount are None"""
+    _check(
+        _libc.mount(
+            _encode(source),
+            _encode(target),
+            _encode(fstype),
+            ctypes.c_ulong(flags),
+            _encode(data),
+        ),
+        f"mounting {target}",
+    )
+
+
+def build_jail(jail: str, memory_mb: int) -> None:
+    """Moves the worker into new mount and network namespaces and builds its jail
+
+    The jail is a private tmpfs holding read-only bind mounts of the Python installation and the
+    system libraries, plus an empty `/work` directory for the submission.
+    """
+    _check(_libc.unshare(CLONE_NEWNS | CLONE_NEWNET), "unshare")
+    # Keep the mounts below from propagating back to the server's namespace
+    mount(None, "/", None, MS_REC | MS_PRIVATE)
+    mount(
+        "sandbox", jail, "tmpfs", MS_NOSUID | MS_NODEV, f"size={memory_mb}m,mode=755"
+    )
+
+    bound = []
+    for path in sorted({sys.base_prefix, sys.prefix, *LIBRARY_DIRS}):
+        if not os.path.lexists(path) or any(
+            path == done or path.startswith(done + "/") for done in bound
+        ):
+            continue
+        target = jail + path
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.islink(path):
+            # e.g. /lib -> usr/lib on merged /usr systems
+            os.symlink(os.readlink(path), target)
+            continue
+        os.makedirs(target, exist_ok=True)
+        mount(path, target, None, MS_BIND | MS_REC)
+        mount(None, target, None, MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID)
+        bound.append(path)
+    os.mkdir(os.path.join(jail, "work"))
+
+
+def enter_jail(jail: str, uid: int) -> None:
+    """Makes the jail read-only, chroots into its /work directory and drops to uid"""
+    mount(None, jail, None, MS_REMOUNT | MS_RDONLY | MS_NOSUID | MS_NODEV)
+    os.chroot(jail)
+    os.chdir("/work")
+    os.setgroups([])
+    os.setgid(uid)
+    os.setuid(uid)
+    _check(_libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl")
+
+
+def limit_resources(cpu_seconds: int, memory_mb: int) -> None:
+    """Limits the CPU time, memory, file sizes and child processes of the worker"""
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+
+def main() -> None:
+    utils_dir, jail, cpu_seconds, memory_mb, uid = sys.argv[1:6]
+
+    # Results are written to the original stdout, anything the submission prints is dropped
+    channel = os.fdopen(os.dup(1), "w")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+    # Warm up: everything a run needs is imported before the submission arrives
+    sys.path.insert(0, utils_dir)
+    import decorators  # noqa: F401
+    from json_test_runner import JSONTestRunner
+    from run_tests import TEST_TIMEOUT
+
+    try:
+        build_jail(jail, int(memory_mb))
+    except OSError as e:
+        channel.write(f"unisolated {e.strerror}\n")
+        channel.flush()
+        os._exit(1)
+    channel.write("ready\n")
+    channel.flush()
+
+    submission_zip = base64.b64decode(sys.stdin.buffer.read())
+    with zipfile.ZipFile(io.BytesIO(submission_zip)) as archive:
+        archive.extractall(os.path.join(jail, "work"))
+    enter_jail(jail, int(uid))
+    limit_resources(int(cpu_seconds), int(memory_mb))
+    sys.path[0] = "/work"
+
+    suite = unittest.defaultTestLoader.discover(".", pattern="*_cases.py")
+    JSONTestRunner(stream=channel, visibility="visible", timeout=TEST_TIMEOUT).run(
+        suite
+    )
+    channel.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
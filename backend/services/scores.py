@@ -0,0 +1,390 @@
+"""Service to grade submissions incrementally and serve scores from the database"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Callable, Optional
+
+import polars as pl
+from fastapi import Depends
+from sqlmodel import Session, select, delete, and_, or_, func
+
+from ..db import db_session
+from ..models import Team, ScoredTest, SubmissionResult
+from .questions import QuestionService
+from .submissions import SubmissionService
+
+__authors__ = ["Andrew Lockard"]
+
+# Maps (team name, question number) to (team id, fingerprint, submission id) of pairs to regrade
+StalePairs = dict[tuple[str, int], tuple[int, str, Optional[int]]]
+
+
+class ScoreService:
+    """Service that keeps graded results in the SubmissionResult table.
+
+    Only (team, question) pairs whose submission or tests changed since they were last graded
+    are sent to Judge0 again, everything else is served straight from the table.
+    """
+
+    DEFAULT_WORKERS = 8
+
+    # The last built scoreboard as (results version, ETag, JSON body), shared by every request
+    _scoreboard: tuple[tuple, str, bytes] | None = None
+    _scoreboard_lock = threading.Lock()
+
+    def __init__(self, session: Session = Depends(db_session)):
+        self._session = session
+        self._sub_svc = SubmissionService(session)
+        self._q_svc = QuestionService()
+
+    async def refresh(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Regrades every (team, question) pair whose fingerprint changed since it was last graded
+
+        Args:
+            workers (int): Maximum number of submissions graded at the same time
+            progress: Optional callable taking (completed, total), called as each regrade finishes
+        Returns:
+            int: The number of (team, question) pairs that were regraded
+        """
+        team_ids, q_count, stale = await self._sub_svc.run_blocking(self._find_stale)
+        results = await self.grade_all(list(stale), workers, progress)
+        await self._sub_svc.run_blocking(
+            self._store_results, team_ids, q_count, stale, results
+        )
+        return len(stale)
+
+    def _find_stale(self) -> tuple[list[int], int, StalePairs]:
+        """Returns the team ids, the question count and the pairs refresh needs to regrade"""
+        teams = self._session.exec(select(Team)).all()
+        q_count = self._q_svc.get_question_count()
+        stored = self.get_fingerprints()
+        latest = self._sub_svc.get_latest_hashes()
+
+        stale: StalePairs = {}
+        for team in teams:
+            for q_num in range(1, q_count + 1):
+                submission_id, content_hash = latest.get((team.id, q_num), (None, None))
+                fingerprint = self._sub_svc.fingerprint(q_num, content_hash)
+                if stored.get((team.id, q_num)) != fingerprint:
+                    stale[(team.name, q_num)] = (team.id, fingerprint, submission_id)
+        return [team.id for team in teams], q_count, stale
+
+    def _store_results(
+        self,
+        team_ids: list[int],
+        q_count: int,
+        stale: StalePairs,
+        results: dict[tuple[str, int], list[ScoredTest]],
+    ) -> None:
+        """Replaces the stored results of every regraded pair"""
+        # Drop results of deleted teams and questions as well as the pairs being replaced
+        self._session.exec(
+            delete(SubmissionResult).where(
+                or_(
+                    SubmissionResult.team_id.not_in(team_ids),
+                    SubmissionResult.question_num > q_count,
+                )
+            )
+        )
+        for (team_name, q_num), (
+            team_id,
+            fingerprint,
+            submission_id,
+        ) in stale.items():
+            self._session.exec(
+                delete(SubmissionResult).where(
+                    and_(
+                        SubmissionResult.team_id == team_id,
+                        SubmissionResult.question_num == q_num,
+                    )
+                )
+            )
+            self._session.add_all(
+                SubmissionResult(
+                    team_id=team_id,
+                    submission_id=submission_id,
+                    fingerprint=fingerprint,
+                    **test.model_dump(),
+                )
+                for test in results[(team_name, q_num)]
+            )
+        self._session.commit()
+
+    async def grade_all(
+        self,
+        jobs: list[tuple[str, int]],
+        workers: int = DEFAULT_WORKERS,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict[tuple[str, int], list[ScoredTest]]:
+        """Grades every (team name, question number) pair with at most `workers` Judge0 jobs in flight.
+
+        Jobs in flight at the same time are sent to Judge0 together through its batch endpoint.
+
+        Args:
+            jobs (list[tuple[str, int]]): The (team name, question number) pairs to grade
+            workers (int): Maximum number of submissions graded at the same time
+            progress: Optional callable taking (completed, total), called as each job finishes
+        Returns:
+            dict[tuple[str, int], list[ScoredTest]]: The scored tests for each job
+        """
+        results: dict[tuple[str, int], list[ScoredTest]] = {}
+        in_flight = asyncio.Semaphore(max(1, workers))
+
+        async def grade(job: tuple[str, int]) -> None:
+            team_name, q_num = job
+            async with in_flight:
+                try:
+                    results[job] = await self._sub_svc.grade_submission(
+                        q_num, team_name
+                    )
+                except Exception as e:
+                    # A single failing job (e.g. Judge0 hiccup) should not sink the whole run
+                    results[job] = [
+                        ScoredTest(
+                            console_log="Failed to Run Grader: " + str(e),
+                            test_name=f"Question {q_num} Tests",
+                            question_num=q_num,
+                            score=0.0,
+                            max_score=0.0,
+                            error=str(e),
+                        )
+                    ]
+            if progress is not None:
+                progress(len(results), len(jobs))
+
+        await asyncio.gather(*(grade(job) for job in jobs))
+        return results
+
+    def count_failures(self) -> int:
+        """Returns how many stored (team, question) pairs could not be graded because their grader failed"""
+        return len(
+            self._session.exec(
+                select(SubmissionResult.team_id, SubmissionResult.question_num)
+                .where(SubmissionResult.error.is_not(None))
+                .distinct()
+            ).all()
+        )
+
+    def get_fingerprints(self) -> dict[tuple[int, int], str]:
+        """Returns the fingerprint each stored (team id, question number) pair was graded with"""
+        rows = self._session.exec(
+            select(
+                SubmissionResult.team_id,
+                SubmissionResult.question_num,
+                SubmissionResult.fingerprint,
+            ).distinct()
+        ).all()
+        return {(team_id, q_num): fingerprint for team_id, q_num, fingerprint in rows}
+
+    TEST_SCHEMA = {
+        "Team Number": pl.String,
+        "Question Number": pl.Int64,
+        "Test Name": pl.String,
+        "Score": pl.Float64,
+        "Max Score": pl.Float64,
+        "Wall Time": pl.Float64,
+        "CPU Time": pl.Float64,
+        "Peak RSS (KB)": pl.Int64,
+        "Test Output": pl.String,
+    }
+
+    def scan_tests(self) -> pl.LazyFrame:
+        """Returns every stored test result as a LazyFrame, in the format of scored_tests.csv
+
+        The rows are read into one buffer per column and turned into a single frame.
+        """
+        rows = self._session.exec(
+            select(
+                Team.name,
+                SubmissionResult.question_num,
+                SubmissionResult.test_name,
+                SubmissionResult.score,
+                SubmissionResult.max_score,
+                SubmissionResult.wall_time,
+                SubmissionResult.cpu_time,
+                SubmissionResult.peak_rss_kb,
+                SubmissionResult.console_log,
+            )
+            .join(Team, Team.id == SubmissionResult.team_id)
+            .order_by(Team.id, SubmissionResult.question_num, SubmissionResult.id)
+        ).all()
+        columns = list(zip(*rows)) or [[] for _ in self.TEST_SCHEMA]
+        return pl.LazyFrame(
+            dict(zip(self.TEST_SCHEMA, columns)), schema=self.TEST_SCHEMA
+        )
+
+    def get_test_table(self) -> pl.DataFrame:
+        """Returns every stored test result, in the format of scored_tests.csv"""
+        return self.scan_tests().collect()
+
+    def get_total_table(self) -> pl.DataFrame:
+        """Returns each team's total score, pass rate and rank, in the format of final_scores.csv
+
+        Teams with the same score share the highest rank among them.
+        """
+        return (
+            self.scan_tests()
+            .group_by("Team Number", maintain_order=True)
+            .agg(
+                pl.col("Score").sum(),
+                pl.col("Max Score").sum(),
+                _passed().sum().alias("Tests Passed"),
+                pl.len().alias("Tests"),
+            )
+            .with_columns(
+                (pl.col("Tests Passed") / pl.col("Tests")).alias("Pass Rate"),
+                pl.col("Score").rank("min", descending=True).cast(pl.Int64).alias("Rank"),
+            )
+            .collect()
+        )
+
+    def get_question_table(self) -> pl.DataFrame:
+        """Returns the average score and pass rate of each question over all teams"""
+        return (
+            self.scan_tests()
+            .group_by("Question Number", "Team Number")
+            .agg(
+                pl.col("Score").sum(),
+                pl.col("Max Score").sum(),
+                _passed().sum().alias("Tests Passed"),
+                pl.len().alias("Tests"),
+            )
+            .group_by("Question Number")
+            .agg(
+                pl.len().alias("Teams"),
+                pl.col("Score").mean().alias("Average Score"),
+                pl.col("Max Score").max(),
+                (pl.col("Tests Passed").sum() / pl.col("Tests").sum()).alias("Pass Rate"),
+                (pl.col("Tests Passed") == pl.col("Tests"))
+                .sum()
+                .alias("Teams With Full Marks"),
+            )
+            .sort("Question Number")
+            .collect()
+        )
+
+    def get_test_stats_table(self) -> pl.DataFrame:
+        """Returns how many teams passed each test of each question, and how long it took them"""
+        return (
+            self.scan_tests()
+            .group_by("Question Number", "Test Name", maintain_order=True)
+            .agg(
+                _passed().sum().alias("Teams Passed"),
+                pl.len().alias("Teams"),
+                _passed().mean().alias("Pass Rate"),
+                pl.col("Wall Time").median().alias("Median Wall Time"),
+                pl.col("Wall Time").max().alias("Max Wall Time"),
+                pl.col("Peak RSS (KB)").max().alias("Max Peak RSS (KB)"),
+            )
+            .sort("Question Number", maintain_order=True)
+            .collect()
+        )
+
+    def get_scoreboard(self) -> tuple[str, bytes]:
+        """Returns the scoreboard as JSON along with its ETag
+
+        The scoreboard is only rebuilt when the stored results changed since it was last built,
+        whether they were regraded by the server or by the grade_submissions script.
+
+        Returns:
+            tuple[str, bytes]: The ETag and the JSON encoded list of scoreboard rows
+        """
+        version = self.get_results_version()
+        with ScoreService._scoreboard_lock:
+            cached = ScoreService._scoreboard
+            if cached is not None and cached[0] == version:
+                return cached[1], cached[2]
+
+            body = json.dumps(self.build_scoreboard()).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()}"'
+            ScoreService._scoreboard = (version, etag, body)
+            return etag, body
+
+    @classmethod
+    def invalidate_scoreboard(cls) -> None:
+        """Drops the stored scoreboard so the next request rebuilds it, used when teams change"""
+        with cls._scoreboard_lock:
+            cls._scoreboard = None
+
+    def get_results_version(self) -> tuple:
+        """Returns a value that changes whenever results are regraded or deleted, or teams are
+        added or deleted
+
+        Regrading replaces rows with newer ones, raising the largest id and grading time, and
+        deleting rows lowers the count. Teams are counted the same way, so teams added or deleted
+        by a script show up too; changes to existing teams go through invalidate_scoreboard.
+        """
+        return tuple(
+            self._session.exec(
+                select(
+                    func.count(SubmissionResult.id),
+                    func.max(SubmissionResult.id),
+                    func.max(SubmissionResult.graded_at),
+                    select(func.count(Team.id)).scalar_subquery(),
+                    select(func.max(Team.id)).scalar_subquery(),
+                )
+            ).one()
+        )
+
+    def build_scoreboard(self) -> list[dict]:
+        """Builds the scoreboard rows, ordered by rank and then team number
+
+        Each row holds a team's rank, total score, score per question and when its results were
+        last graded. Tied teams share the highest rank among them.
+        """
+        totals = self.get_total_table().sort("Rank", "Team Number")
+        by_question = (
+            self.scan_tests()
+            .group_by("Team Number", "Question Number")
+            .agg(pl.col("Score").sum())
+            .sort("Question Number")
+            .collect()
+        )
+        question_scores: dict[str, dict[str, float]] = {}
+        for team_name, q_num, score in by_question.iter_rows():
+            question_scores.setdefault(team_name, {})[str(q_num)] = score
+
+        last_graded = dict(
+            self._session.exec(
+                select(Team.name, func.max(SubmissionResult.graded_at))
+                .join(Team, Team.id == SubmissionResult.team_id)
+                .group_by(Team.name)
+            ).all()
+        )
+
+        return [
+            {
+                "Rank": row["Rank"],
+                "Team Number": row["Team Number"],
+                "Score": row["Score"],
+                "Max Score": row["Max Score"],
+                "Question Scores": question_scores.get(row["Team Number"], {}),
+                "Last Updated": last_graded[row["Team Number"]].isoformat(),
+            }
+            for row in totals.iter_rows(named=True)
+        ]
+
+    @staticmethod
+    def write_csv(frame: pl.LazyFrame | pl.DataFrame, file: str) -> None:
+        """Writes a frame to a CSV file, streaming it when the query allows
+
+        Args:
+            frame: The frame to write
+            file (str): Path of the CSV file
+        """
+        try:
+            frame.lazy().sink_csv(file)
+        except pl.exceptions.InvalidOperationError:
+            # Some queries (e.g. ranking) cannot run on the streaming engine yet
+            frame.lazy().collect().write_csv(file)
+
+
+def _passed() -> pl.Expr:
+    """Expression that is true for the rows of tests that passed"""
+    return pl.col("Test Output") == "Passed"
@@ -2,11 +2,13 @@
 
 from datetime import datetime
 from typing import List, Optional
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, select, delete, update
 from ..models import Team, SessionPublic, Session_Obj
 from ..db import db_session
 from fastapi import Depends
 from .exceptions import ResourceNotFoundException, ResourceNotAllowedException
+from .identity_cache import IdentityCache
+from .session_schedule import SessionSchedule
 
 __authors__ = ["Michelle Nguyen", "Tsering Lama"]
 
@@ -26,26 +28,15 @@ class Session_ObjService:
         if not session_obj:
             raise ResourceNotFoundException("Session", session_id)
 
-        return SessionPublic(
-            id=session_obj.id,
-            name=session_obj.name,
-            start_time=session_obj.start_time,
-            end_time=session_obj.end_time,
-            teams=[team.id for team in session_obj.teams],
-        )
+        return self._to_public(session_obj)
 
     def get_all_session_objs(self) -> List[SessionPublic]:
-        """Gets all sessions"""
+        """Gets all sessions, reading every session's teams with one query"""
         sessions = self._session.exec(select(Session_Obj)).all()
+        team_ids = self._get_team_ids([session.id for session in sessions])
 
         return [
-            SessionPublic(
-                id=session.id,
-                name=session.name,
-                start_time=session.start_time,
-                end_time=session.end_time,
-                teams=[team.id for team in session.teams],
-            )
+            self._to_public(session, team_ids.get(session.id, []))
             for session in sessions
         ]
 
@@ -68,6 +59,9 @@ class Session_ObjService:
         self._session.add(new_session)
         self._session.commit()
         self._session.refresh(new_session)
+        SessionSchedule.set_window(
+            new_session.id, new_session.start_time, new_session.end_time
+        )
 
         if session_data.teams:
             teams = self._session.exec(
@@ -76,14 +70,9 @@ class Session_ObjService:
             for team in teams:
                 team.session_id = new_session.id  # Assign session ID to teams
             self._session.commit()
+            IdentityCache.invalidate_teams(session_data.teams)
 
-        return SessionPublic(
-            id=new_session.id,
-            name=new_session.name,
-            start_time=new_session.start_time,
-            end_time=new_session.end_time,
-            teams=[team.id for team in new_session.teams],  # Return assigned team IDs
-        )
+        return self._to_public(new_session)
 
     def update_session_obj(
         self, session_id: int, session_data: Session_Obj
@@ -110,16 +99,13 @@ class Session_ObjService:
         )
 
         self._session.commit()
-        self._session.refresh(session_obj)
-
-        return SessionPublic(
-            id=session_obj.id,
-            name=session_obj.name,
-            start_time=session_obj.start_time,
-            end_time=session_obj.end_time,
-            teams=[team.id for team in session_obj.teams],  # Return assigned team IDs
+        IdentityCache.invalidate_session(session_id)
+        SessionSchedule.set_window(
+            session_id, session_obj.start_time, session_obj.end_time
         )
 
+        return self._to_public(session_obj)
+
     def delete_session_obj(self, session_id: int) -> bool:
         """Deletes a session object"""
         session_obj = self._session.exec(
@@ -136,6 +122,8 @@ class Session_ObjService:
 
         self._session.delete(session_obj)
         self._session.commit()
+        IdentityCache.invalidate_session(session_id)
+        SessionSchedule.remove(session_id)
         return True
 
     def delete_all_session_objs(self):
@@ -150,107 +138,186 @@ class Session_ObjService:
 
         self._session.exec(delete(Session_Obj))
         self._session.commit()
+        IdentityCache.clear()
+        SessionSchedule.clear()
 
     def add_teams_to_session(
         self, session_id: int, team_ids: List[int]
     ) -> SessionPublic:
-        """Add teams to an existing session if they exist and are not assigned elsewhere."""
-
-        # Check if session exists
-        session_obj = self._session.exec(
-            select(Session_Obj).where(Session_Obj.id == session_id)
-        ).first()
-
-        if not session_obj:
-            raise ResourceNotFoundException("Session", session_id)
-
-        # Get teams to be added
-        teams = self._session.exec(select(Team).where(Team.id.in_(team_ids))).all()
-
-        # Check if all provided team IDs exist
-        found_ids = {team.id for team in teams}
-        missing_ids = [tid for tid in team_ids if tid not in found_ids]
-        if missing_ids:
-            raise ResourceNotFoundException("Team(s)", missing_ids)
-
-        # Identify teams already assigned to another session
-        already_assigned = [
-            team.id
-            for team in teams
-            if team.session_id and team.session_id != session_id
-        ]
-
-        if already_assigned:
-            raise ResourceNotAllowedException(
-                f"Team(s) with IDs {already_assigned} are already assigned to another session."
+        """Add teams to an existing session if they exist and are not assigned elsewhere.
+
+        The teams are assigned with a single UPDATE that only matches unassigned teams of an
+        existing session, the reason is only looked up if it does not match every team.
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        assigned = self._session.exec(
+            update(Team)
+            .where(
+                Team.id.in_(team_ids),
+                Team.session_id.is_(None),
+                self._session_exists(session_id),
             )
-
-        # Identify teams that are already in the session
-        existing_teams = {team.id for team in session_obj.teams}
-        duplicate_teams = [tid for tid in team_ids if tid in existing_teams]
-
-        if duplicate_teams:
+            .values(session_id=session_id)
+        ).rowcount
+
+        if assigned != len(team_ids):
+            self._session.rollback()
+            current = self._get_assignments([session_id], team_ids)
+
+            # Identify teams already assigned to another session
+            already_assigned = [
+                tid for tid in team_ids if current[tid] not in (None, session_id)
+            ]
+            if already_assigned:
+                raise ResourceNotAllowedException(
+                    f"Team(s) with IDs {already_assigned} are already assigned to another session."
+                )
+
+            # Identify teams that are already in the session
+            duplicate_teams = [tid for tid in team_ids if current[tid] == session_id]
             raise ResourceNotAllowedException(
                 f"Team(s) with IDs {duplicate_teams} are already in this session."
             )
 
-        # Add teams to session
-        for team in teams:
-            if team.session_id is None:  # Only update unassigned teams
-                team.session_id = session_id
-
         self._session.commit()
-        self._session.refresh(session_obj)
-
-        return SessionPublic(
-            id=session_obj.id,
-            name=session_obj.name,
-            start_time=session_obj.start_time,
-            end_time=session_obj.end_time,
-            teams=[team.id for team in session_obj.teams],
-        )
+        IdentityCache.invalidate_teams(team_ids)
+        return self._get_public(session_id)
 
     def remove_teams_from_session(
         self, session_id: int, team_ids: List[int] | None
     ) -> SessionPublic:
-        """Remove teams from an existing session if they exist in that session."""
-
-        # Check if session exists
-        session_obj = self._session.exec(
-            select(Session_Obj).where(Session_Obj.id == session_id)
-        ).first()
-
-        if not session_obj:
-            raise ResourceNotFoundException("Session", session_id)
-
-        # Get teams to be removed
-        teams = self._session.exec(select(Team).where(Team.id.in_(team_ids))).all()
-
-        # Check if all provided team IDs exist
-        found_ids = {team.id for team in teams}
-        missing_ids = [tid for tid in team_ids if tid not in found_ids]
-        if missing_ids:
-            raise ResourceNotFoundException("Team(s)", missing_ids)
-
-        # Ensure all teams belong to the session before removal
-        not_in_session = [team.id for team in teams if team.session_id != session_id]
-
-        if not_in_session:
+        """Remove teams from an existing session if they exist in that session.
+
+        The teams are unassigned with a single UPDATE that only matches teams of the session.
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        removed = self._session.exec(
+            update(Team)
+            .where(Team.id.in_(team_ids), Team.session_id == session_id)
+            .values(session_id=None)
+        ).rowcount
+
+        if removed != len(team_ids):
+            self._session.rollback()
+            current = self._get_assignments([session_id], team_ids)
+            not_in_session = [tid for tid in team_ids if current[tid] != session_id]
             raise ResourceNotAllowedException(
                 f"Team(s) with IDs {not_in_session} are not in this session."
             )
 
-        # Remove teams from session (set session_id to None)
-        for team in teams:
-            team.session_id = None
+        self._session.commit()
+        IdentityCache.invalidate_teams(team_ids)
+        return self._get_public(session_id)
+
+    def move_teams(
+        self, from_session_id: int, to_session_id: int, team_ids: List[int]
+    ) -> List[SessionPublic]:
+        """Moves teams from one session to another in a single UPDATE
+
+        Either every team is moved or, if any of them is not in the first session, none are.
+        Args:
+            from_session_id (int): id of the session the teams are in
+            to_session_id (int): id of the session to move them to
+            team_ids (List[int]): ids of the teams to move
+        Returns:
+            List[SessionPublic]: the session moved from and the session moved to
+        Raises:
+            ResourceNotFoundException: If either session or any of the teams does not exist
+            ResourceNotAllowedException: If any of the teams is not in the first session
+        """
+        team_ids = list(dict.fromkeys(team_ids))
+        moved = self._session.exec(
+            update(Team)
+            .where(
+                Team.id.in_(team_ids),
+                Team.session_id == from_session_id,
+                self._session_exists(to_session_id),
+            )
+            .values(session_id=to_session_id)
+        ).rowcount
+
+        if moved != len(team_ids):
+            self._session.rollback()
+            current = self._get_assignments([from_session_id, to_session_id], team_ids)
+            not_in_session = [
+                tid for tid in team_ids if current[tid] != from_session_id
+            ]
+            raise ResourceNotAllowedException(
+                f"Team(s) with IDs {not_in_session} are not in session {from_session_id}."
+            )
 
         self._session.commit()
-        self._session.refresh(session_obj)
+        IdentityCache.invalidate_teams(team_ids)
+        return [self._get_public(from_session_id), self._get_public(to_session_id)]
+
+    @staticmethod
+    def _session_exists(session_id: int):
+        """SQL condition that is true when the session exists"""
+        return select(Session_Obj.id).where(Session_Obj.id == session_id).exists()
+
+    def _get_assignments(
+        self, session_ids: List[int], team_ids: List[int]
+    ) -> dict[int, Optional[int]]:
+        """Gets the session each team is assigned to, used to explain a failed assignment
+
+        Args:
+            session_ids (List[int]): ids of the sessions that must exist
+            team_ids (List[int]): ids of the teams that must exist
+        Returns:
+            dict[int, Optional[int]]: session id by team id
+        Raises:
+            ResourceNotFoundException: If any of the sessions or teams does not exist
+        """
+        for session_id in session_ids:
+            if self._session.get(Session_Obj, session_id) is None:
+                raise ResourceNotFoundException("Session", session_id)
+
+        current = dict(
+            self._session.exec(
+                select(Team.id, Team.session_id).where(Team.id.in_(team_ids))
+            ).all()
+        )
+        missing_ids = [tid for tid in team_ids if tid not in current]
+        if missing_ids:
+            raise ResourceNotFoundException("Team(s)", missing_ids)
+        return current
+
+    def _get_public(self, session_id: int) -> SessionPublic:
+        """Gets the public response of a session by id"""
+        session_obj = self._session.get(Session_Obj, session_id)
+        if not session_obj:
+            raise ResourceNotFoundException("Session", session_id)
+        return self._to_public(session_obj)
+
+    def _get_team_ids(self, session_ids: List[int]) -> dict[int, List[int]]:
+        """Gets the ids of the teams in each session with a single query
+
+        Only the id columns are read, so no Team objects are loaded.
+        Args:
+            session_ids (List[int]): ids of the sessions
+        Returns:
+            dict[int, List[int]]: team ids by session id, sessions without teams are left out
+        """
+        rows = self._session.exec(
+            select(Team.session_id, Team.id)
+            .where(Team.session_id.in_(session_ids))
+            .order_by(Team.id)
+        ).all()
+        team_ids: dict[int, List[int]] = {}
+        for session_id, team_id in rows:
+            team_ids.setdefault(session_id, []).append(team_id)
+        return team_ids
 
+    def _to_public(
+        self, session_obj: Session_Obj, team_ids: Optional[List[int]] = None
+    ) -> SessionPublic:
+        """Builds the public response of a session, reading its team ids if they are not given"""
+        if team_ids is None:
+            team_ids = self._get_team_ids([session_obj.id]).get(session_obj.id, [])
         return SessionPublic(
             id=session_obj.id,
             name=session_obj.name,
             start_time=session_obj.start_time,
             end_time=session_obj.end_time,
-            teams=[team.id for team in session_obj.teams],  # Updated team list
+            teams=team_ids,
         )
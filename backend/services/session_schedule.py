@@ -0,0 +1,72 @@
+"""Service to answer whether a session's test is running without querying the database"""
+
+import threading
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from ..models import Session_Obj
+
+__authors__ = ["Andrew Lockard"]
+
+
+class SessionSchedule:
+    """A process wide index of every session's testing window.
+
+    The index is loaded from the database when the server starts (or on first use) and
+    Session_ObjService keeps it up to date whenever it writes a session, so checking whether a
+    team may take its test is a dictionary lookup.
+    """
+
+    # Maps session id to (start time, end time)
+    _windows: dict[int, tuple[datetime, datetime]] = {}
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, session: Session) -> None:
+        """Replaces the index with the windows of every session in the database"""
+        rows = session.exec(
+            select(Session_Obj.id, Session_Obj.start_time, Session_Obj.end_time)
+        ).all()
+        with cls._lock:
+            cls._windows = {
+                session_id: (start_time, end_time)
+                for session_id, start_time, end_time in rows
+            }
+            cls._loaded = True
+
+    @classmethod
+    def get_window(
+        cls, session_id: int, session: Session
+    ) -> tuple[datetime, datetime] | None:
+        """Gets the (start time, end time) of a session
+
+        Args:
+            session_id (int): id of the session
+            session (Session): database session used to load the index if it is not loaded yet
+        Returns:
+            tuple[datetime, datetime] | None: the window, or None if the session does not exist
+        """
+        if not cls._loaded:
+            cls.load(session)
+        return cls._windows.get(session_id)
+
+    @classmethod
+    def set_window(cls, session_id: int, start_time: datetime, end_time: datetime):
+        """Adds or updates a session's window"""
+        with cls._lock:
+            cls._windows[session_id] = (start_time, end_time)
+
+    @classmethod
+    def remove(cls, session_id: int) -> None:
+        """Removes a deleted session"""
+        with cls._lock:
+            cls._windows.pop(session_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Empties the index, it is reloaded from the database on next use"""
+        with cls._lock:
+            cls._windows = {}
+            cls._loaded = False
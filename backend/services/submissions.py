@@ -1,37 +1,88 @@
 """Service to handle the Submissions and interaction with Judge0 API"""
 
-import glob
 import os
 import json
 import base64
-import requests
+import asyncio
+import hashlib
+import threading
 
 from io import BytesIO  # Creates an in-memory "file"
-from zipfile import ZipFile
-from typing import Dict
-
-from backend.services.problems import ProblemService
-from ..models import Submission, ConsoleLog, Team, ScoredTest
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+from typing import Callable, Dict, Iterator, TypeVar
+
+from fastapi import Depends
+from sqlmodel import Session, select, delete, func
+
+from backend.services.executor import get_executor
+from backend.services.judge0 import Judge0Service
+from backend.services.result_cache import ResultCache
+from backend.services.suite_metadata import SuiteMetadataService
+from ..config import DEMO_EXECUTOR
+from ..db import db_session
+from ..models import (
+    Submission,
+    ConsoleLog,
+    Team,
+    ScoredTest,
+    SubmissionRecord,
+    SubmissionResult,
+)
 from backend.services.exceptions import ResourceNotFoundException
 
 __authors__ = ["Nicholas Almy", "Andrew Lockard", "Michelle Nguyen"]
 
+T = TypeVar("T")
+
 submissions_dir = "es_files/submissions"
 
 
 class SubmissionService:
-    """Service that deals with Submission CRUD operations"""
+    """Service that deals with Submission CRUD operations
 
-    def __init__(self):
-        self._max_points: dict[int, int] = (
-            {}
-        )  # Maps question numbers to their max amount of points
+    Every submission is stored as a SubmissionRecord row, which is what listing, exporting
+    and grading read. The latest submission is also mirrored to
+    `es_files/submissions/q{n}/{team}.py` for event supervisors to browse.
+    """
+
+    EXPORT_BATCH_SIZE = 100  # Submissions fetched from the database at a time when exporting
+
+    # Maps (utils dir, test file path) to (file fingerprint, zip of autograder files, zip hash)
+    _base_archives: dict[tuple[str, str], tuple[tuple, bytes, str]] = {}
+
+    def __init__(self, session: Session = Depends(db_session)):
+        self._session = session
+        # Sessions are not thread safe, so blocking work that uses it runs one call at a time
+        self._session_lock = threading.Lock()
+
+    async def run_blocking(self, func: Callable[..., T], *args) -> T:
+        """Runs database (or other blocking) work on a worker thread so the event loop stays free
+        Args:
+            func: the function to run, which may use this service's session
+            *args: the arguments to call it with
+        Returns:
+            What func returns
+        """
+
+        def locked() -> T:
+            with self._session_lock:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    def submit(self, team: Team, submission: Submission) -> SubmissionRecord:
+        """Store a submission and mirror it to the submission folder... Only supports Python files"""
+        record = SubmissionRecord(
+            team_id=team.id,
+            question_num=int(submission.question_num),
+            content=submission.file_contents,
+            content_hash=self.hash_content(submission.file_contents),
+        )
+        self._session.add(record)
+        self._session.commit()
 
-    def submit(self, team_name: str, submission: Submission) -> None:
-        """Submit a file to the submission folder... Only supports Python files"""
-        # sys.stdout.write(f"Debug: Team name is {team_name}")
         question_dir = f"q{submission.question_num}"
-        file = f"{team_name}.py"
+        file = f"{team.name}.py"
 
         # Create the submission directory if it doesn't exist
         if not os.path.exists(submissions_dir):
@@ -45,12 +96,14 @@ class SubmissionService:
         with open(os.path.join(submissions_dir, question_dir, file), "w") as f:
             f.write(submission.file_contents)
 
-    def submit_and_run(self, team: Team, submission: Submission) -> ConsoleLog:
+        return record
+
+    async def submit_and_run(self, team: Team, submission: Submission) -> ConsoleLog:
         """Submit a file to the submission folder, runs it and returns the console logs"""
-        self.submit(team.name, submission)
-        return self.run_submission(submission.question_num, team.name)
+        await self.run_blocking(self.submit, team, submission)
+        return await self.run_submission(int(submission.question_num), team.name)
 
-    def run_submission(self, question_num: int, team_name: str) -> ConsoleLog:
+    async def run_submission(self, question_num: int, team_name: str) -> ConsoleLog:
         """Run a submission on an Autograder and return the console logs
         Args:
             question_num (int): The question number
@@ -58,8 +111,7 @@ class SubmissionService:
         Returns:
             ConsoleLog: The console log of the submission
         """
-        submission_zip = self.package_submission(team_name, question_num, True)
-        test_results = self.send_to_judge0(submission_zip)
+        test_results = await self.run_tests(team_name, question_num, True)
         print(test_results)
         disclaimer = (
             "Note: These tests may or may not be used in final score calculation."
@@ -106,7 +158,9 @@ class SubmissionService:
         # Return the JSON string in the console_log field; adapt this if ConsoleLog is updated.
         return ConsoleLog(console_log=json.dumps(response_data))
 
-    def grade_submission(self, question_num: int, team_name: str) -> list[ScoredTest]:
+    async def grade_submission(
+        self, question_num: int, team_name: str
+    ) -> list[ScoredTest]:
         """Grades a students submission against test questions
         Args:
             question_num (int): the question number that we are trying to grade
@@ -117,8 +171,7 @@ class SubmissionService:
         """
 
         try:
-            submission_zip = self.package_submission(team_name, question_num, False)
-            test_results = self.send_to_judge0(submission_zip)
+            test_results = await self.run_tests(team_name, question_num, False)
         except ResourceNotFoundException as e:
             return [
                 ScoredTest(
@@ -126,13 +179,21 @@ class SubmissionService:
                     test_name=f"Question {question_num} Tests",
                     question_num=question_num,
                     score=0.0,
-                    max_score=self.get_max_points(question_num),
+                    max_score=await self.run_blocking(
+                        self.get_max_points, question_num
+                    ),
+                    error=str(e),
                 )
             ]
 
         # Tally up scores
         scored_tests = []
         for test in test_results:
+            usage = {
+                "wall_time": test.get("wall_time"),
+                "cpu_time": test.get("cpu_time"),
+                "peak_rss_kb": test.get("peak_rss_kb"),
+            }
             if test["status"] == "passed":
                 scored_tests.append(
                     ScoredTest(
@@ -141,6 +202,7 @@ class SubmissionService:
                         score=float(test["score"]),
                         max_score=float(test["max_score"]),
                         question_num=question_num,
+                        **usage,
                     )
                 )
 
@@ -152,6 +214,7 @@ class SubmissionService:
                         score=float(test["score"]),
                         max_score=float(test["max_score"]),
                         question_num=question_num,
+                        **usage,
                     )
                 )
 
@@ -162,55 +225,103 @@ class SubmissionService:
                         console_log=test["output"],
                         test_name=test["name"],
                         score=0,
-                        max_score=self.get_max_points(question_num),
+                        max_score=await self.run_blocking(
+                            self.get_max_points, question_num
+                        ),
                         question_num=question_num,
+                        **usage,
                     )
                 )
 
         return scored_tests
 
     def get_max_points(self, question_num: int) -> float:
-        """Gets the max amount of points for a question by scanning through the test_cases.py file"""
-        try:
-            return self._max_points[question_num]
-        except KeyError:
-            question_test_file = os.path.join(
-                "es_files", "questions", f"q{question_num}", "test_cases.py"
-            )
-            total_weight = 0.0
-            with open(question_test_file, "r") as f:
-                for line in f:
-                    if "@weight(" in line:
-                        start = line.index("(") + 1
-                        end = line.index(")")
-                        total_weight += float(line[start:end].strip())
-            self._max_points[question_num] = total_weight
-            return total_weight
-
-    def send_to_judge0(self, submission_zip: bytes):
-        """Sends the submission zip to judge0
+        """Gets the max amount of points for a question from the weights of its test cases
+
+        The test cases are read from the archive submissions are graded with, so the max points
+        always belong to the tests that were run.
+
+        Raises:
+            ResourceNotFoundException: If the utils or the question's test_cases.py do not exist
+        """
+        base_archive, _ = self.get_test_package(question_num, False)
+        with ZipFile(BytesIO(base_archive)) as archive:
+            source = archive.read("test_cases.py").decode("utf-8")
+        return SuiteMetadataService.parse(source).max_points
+
+    async def run_tests(
+        self, team_name: str, question_num: int, demo: bool
+    ) -> list[dict]:
+        """Packages and runs a team's latest submission, reusing stored results if the same code was run against the same tests before
         Args:
-            submission_zip: the zip file containing all code to be executed in the judge0 environment
+            team_name (str): the name of the team whose submission is run
+            question_num (int): the question number
+            demo (bool): whether to run the demo cases instead of the test cases
         Returns:
-            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+            The list of tests as returned by execute
+        Raises:
+            ResourceNotFoundException: If the tests or the submission do not exist
         """
-        res = requests.post(
-            "http://host.docker.internal:2358/submissions?wait=true",
-            headers={"Content-Type": "application/json"},
-            json={
-                "additional_files": submission_zip.decode("utf-8"),
-                "language_id": 89,
-            },
+        base_archive, test_hash, record = await self.run_blocking(
+            self._load_run, team_name, question_num, demo
         )
 
-        if res.status_code != 201:
-            raise RuntimeError(
-                "Judge0 did not return as expected, please ensure it is running and try again."
-            )
+        key = ResultCache.key(test_hash, record.content_hash)
+        test_results = ResultCache.get(key)
+        if test_results is None:
+            submission_zip = self.append_submission(base_archive, record.content)
+            test_results = await self.execute(submission_zip, demo)
+            ResultCache.put(key, question_num, test_results)
+        return test_results
+
+    def _load_run(
+        self, team_name: str, question_num: int, demo: bool
+    ) -> tuple[bytes, str, SubmissionRecord]:
+        """Reads the test package and latest submission run_tests needs"""
+        base_archive, test_hash = self.get_test_package(question_num, demo)
+        return (
+            base_archive,
+            test_hash,
+            self.get_latest_submission(team_name, question_num),
+        )
 
-        res_output = res.json()
-        test_results = json.loads(res_output["stdout"])
-        return test_results["tests"]
+    def fingerprint(self, question_num: int, content_hash: str | None) -> str:
+        """Returns a hash that changes whenever grading a submission could give a different result
+        Args:
+            question_num (int): the question number
+            content_hash (str | None): hash of the submitted code, None if nothing was submitted
+        Returns:
+            str: the hash of the tests and submission, or of the reason they cannot be run
+        """
+        try:
+            _, test_hash = self.get_test_package(question_num, False)
+        except ResourceNotFoundException as e:
+            return ResultCache.key(str(e), content_hash or "")
+        # The missing submission row's max score still depends on the tests
+        return ResultCache.key(test_hash, content_hash or "missing")
+
+    async def execute(self, submission_zip: bytes, demo: bool) -> list[dict]:
+        """Runs a packaged submission on the executor configured for its kind of run
+
+        Demo cases run on DEMO_EXECUTOR, grading always goes through Judge0.
+        Args:
+            submission_zip: the zip file containing all code to be executed
+            demo (bool): whether the zip holds the demo cases instead of the test cases
+        Returns:
+            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+        """
+        if demo and DEMO_EXECUTOR != "judge0":
+            return await get_executor(DEMO_EXECUTOR).run(submission_zip)
+        return await self.send_to_judge0(submission_zip)
+
+    async def send_to_judge0(self, submission_zip: bytes):
+        """Sends the submission zip to judge0 and waits for its results without blocking the event loop
+        Args:
+            submission_zip: the zip file containing all code to be executed in the judge0 environment
+        Returns:
+            A list of tests in this JSON form: {"name": str, "score": int, "max_score": int, "status": str, "output": str (only included if test failed)}
+        """
+        return await Judge0Service().run(submission_zip)
 
     def package_submission(
         self, team_name: str, question_number: int, demo=False
@@ -224,50 +335,152 @@ class SubmissionService:
         This submission file is built according to the specs on the judge0 documentation
         and includes autograder utils from the gradescope_utils package.
         """
+        base_archive, _ = self.get_test_package(question_number, demo)
+        record = self.get_latest_submission(team_name, question_number)
+        return self.append_submission(base_archive, record.content)
+
+    def get_test_package(self, question_number: int, demo: bool) -> tuple[bytes, str]:
+        """Returns the zip of autograder utils and a question's test (or demo) cases, along with its hash
 
+        Raises:
+            ResourceNotFoundException: If the utils or the question's test file do not exist
+        """
         utils_dir = "backend/autograder_utils"
         question_dir = os.path.join("es_files", "questions", f"q{question_number}")
 
-        with BytesIO() as f:  # Creates an in memory buffer we can use just like a file
-            with ZipFile(
-                f, "w"
-            ) as new_zip:  # Creates a new zip in memory we can add to
-                # Add all files in autograder_utils
-                if not os.path.exists(utils_dir):
-                    raise ResourceNotFoundException("No Utils Created.")
-
-                for file in os.listdir(utils_dir):
-                    new_zip.write(os.path.join(utils_dir, file), arcname=file)
-
-                # Add test/demo case file
-                if demo:
-                    path = os.path.join(question_dir, "demo_cases.py")
-                    if not os.path.exists(path):
-                        raise ResourceNotFoundException(
-                            f"Question {question_number} not found"
-                        )
-                    new_zip.write(path, arcname="demo_cases.py")
-                else:
-                    path = os.path.join(question_dir, "test_cases.py")
-                    if not os.path.exists(path):
-                        raise ResourceNotFoundException(
-                            f"Demo cases for question {question_number} not found"
-                        )
-                    new_zip.write(path, arcname="test_cases.py")
-
-                # Add submission file
-                path = os.path.join(
-                    submissions_dir, f"q{question_number}", f"{team_name}.py"
+        if not os.path.exists(utils_dir):
+            raise ResourceNotFoundException("No Utils Created.")
+
+        # Find test/demo case file
+        if demo:
+            test_file = "demo_cases.py"
+            test_path = os.path.join(question_dir, test_file)
+            if not os.path.exists(test_path):
+                raise ResourceNotFoundException(f"Question {question_number} not found")
+        else:
+            test_file = "test_cases.py"
+            test_path = os.path.join(question_dir, test_file)
+            if not os.path.exists(test_path):
+                raise ResourceNotFoundException(
+                    f"Demo cases for question {question_number} not found"
                 )
-                if not os.path.exists(path):
-                    raise ResourceNotFoundException(
-                        f"Team {team_name} did not submit question {question_number}"
-                    )
-                new_zip.write(path, arcname="submission.py")
+
+        return self.get_base_archive(utils_dir, test_path, test_file)
+
+    @staticmethod
+    def append_submission(base_archive: bytes, content: str) -> bytes:
+        """Adds the submitted code to a copy of a base archive as `submission.py`
+
+        Returns:
+            bytes: the base64 encoded zip
+        """
+        with BytesIO(base_archive) as f:  # Creates an in memory buffer we can use just like a file
+            with ZipFile(f, "a") as new_zip:  # Opens a copy of the base zip to append to
+                # A fixed timestamp keeps the package identical for identical code
+                info = ZipInfo("submission.py")
+                info.external_attr = 0o644 << 16
+                new_zip.writestr(info, content)
             return base64.b64encode(f.getvalue())
 
+    @classmethod
+    def get_base_archive(
+        cls, utils_dir: str, test_path: str, test_file: str
+    ) -> tuple[bytes, str]:
+        """Returns a zip of the autograder utils and a question's test file, without any submission.
+
+        The archive is built once and kept in memory until one of its files changes on disk,
+        so packaging a submission only has to append `submission.py`.
+
+        Args:
+            utils_dir: directory holding the autograder utils
+            test_path: path to the question's test or demo case file
+            test_file: name the test file is given inside the archive
+        Returns:
+            tuple[bytes, str]: the contents of the zip file and their sha256 hash
+        """
+        sources = [
+            (os.path.join(utils_dir, file), file) for file in sorted(os.listdir(utils_dir))
+        ]
+        sources.append((test_path, test_file))
+
+        # Files are only re-read when their modification time or size changes
+        fingerprint = tuple(
+            (arcname, stat.st_mtime_ns, stat.st_size)
+            for arcname, stat in ((arcname, os.stat(file)) for file, arcname in sources)
+        )
+        key = (os.path.abspath(utils_dir), os.path.abspath(test_path))
+        cached = cls._base_archives.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1], cached[2]
+
+        with BytesIO() as f:
+            with ZipFile(f, "w") as new_zip:  # Creates a new zip in memory we can add to
+                for file, arcname in sources:
+                    # Fixed timestamps so the hash only changes when file contents do
+                    info = ZipInfo(arcname)
+                    info.external_attr = 0o644 << 16
+                    with open(file, "rb") as source:
+                        new_zip.writestr(info, source.read())
+            archive = f.getvalue()
+
+        archive_hash = hashlib.sha256(archive).hexdigest()
+        cls._base_archives[key] = (fingerprint, archive, archive_hash)
+        return archive, archive_hash
+
     @staticmethod
-    def get_team_submissions(team_name: str) -> Dict[int, str]:
+    def hash_content(content: str) -> str:
+        """Returns the hash stored alongside submitted code"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _latest_ids():
+        """Builds a subquery for the id of the latest SubmissionRecord of every (team, question) pair"""
+        return (
+            select(func.max(SubmissionRecord.id))
+            .group_by(SubmissionRecord.team_id, SubmissionRecord.question_num)
+            .scalar_subquery()
+        )
+
+    def get_latest_submission(
+        self, team_name: str, question_num: int
+    ) -> SubmissionRecord:
+        """Gets a team's most recent submission for a question
+
+        Raises:
+            ResourceNotFoundException: If the team never submitted the question
+        """
+        record = self._session.exec(
+            select(SubmissionRecord)
+            .join(Team, Team.id == SubmissionRecord.team_id)
+            .where(
+                Team.name == team_name,
+                SubmissionRecord.question_num == question_num,
+            )
+            .order_by(SubmissionRecord.id.desc())
+            .limit(1)
+        ).first()
+        if record is None:
+            raise ResourceNotFoundException(
+                f"Team {team_name} did not submit question {question_num}"
+            )
+        return record
+
+    def get_latest_hashes(self) -> dict[tuple[int, int], tuple[int, str]]:
+        """Maps every (team id, question number) pair to the id and content hash of its latest submission"""
+        rows = self._session.exec(
+            select(
+                SubmissionRecord.team_id,
+                SubmissionRecord.question_num,
+                SubmissionRecord.id,
+                SubmissionRecord.content_hash,
+            ).where(SubmissionRecord.id.in_(self._latest_ids()))
+        ).all()
+        return {
+            (team_id, q_num): (record_id, content_hash)
+            for team_id, q_num, record_id, content_hash in rows
+        }
+
+    def get_team_submissions(self, team_name: str) -> Dict[int, str]:
         """
         Get all submissions for a specific team.
 
@@ -280,61 +493,94 @@ class SubmissionService:
         Raises:
             ValueError: If team has no submissions.
         """
-        result = {}
-        found_any = False
-
-        problem_numbers = ProblemService.get_problems_list()
-
-        for p_num in problem_numbers:
-            problem_dir = os.path.join(submissions_dir, f"q{p_num}")
-            submission_path = os.path.join(problem_dir, f"{team_name}.py")
-
-            if os.path.exists(submission_path):
-                found_any = True
-                with open(submission_path, "r") as f:
-                    result[p_num] = f.read()
-
-        if not found_any:
+        records = self._session.exec(
+            select(SubmissionRecord)
+            .join(Team, Team.id == SubmissionRecord.team_id)
+            .where(SubmissionRecord.id.in_(self._latest_ids()), Team.name == team_name)
+            .order_by(SubmissionRecord.question_num)
+        ).all()
+
+        if not records:
             raise ValueError(f"No submissions found for team {team_name}")
 
-        return result
+        return {record.question_num: record.content for record in records}
 
-    @staticmethod
-    def get_all_submissions() -> Dict[str, Dict[int, str]]:
+    def get_all_submissions(self) -> Dict[str, Dict[int, str]]:
         """
         Get all submissions from all teams.
 
         Returns:
             Dict[str, Dict[int, str]]: Dictionary mapping team names to their submissions.
         """
-        result = {}
+        result: Dict[str, Dict[int, str]] = {}
+        rows = self._session.exec(
+            select(SubmissionRecord, Team.name)
+            .join(Team, Team.id == SubmissionRecord.team_id)
+            .where(SubmissionRecord.id.in_(self._latest_ids()))
+            .order_by(Team.name, SubmissionRecord.question_num)
+        ).all()
+        for record, team_name in rows:
+            result.setdefault(team_name, {})[record.question_num] = record.content
+        return result
 
-        problem_numbers = ProblemService.get_problems_list()
+    def iter_latest_submissions(self) -> Iterator[tuple[str, int, str]]:
+        """
+        Iterate over the latest submission of every team for every problem, ordered by problem then team.
 
-        problem_dirs = [
-            os.path.join(submissions_dir, f"q{p_num}") for p_num in problem_numbers
-        ]
+        Rows are fetched from the database in batches of EXPORT_BATCH_SIZE rather than all at once.
 
-        all_teams = set()
+        Yields:
+            tuple[str, int, str]: The team name, problem number and submission content.
+        """
+        # Streamed responses are sent after the request's session is closed, so the rows are read
+        # through a session of their own that is closed once the last one is yielded
+        with Session(self._session.get_bind()) as session:
+            rows = session.exec(
+                select(
+                    Team.name, SubmissionRecord.question_num, SubmissionRecord.content
+                )
+                .join(Team, Team.id == SubmissionRecord.team_id)
+                .where(SubmissionRecord.id.in_(self._latest_ids()))
+                .order_by(SubmissionRecord.question_num, Team.name)
+                .execution_options(yield_per=self.EXPORT_BATCH_SIZE)
+            )
+            for team_name, q_num, content in rows:
+                yield team_name, q_num, content
 
-        for problem_dir in problem_dirs:
-            if os.path.exists(problem_dir):
-                team_files = glob.glob(os.path.join(problem_dir, "*.py"))
-                for team_file in team_files:
-                    team_name = os.path.basename(team_file).replace(".py", "")
-                    all_teams.add(team_name)
+    def stream_zip(self) -> Iterator[bytes]:
+        """
+        Stream a zip of every team's latest submissions, laid out as `q{n}/{team}.py`.
 
-        for team_name in all_teams:
-            try:
-                team_submissions = SubmissionService.get_team_submissions(team_name)
-                result[team_name] = team_submissions
-            except (ValueError, Exception):
-                continue
+        Each file is compressed and yielded as soon as it is read, so memory use does not grow
+        with the number of submissions.
 
-        return result
+        Yields:
+            bytes: The next chunk of the zip file.
+        """
+        stream = _ChunkStream()
+        with ZipFile(stream, "w", compression=ZIP_DEFLATED) as archive:
+            for team_name, q_num, content in self.iter_latest_submissions():
+                info = ZipInfo(f"q{q_num}/{team_name}.py")
+                info.compress_type = ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, content)
+                yield stream.take()
+        # Closing the archive writes its central directory
+        yield stream.take()
+
+    def stream_ndjson(self) -> Iterator[str]:
+        """
+        Stream every team's latest submissions as newline delimited JSON.
 
-    @staticmethod
-    def get_specific_submission(team_name: str, p_num: int) -> str:
+        Yields:
+            str: One `{"team": str, "question_num": int, "content": str}` object per line.
+        """
+        for team_name, q_num, content in self.iter_latest_submissions():
+            yield json.dumps(
+                {"team": team_name, "question_num": q_num, "content": content}
+            ) + "\n"
+
+    def get_specific_submission(self, team_name: str, p_num: int) -> str:
         """
         Get a specific submission for a team and problem.
 
@@ -348,22 +594,42 @@ class SubmissionService:
         Raises:
             ValueError: If submission does not exist.
         """
-        problem_dir = os.path.join(submissions_dir, f"q{p_num}")
-        submission_path = os.path.join(problem_dir, f"{team_name}.py")
-
-        if not os.path.exists(problem_dir):
+        submitted = self._session.exec(
+            select(SubmissionRecord.id)
+            .where(SubmissionRecord.question_num == p_num)
+            .limit(1)
+        ).first()
+        if submitted is None:
             raise ValueError(f"Problem {p_num} does not exist")
 
-        if not os.path.exists(submission_path):
+        try:
+            return self.get_latest_submission(team_name, p_num).content
+        except ResourceNotFoundException:
             raise ValueError(
                 f"No submission found for team {team_name} on problem {p_num}"
             )
 
-        with open(submission_path, "r") as f:
-            return f.read()
+    def get_submission_history(
+        self, team_name: str, p_num: int
+    ) -> list[SubmissionRecord]:
+        """
+        Get every submission a team made for a problem, oldest first.
 
-    @staticmethod
-    def delete_submissions(team_name: str):
+        Args:
+            team_name (str): Team name (e.g., "B1").
+            p_num (int): Problem number.
+
+        Returns:
+            list[SubmissionRecord]: The team's submissions for the problem.
+        """
+        return self._session.exec(
+            select(SubmissionRecord)
+            .join(Team, Team.id == SubmissionRecord.team_id)
+            .where(Team.name == team_name, SubmissionRecord.question_num == p_num)
+            .order_by(SubmissionRecord.id)
+        ).all()
+
+    def delete_submissions(self, team_name: str):
         """
         Delete all submissions of a specific team.
 
@@ -373,26 +639,30 @@ class SubmissionService:
         Returns:
             str: Success message indicating how many submissions were deleted.
         """
-        problem_numbers = ProblemService.get_problems_list()
-        if not problem_numbers:
-            return "No problems found in the system."
-
-        deleted_count = 0
+        team_ids = select(Team.id).where(Team.name == team_name).scalar_subquery()
+        self._session.exec(
+            delete(SubmissionResult).where(SubmissionResult.team_id.in_(team_ids))
+        )
+        deleted_count = self._session.exec(
+            delete(SubmissionRecord).where(SubmissionRecord.team_id.in_(team_ids))
+        ).rowcount
+        self._session.commit()
 
-        for p_num in problem_numbers:
-            problem_dir = os.path.join(submissions_dir, f"q{p_num}")
-            submission_path = os.path.join(problem_dir, f"{team_name}.py")
+        # Remove the mirrored files
+        if os.path.exists(submissions_dir):
+            for problem_dir in os.listdir(submissions_dir):
+                problem_path = os.path.join(submissions_dir, problem_dir)
+                submission_path = os.path.join(problem_path, f"{team_name}.py")
 
-            if os.path.exists(submission_path):
-                try:
-                    os.remove(submission_path)
-                    deleted_count += 1
+                if os.path.exists(submission_path):
+                    try:
+                        os.remove(submission_path)
 
-                    if not os.listdir(problem_dir):
-                        os.rmdir(problem_dir)
+                        if not os.listdir(problem_path):
+                            os.rmdir(problem_path)
 
-                except Exception as e:
-                    return f"Error deleting submission {submission_path}: {str(e)}"
+                    except Exception as e:
+                        return f"Error deleting submission {submission_path}: {str(e)}"
 
         return (
             f"Deleted {deleted_count} submission(s) for team '{team_name}'."
@@ -400,11 +670,38 @@ class SubmissionService:
             else "No submissions found for deletion."
         )
 
-    @staticmethod
-    def delete_all_submissions():
+    def delete_all_submissions(self):
+        self._session.exec(delete(SubmissionResult))
+        self._session.exec(delete(SubmissionRecord))
+        self._session.commit()
+
         for root, dirs, files in os.walk(submissions_dir, topdown=False):
             for fname in files:
                 os.remove(os.path.join(root, fname))
             for dname in dirs:
                 os.rmdir(os.path.join(root, dname))
         return "All submissions deleted successfully."
+
+
+class _ChunkStream:
+    """Write only file object that hands back whatever was written since it was last emptied.
+
+    It has no `tell` or `seek`, so ZipFile writes it as a stream instead of seeking back
+    to fill in file sizes.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        """Returns and forgets everything written so far"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
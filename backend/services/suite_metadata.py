@@ -0,0 +1,172 @@
+"""Service to read the tests of a question's test file without running them"""
+
+import ast
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from .problem_store import ProblemStore
+
+__authors__ = ["Andrew Lockard"]
+
+
+@dataclass(frozen=True)
+class CaseMetadata:
+    """What the autograder decorators say about a single test"""
+
+    name: str  # The name the autograder reports the test's result under
+    method: str
+    weight: float
+    partial_credit: bool = False
+    visibility: Optional[str] = None
+    tags: tuple[str, ...] = ()
+    number: Optional[str] = None
+    timeout: Optional[float] = None  # None if the test uses the runner's timeout
+
+
+@dataclass(frozen=True)
+class SuiteMetadata:
+    """Every test of a test file, in the order they are defined"""
+
+    tests: tuple[CaseMetadata, ...]
+
+    @property
+    def max_points(self) -> float:
+        """The points a submission passing every test gets"""
+        return sum(test.weight for test in self.tests)
+
+
+class SuiteMetadataService:
+    """Parses test files with `ast` and keeps the result for as long as the file is unchanged.
+
+    Suites are cached process wide by the hash of their source, which is read from ProblemStore,
+    so asking for the max points or the tests of a question does no file I/O.
+    """
+
+    MAX_ENTRIES = 256
+
+    # Maps the sha256 of a test file's source to its parsed tests
+    _suites: dict[str, SuiteMetadata] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, question_num: int, demo: bool = False) -> SuiteMetadata:
+        """Gets the tests of a question's test (or demo) cases
+
+        Args:
+            question_num (int): the question number
+            demo (bool): whether to read demo_cases.py instead of test_cases.py
+        Returns:
+            SuiteMetadata: the question's tests
+        Raises:
+            FileNotFoundError: If the question does not have that test file
+            SyntaxError: If the test file is not valid Python
+        """
+        filename = "demo_cases.py" if demo else "test_cases.py"
+        source = ProblemStore.get_file(question_num, filename)
+        if source is None:
+            raise FileNotFoundError(
+                f"Question {question_num} does not contain a {filename} file"
+            )
+        return cls.parse(source, filename[:-3])
+
+    @classmethod
+    def parse(cls, source: str, module: str = "test_cases") -> SuiteMetadata:
+        """Parses the tests out of a test file's source, or returns them if already parsed
+
+        Args:
+            source (str): the contents of the test file
+            module (str): the module name the test runner imports the file as
+        Returns:
+            SuiteMetadata: the tests of every unittest.TestCase class in the file
+        """
+        key = hashlib.sha256(f"{module}:{source}".encode("utf-8")).hexdigest()
+        with cls._lock:
+            suite = cls._suites.get(key)
+        if suite is not None:
+            return suite
+
+        suite = SuiteMetadata(tests=tuple(_parse_tests(ast.parse(source), module)))
+        with cls._lock:
+            if len(cls._suites) >= cls.MAX_ENTRIES:
+                del cls._suites[next(iter(cls._suites))]
+            cls._suites[key] = suite
+        return suite
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forgets every parsed suite"""
+        with cls._lock:
+            cls._suites.clear()
+
+
+def _parse_tests(tree: ast.Module, module: str) -> list[CaseMetadata]:
+    tests = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not any(
+            _name(base).endswith("TestCase") for base in node.bases
+        ):
+            continue
+        # A @timeout on the class applies to every test that does not set its own
+        class_timeout = _read_decorators(node).get("timeout")
+        for method in node.body:
+            if isinstance(
+                method, (ast.FunctionDef, ast.AsyncFunctionDef)
+            ) and method.name.startswith("test"):
+                tests.append(_parse_test(method, node.name, module, class_timeout))
+    return tests
+
+
+def _parse_test(
+    method: ast.FunctionDef | ast.AsyncFunctionDef,
+    class_name: str,
+    module: str,
+    class_timeout: Optional[float] = None,
+) -> CaseMetadata:
+    # Like unittest, name a test by the first line of its docstring if it has one
+    docstring = ast.get_docstring(method)
+    if docstring:
+        name = docstring.strip().split("\n")[0].strip()
+    else:
+        name = f"{method.name} ({module}.{class_name}.{method.name})"
+
+    properties = {"weight": 0.0, "timeout": class_timeout, **_read_decorators(method)}
+    return CaseMetadata(name=name, method=method.name, **properties)
+
+
+def _read_decorators(
+    node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef,
+) -> dict:
+    """Returns the CaseMetadata fields set by the autograder decorators of a test or class"""
+    properties = {}
+    # The decorator listed first is applied last, so its value is the one the runner reads
+    for decorator in reversed(node.decorator_list):
+        if not isinstance(decorator, ast.Call):
+            continue
+        try:
+            args = [ast.literal_eval(arg) for arg in decorator.args]
+        except ValueError:
+            continue  # Values computed at runtime cannot be known without running the file
+        kind = _name(decorator.func).rsplit(".", 1)[-1]
+        if kind in ("weight", "partial_credit") and args:
+            properties["weight"] = float(args[0])
+            properties["partial_credit"] = kind == "partial_credit"
+        elif kind == "visibility" and args:
+            properties["visibility"] = str(args[0])
+        elif kind == "number" and args:
+            properties["number"] = str(args[0])
+        elif kind == "timeout" and args:
+            properties["timeout"] = float(args[0])
+        elif kind == "tags":
+            properties["tags"] = tuple(str(tag) for tag in args)
+    return properties
+
+
+def _name(node: ast.expr) -> str:
+    """Returns the dotted name of a Name or Attribute node, or an empty string"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_name(node.value)}.{node.attr}"
+    return ""
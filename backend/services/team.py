@@ -5,19 +5,30 @@ from typing import List, Optional
 from backend.models.session_obj import Session_Obj
 from ..db import db_session
 from fastapi import Depends
-from sqlmodel import Session, select, and_, delete
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, delete, insert
 import polars as pl
 import datetime as dt
+import hmac
 import random
 import string
 
+from .identity_cache import IdentityCache
+from .scores import ScoreService
 from .exceptions import (
     ResourceNotFoundException,
     InvalidCredentialsException,
     ResourceNotAllowedException,
 )
 
-from ..models import Team, TeamData, TeamMember, TeamMemberCreate
+from ..models import (
+    Team,
+    TeamData,
+    TeamMember,
+    TeamMemberCreate,
+    SubmissionRecord,
+    SubmissionResult,
+)
 from ..models.team import TeamPublic
 
 
@@ -96,36 +107,36 @@ class TeamService:
         Returns:
             pl.DataFrame: DataFrame row created from the Team object
         """
-        team_df = pl.DataFrame(
-            {
-                "Team Number": [team.name],
-                "Password": [team.password],
-                "Session ID": [team.session_id],
-                "Start Time": [
-                    (
-                        team.start_time.strftime("%m/%d/%Y %H:%M")
-                        if team.start_time
-                        else ""
-                    )
-                ],
-                "End Time": [
-                    team.end_time.strftime("%m/%d/%Y %H:%M") if team.end_time else ""
-                ],
-            }
-        )
-        return team_df
+        return self.teams_to_df([team])
 
     def teams_to_df(self, teams: list[TeamData]) -> pl.DataFrame:
         """Converts a list of TeamData objects to a DataFrame.
+
+        Each field is gathered into a column first, so the frame is built once however many teams there are.
         Args:
             teams (list[TeamData]): List of Team objects to convert
         Returns:
             pl.DataFrame: DataFrame created from the list of Team objects
         """
-        team_dfs = []
-        for team in teams:
-            team_dfs.append(self.team_to_df(team))
-        return pl.concat(team_dfs)
+        time_format = "%m/%d/%Y %H:%M"
+        return pl.DataFrame(
+            {
+                "Team Number": [team.name for team in teams],
+                "Password": [team.password for team in teams],
+                "Session ID": [team.session_id for team in teams],
+                "Start Time": [team.start_time for team in teams],
+                "End Time": [team.end_time for team in teams],
+            },
+            schema={
+                "Team Number": pl.String,
+                "Password": pl.String,
+                "Session ID": pl.Int64,
+                "Start Time": pl.Datetime,
+                "End Time": pl.Datetime,
+            },
+        ).with_columns(
+            pl.col("Start Time", "End Time").dt.strftime(time_format).fill_null("")
+        )
 
     def update_team(self, team: TeamData) -> TeamData:
         """Update a team in the database.
@@ -147,6 +158,8 @@ class TeamService:
             existing_team.session_id = team.session_id  # update session assignment
             self._session.add(existing_team)
             self._session.commit()
+            IdentityCache.invalidate_teams([existing_team.id])
+            ScoreService.invalidate_scoreboard()
             return existing_team
         else:
             raise ResourceNotFoundException("Team", team.name)
@@ -190,6 +203,7 @@ class TeamService:
         self._session.add(team)
         self._session.commit()
         self._session.refresh(team)
+        ScoreService.invalidate_scoreboard()
         return team
 
     def create_batch_teams(
@@ -199,6 +213,9 @@ class TeamService:
         This method supports two calling patterns:
         1. create_batch_teams(prefix, batch_size, template)
         2. create_batch_teams(team_names, team_template)
+
+        Existing names are read with one query, every password is reserved at once, and the
+        teams are inserted with a single bulk insert in one transaction.
         Args:
             team_names_or_prefix: Either a list of team names or a template prefix
             batch_size_or_template: Either the batch size or the team template
@@ -214,36 +231,18 @@ class TeamService:
             team_names = team_names_or_prefix
             team_template = batch_size_or_template
 
-            created_teams = []
-            skipped_names = []
-
-            # Base template data
-            start_time = team_template.start_time
-            end_time = team_template.end_time
-
-            for team_name in team_names:
-                # Check if this specific name already exists
-                if self.team_name_exists(team_name):
-                    skipped_names.append(team_name)
-                    continue
-
-                # Generate password using PasswordService
-                password = self._pwd_svc.generate_password()
-
-                # Create new team
-                new_team = Team(
-                    name=team_name,
-                    password=password,
-                    start_time=start_time,
-                    end_time=end_time,
-                    session_id=None,
-                )
-
-                self._session.add(new_team)
-                created_teams.append(new_team)
+            existing_names = set(
+                self._session.exec(
+                    select(Team.name).where(Team.name.in_(team_names))
+                ).all()
+            )
+            skipped_names = [name for name in team_names if name in existing_names]
+            new_names = list(
+                dict.fromkeys(name for name in team_names if name not in existing_names)
+            )
 
             # If all teams were skipped, raise an exception
-            if len(skipped_names) == len(team_names):
+            if not new_names:
                 raise ResourceNotAllowedException(
                     f"All requested team names already exist: {', '.join(skipped_names)}"
                 )
@@ -252,63 +251,39 @@ class TeamService:
             # First pattern: template_name, batch_size, template
             template_name = team_names_or_prefix
             batch_size = batch_size_or_template
+            team_template = template
 
-            created_teams = []
-            skipped_names = []
-
-            # Base template data
-            start_time = template.start_time
-            end_time = template.end_time
-
-            # Find the highest existing number for this prefix
-            existing_teams = self._session.exec(
-                select(Team).where(Team.name.like(f"{template_name}%"))
-            ).all()
+            # Every name that could clash starts with the prefix
+            existing_names = set(
+                self._session.exec(
+                    select(Team.name).where(Team.name.like(f"{template_name}%"))
+                ).all()
+            )
 
-            # Track highest existing number
+            # Track highest existing number (e.g., "B1" -> 1)
             highest_num = 0
-            for team in existing_teams:
-                # Extract number from team name (e.g., "B1" -> 1)
-                try:
-                    name_parts = team.name.split(template_name)
-                    if len(name_parts) > 1 and name_parts[1].isdigit():
-                        num = int(name_parts[1])
-                        highest_num = max(highest_num, num)
-                except (ValueError, IndexError):
-                    continue
+            for name in existing_names:
+                name_parts = name.split(template_name)
+                if len(name_parts) > 1 and name_parts[1].isdigit():
+                    highest_num = max(highest_num, int(name_parts[1]))
 
             # Create new teams starting from the next available number
-            teams_to_create = batch_size
-            attempts = 0
+            new_names = []
+            skipped_names = []
             max_attempts = batch_size * 2  # Avoid infinite loop
-
-            while teams_to_create > 0 and attempts < max_attempts:
-                attempts += 1
-                team_name = f"{template_name}{highest_num + attempts}"
+            for attempt in range(1, max_attempts + 1):
+                if len(new_names) == batch_size:
+                    break
+                team_name = f"{template_name}{highest_num + attempt}"
 
                 # Skip if this specific name already exists
-                if self.team_name_exists(team_name):
+                if team_name in existing_names:
                     skipped_names.append(team_name)
-                    continue
-
-                # Generate password using PasswordService
-                password = self._pwd_svc.generate_password()
-
-                # Create new team
-                new_team = Team(
-                    name=team_name,
-                    password=password,
-                    start_time=start_time,
-                    end_time=end_time,
-                    session_id=None,
-                )
-
-                self._session.add(new_team)
-                created_teams.append(new_team)
-                teams_to_create -= 1
+                else:
+                    new_names.append(team_name)
 
             # If no teams were created, raise an exception
-            if not created_teams:
+            if not new_names:
                 if skipped_names:
                     message = f"Could not create any teams. The following names already exist: {', '.join(skipped_names[:10])}"
                     if len(skipped_names) > 10:
@@ -317,15 +292,26 @@ class TeamService:
                     message = "Could not create any teams due to naming conflicts."
                 raise ResourceNotAllowedException(message)
 
-        # Only commit if we're actually creating teams
-        if created_teams:
-            self._session.commit()
+        passwords = self._pwd_svc.generate_passwords(len(new_names))
+        rows = [
+            {
+                "name": name,
+                "password": password,
+                "start_time": team_template.start_time,
+                "end_time": team_template.end_time,
+                "session_id": None,
+            }
+            for name, password in zip(new_names, passwords)
+        ]
 
-            # Refresh all teams to get their IDs
-            for team in created_teams:
-                self._session.refresh(team)
+        # One INSERT for every team, returning the new ids in the order of the rows
+        team_ids = self._session.scalars(
+            insert(Team).returning(Team.id, sort_by_parameter_order=True), rows
+        ).all()
+        self._session.commit()
+        ScoreService.invalidate_scoreboard()
 
-        return created_teams
+        return [Team(id=team_id, **row) for team_id, row in zip(team_ids, rows)]
 
     def get_team(self, identifier) -> Team:
         """Gets the team by id (int) or name (str)"""
@@ -357,25 +343,64 @@ class TeamService:
         teams = self._session.exec(select(Team)).all()
         return teams
 
+    def get_teams_with_members(
+        self,
+        session_id: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Team]:
+        """Gets teams ordered by id with their members and session already loaded
+
+        The teams, their members and their sessions are each read with one query, however many
+        teams there are.
+
+        Args:
+            session_id (Optional[int]): Only get the teams assigned to this session
+            offset (int): Number of teams to skip
+            limit (Optional[int]): Maximum number of teams to return, all of them if None
+        Returns:
+            List[Team]: The teams
+        """
+        query = (
+            select(Team)
+            .options(selectinload(Team.members), selectinload(Team.session))
+            .order_by(Team.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        if session_id is not None:
+            query = query.where(Team.session_id == session_id)
+        return self._session.exec(query).all()
+
     def get_team_with_credentials(self, name: str, password: str) -> Team:
-        """Gets team with a team name and password."""
-        team = self._session.exec(
-            select(Team).where(and_(Team.name == name, Team.password == password))
-        ).first()
-        if not team:
+        """Gets team with a team name and password.
+
+        The team is looked up by its unique name and the password is compared in constant time,
+        so response times do not reveal how much of a guessed password was right.
+        """
+        team = self._session.exec(select(Team).where(Team.name == name)).first()
+        # Compare against something even when the name is unknown so both cases take as long
+        expected = team.password if team else ""
+        matches = hmac.compare_digest(expected.encode("utf-8"), password.encode("utf-8"))
+        if not team or not matches:
             raise InvalidCredentialsException("Incorrect credentials. Please try again")
         return team
 
     def delete_all_teams(self):
-        """Deletes all teams and their members
+        """Deletes all teams along with their members, submissions and graded results
 
         Returns:
             bool: True if operation successful
         """
         self._session.exec(delete(TeamMember))
+        self._session.exec(delete(SubmissionResult))
+        self._session.exec(delete(SubmissionRecord))
 
         self._session.exec(delete(Team))
         self._session.commit()
+        IdentityCache.clear()
+        ScoreService.invalidate_scoreboard()
         return True
 
     def delete_team_by_id(self, team_id: int) -> bool:
@@ -387,31 +412,39 @@ class TeamService:
         Returns:
             bool: True if team was deleted, False if team wasn't found
 
-        Note: This will also delete all associated team members
+        Note: This will also delete all associated team members, submissions and graded results
         """
-        # Find the team
         team = self._session.get(Team, team_id)
         if not team:
             return False
-
-        # Delete all members of this team
-        self._session.exec(delete(TeamMember).where(TeamMember.team_id == team_id))
-
-        # Delete the team
-        self._session.delete(team)
-        self._session.commit()
-        return True
+        return self.delete_team(team)
 
     def delete_team(self, team: TeamData | Team) -> bool:
-        """Deletes a team"""
-        team = self.get_team(team.name)
+        """Deletes a team along with its members, submissions and graded results
 
-        # First delete team members
-        for member in team.members:
-            self._session.delete(member)
+        Args:
+            team (TeamData | Team): The team to delete, found by its name
+        Returns:
+            bool: True once the team is deleted
+        Raises:
+            ResourceNotFoundException: If no team has that name
+        """
+        team_id = self.get_team(team.name).id
 
-        self._session.delete(team)
+        # Delete all members, submissions and graded results of this team
+        self._session.exec(delete(TeamMember).where(TeamMember.team_id == team_id))
+        self._session.exec(
+            delete(SubmissionResult).where(SubmissionResult.team_id == team_id)
+        )
+        self._session.exec(
+            delete(SubmissionRecord).where(SubmissionRecord.team_id == team_id)
+        )
+
+        # Delete the team
+        self._session.exec(delete(Team).where(Team.id == team_id))
         self._session.commit()
+        IdentityCache.invalidate_teams([team_id])
+        ScoreService.invalidate_scoreboard()
         return True
 
     def add_team_member(self, new_member: TeamMemberCreate, team: Team) -> TeamMember:
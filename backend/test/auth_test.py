@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
 import pytest
 import jwt
+from unittest.mock import patch
 from backend.models.team import Team
+from backend.models.session_obj import Session_Obj
 from backend.services.exceptions import (
     InvalidCredentialsException,
     ResourceNotAllowedException,
@@ -9,7 +11,8 @@ from backend.services.exceptions import (
 )
 from backend.models.auth import TokenData
 from sqlmodel import Session
-from .fixtures import auth_svc, team_svc
+from backend.services.identity_cache import IdentityCache
+from .fixtures import auth_svc, team_svc, session_obj_svc
 from .fake_data.auth import create_good_teams
 from backend.config import SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES
 
@@ -199,3 +202,119 @@ def test_authenticate_team_time_valid(auth_svc, create_good_teams):
 
     # No exception should be raised
     auth_svc.authenticate_team_time(team)
+
+
+def make_token(team: Team) -> str:
+    """Encodes a valid login token for a team"""
+    token_data = TokenData(
+        id=team.id,
+        name=team.name,
+        exp=(
+            datetime.now(tz=timezone.utc)
+            + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ).timestamp(),
+    )
+    return jwt.encode(
+        payload=token_data.model_dump(), key=SECRET_KEY, algorithm="HS256"
+    )
+
+
+def test_get_team_from_token_cached(auth_svc, create_good_teams):
+    """Tests that a token seen before is resolved without querying the database."""
+    session = create_good_teams
+    token = make_token(session.get(Team, 1))
+    auth_svc.get_team_from_token(token=token)
+
+    with patch.object(session, "exec", side_effect=AssertionError("queried")):
+        team = auth_svc.get_team_from_token(token=token)
+
+    assert team.id == 1
+    assert team.session.start_time is not None
+    # The cached team is usable in the request's database session
+    assert team in session
+    session.commit()
+    assert team.name == session.get(Team, 1).name
+
+
+def test_get_team_from_token_invalidated(auth_svc, team_svc, create_good_teams):
+    """Tests that updating or deleting a team drops its cached login."""
+    session = create_good_teams
+    token = make_token(session.get(Team, 1))
+    auth_svc.get_team_from_token(token=token)
+
+    team = team_svc.get_team(1)
+    team.password = "new-pass-word"
+    team_svc.update_team(team)
+    assert IdentityCache.size() == 0
+
+    auth_svc.get_team_from_token(token=token)
+    team_svc.delete_team_by_id(1)
+    with pytest.raises(ResourceNotFoundException):
+        auth_svc.get_team_from_token(token=token)
+
+
+def test_get_team_from_token_session_update(
+    auth_svc, session_obj_svc, create_good_teams
+):
+    """Tests that moving a session's times drops the cached logins of its teams."""
+    session = create_good_teams
+    team = session.get(Team, 1)
+    token = make_token(team)
+    auth_svc.get_team_from_token(token=token)
+
+    end_time = datetime.now() - timedelta(minutes=5)
+    session_obj_svc.update_session_obj(
+        team.session_id,
+        Session_Obj(
+            name=team.session.name,
+            start_time=team.session.start_time,
+            end_time=end_time,
+        ),
+    )
+
+    with pytest.raises(ResourceNotAllowedException, match="You have run out of time"):
+        auth_svc.authenticate_team_time(auth_svc.get_team_from_token(token=token))
+
+
+def test_authenticate_team_time_no_session(auth_svc, create_good_teams):
+    """Tests that a team without a session is refused instead of crashing."""
+    session = create_good_teams
+    team = session.get(Team, 1)
+    team.session_id = None
+    session.commit()
+
+    with pytest.raises(ResourceNotAllowedException, match="not assigned"):
+        auth_svc.authenticate_team_time(team)
+
+
+def test_authenticate_team_time_missing_session(auth_svc, create_good_teams):
+    """Tests that a team whose session no longer exists is refused."""
+    team = create_good_teams.get(Team, 1)
+    team.session_id = 5
+
+    with pytest.raises(ResourceNotAllowedException, match="not found"):
+        auth_svc.authenticate_team_time(team)
+
+
+def test_get_team_window(auth_svc, session_obj_svc, create_good_teams):
+    """Tests the window follows session updates without rereading the database."""
+    session = create_good_teams
+    session.commit()
+    team = session.get(Team, 1)
+
+    window = auth_svc.get_team_window(team)
+    assert window.active
+    assert 3500 < window.seconds_remaining <= 3600
+
+    session_obj_svc.update_session_obj(
+        1,
+        Session_Obj(
+            name="Dummy Session",
+            start_time=datetime.now() + timedelta(hours=1),
+            end_time=datetime.now() + timedelta(hours=2),
+        ),
+    )
+    with patch.object(session, "exec", side_effect=AssertionError("queried")):
+        window = auth_svc.get_team_window(team)
+    assert not window.active
+    assert window.seconds_remaining == 0.0
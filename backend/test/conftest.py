@@ -5,6 +5,10 @@ import os
 
 from sqlmodel import create_engine, Session, SQLModel
 
+from backend.services.identity_cache import IdentityCache
+from backend.services.session_schedule import SessionSchedule
+from backend.services.passwords import PasswordService
+
 # SQLITE_DATABASE_NAME = "test_database.db"
 # SQLITE_DATABASE_URL = (
 #     f"sqlite:////workspaces/SOTestingEnv/backend/test/{SQLITE_DATABASE_NAME}"
@@ -24,7 +28,9 @@ else:
 
 @pytest.fixture(scope="session")
 def test_engine():
-    return create_engine(SQLITE_DATABASE_URL)
+    return create_engine(
+        SQLITE_DATABASE_URL, connect_args={"check_same_thread": False}
+    )
 
 
 @pytest.fixture(scope="function")
@@ -32,6 +38,10 @@ def session(test_engine):
     """Resets database tables and return a new session object"""
     SQLModel.metadata.drop_all(test_engine)
     SQLModel.metadata.create_all(test_engine)
+    # Cached logins, session windows and free words refer to the previous database
+    IdentityCache.clear()
+    SessionSchedule.clear()
+    PasswordService.clear_free_words()
     session = Session(test_engine)
     try:
         yield session
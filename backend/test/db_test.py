@@ -0,0 +1,91 @@
+"""File to contain tests for the database engine profiles"""
+
+import pytest
+
+from sqlalchemy import inspect, text
+
+from backend.db import create_app_engine, migrate
+
+__authors__ = ["Andrew Lockard"]
+
+
+def test_development_profile(tmp_path):
+    """The development profile echoes statements and leaves SQLite's journal alone"""
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'dev.db'}", "development")
+
+    assert engine.echo
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 0
+
+
+def test_production_profile_sqlite(tmp_path):
+    """The production profile turns echo off and tunes SQLite for concurrent requests"""
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'prod.db'}", "production")
+
+    assert not engine.echo
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # 1 is NORMAL
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    assert engine.pool.size() > 1
+
+
+def test_unknown_profile():
+    """An unknown profile is rejected instead of silently using defaults"""
+    with pytest.raises(ValueError):
+        create_app_engine("sqlite://", "staging")
+
+
+def test_migrate_adds_missing_indexes(tmp_path):
+    """Migrating a database made before the indexes existed builds them and keeps its rows"""
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'old.db'}", "production")
+    with engine.begin() as conn:
+        conn.execute(
+            text("CREATE TABLE word (id INTEGER PRIMARY KEY, word VARCHAR, used BOOLEAN)")
+        )
+        conn.execute(text("INSERT INTO word (word, used) VALUES ('apple', 0)"))
+
+    migrate(engine)
+    migrate(engine)  # Running it again is harmless
+
+    inspector = inspect(engine)
+    indexes = {
+        index["name"]
+        for table in ("word", "team", "teammember")
+        for index in inspector.get_indexes(table)
+    }
+    assert {"ix_word_used", "ix_team_session_id", "ix_teammember_team_id"} <= indexes
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT word FROM word")).scalar() == "apple"
+
+
+def test_migrate_adds_missing_columns(tmp_path):
+    """Migrating a table made before nullable columns existed adds them and keeps its rows"""
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'old.db'}", "production")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE submissionresult (id INTEGER PRIMARY KEY, console_log VARCHAR, "
+                "test_name VARCHAR, question_num INTEGER, score FLOAT, max_score FLOAT, "
+                "team_id INTEGER, submission_id INTEGER, fingerprint VARCHAR, graded_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO submissionresult (console_log, test_name, question_num, score, "
+                "max_score, team_id, fingerprint) VALUES ('Passed', 'test', 1, 1, 1, 1, 'f')"
+            )
+        )
+
+    migrate(engine)
+    migrate(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("submissionresult")}
+    assert {"wall_time", "cpu_time", "peak_rss_kb"} <= columns
+    with engine.connect() as conn:
+        assert conn.execute(
+            text("SELECT test_name, wall_time FROM submissionresult")
+        ).one() == ("test", None)
@@ -2,12 +2,44 @@ from pathlib import Path
 import tempfile
 import pytest
 
+from sqlmodel import Session
 
-__authors__ = ["Michelle Nguyen"]
+from backend.models import Team, SubmissionRecord
+from backend.services.submissions import SubmissionService
+
+
+__authors__ = ["Michelle Nguyen", "Andrew Lockard"]
+
+# Maps (team name, question number) to the submitted code
+SUBMISSIONS = {
+    ("A1", 1): "def solve_q1_A1(): return 'A1 solution for q1'",
+    ("B2", 1): "def solve_q1_B2(): return 'B2 solution for q1'",
+    ("A1", 2): "def solve_q2_A1(): return 'A1 solution for q2'",
+    ("C3", 2): "def solve_q2_C3(): return 'C3 solution for q2'",
+    ("B2", 3): "def solve_q3_B2(): return 'B2 solution for q3'",
+    ("C3", 3): "def solve_q3_C3(): return 'C3 solution for q3'",
+}
+
+
+def create_fake_submissions(session: Session):
+    """Adds teams A1, B2 and C3 along with a stored submission for each entry of SUBMISSIONS"""
+    teams = {name: Team(name=name, password="a-b-c") for name in ["A1", "B2", "C3"]}
+    session.add_all(teams.values())
+    session.flush()
+
+    session.add_all(
+        SubmissionRecord(
+            team_id=teams[team_name].id,
+            question_num=q_num,
+            content=content,
+            content_hash=SubmissionService.hash_content(content),
+        )
+        for (team_name, q_num), content in SUBMISSIONS.items()
+    )
 
 
 @pytest.fixture
-def setup_submission_data():
+def setup_submission_data(session: Session):
     """Create a temporary test environment with sample submissions."""
 
     def create_submission_environment():
@@ -15,31 +47,13 @@ def setup_submission_data():
 
         submissions_path = temp_dir / "es_files" / "submissions"
 
-        for p_num in [1, 2, 3]:
+        for (team_name, p_num), content in SUBMISSIONS.items():
             prob_dir = submissions_path / f"q{p_num}"
             prob_dir.mkdir(parents=True, exist_ok=True)
+            (prob_dir / f"{team_name}.py").write_text(content)
 
-            if p_num == 1:
-                (prob_dir / "A1.py").write_text(
-                    "def solve_q1_A1(): return 'A1 solution for q1'"
-                )
-                (prob_dir / "B2.py").write_text(
-                    "def solve_q1_B2(): return 'B2 solution for q1'"
-                )
-            elif p_num == 2:
-                (prob_dir / "A1.py").write_text(
-                    "def solve_q2_A1(): return 'A1 solution for q2'"
-                )
-                (prob_dir / "C3.py").write_text(
-                    "def solve_q2_C3(): return 'C3 solution for q2'"
-                )
-            else:
-                (prob_dir / "B2.py").write_text(
-                    "def solve_q3_B2(): return 'B2 solution for q3'"
-                )
-                (prob_dir / "C3.py").write_text(
-                    "def solve_q3_C3(): return 'C3 solution for q3'"
-                )
+        create_fake_submissions(session)
+        session.commit()
 
         return temp_dir
 
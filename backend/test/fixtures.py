@@ -9,7 +9,8 @@ from ..services import (
     SubmissionService,
     TeamService,
     Session_ObjService,
-    ESService
+    ESService,
+    ScoreService,
 )
 
 from sqlmodel import Session
@@ -35,12 +36,14 @@ def password_svc(session: Session):
 @pytest.fixture()
 def question_svc():
     # TODO: Need to create mocks to change how sample questions and documentation are loaded
+    # Questions loaded by a previous test come from a different directory
+    QuestionService.invalidate()
     return QuestionService()
 
 
 @pytest.fixture()
-def submission_svc():
-    return SubmissionService()
+def submission_svc(session: Session):
+    return SubmissionService(session)
 
 
 @pytest.fixture()
@@ -50,4 +53,9 @@ def session_obj_svc(session: Session):
 
 @pytest.fixture
 def es_svc():
-    return ESService()
\ No newline at end of file
+    return ESService()
+
+
+@pytest.fixture()
+def score_svc(session: Session):
+    return ScoreService(session)
@@ -0,0 +1,114 @@
+"""File to contain all GradingJobService related tests"""
+
+import asyncio
+import pytest
+
+from unittest.mock import patch
+
+from backend.services.exceptions import ResourceNotFoundException
+from backend.services.grading_jobs import GradingJobService
+from backend.services.scores import ScoreService
+
+__authors__ = ["Andrew Lockard"]
+
+
+@pytest.fixture(autouse=True)
+def reset_jobs():
+    GradingJobService._jobs = {}
+    GradingJobService._next_id = 1
+    GradingJobService._worker = None
+    GradingJobService._queue = None
+    # Keeps finished jobs from reading the app's database
+    with patch.object(ScoreService, "count_failures", return_value=0):
+        yield
+
+
+async def wait_for(job_svc: GradingJobService, job_id: int):
+    while job_svc.get_job(job_id).status in ("queued", "running"):
+        await asyncio.sleep(0)
+    return job_svc.get_job(job_id)
+
+
+def test_refresh_job_finishes():
+    """A queued refresh runs on the worker and records its progress"""
+
+    async def refresh(self, progress=None):
+        progress(3, 3)
+        return 3
+
+    async def run():
+        job_svc = GradingJobService()
+        job = job_svc.enqueue_refresh()
+        assert job.status == "queued"
+        try:
+            return await wait_for(job_svc, job.id)
+        finally:
+            await GradingJobService.stop()
+
+    with patch.object(ScoreService, "refresh", refresh), patch.object(
+        ScoreService, "count_failures", return_value=1
+    ):
+        job = asyncio.run(run())
+
+    assert job.status == "finished"
+    assert job.regraded == 3
+    assert job.failed == 1
+    assert (job.completed, job.total) == (3, 3)
+    assert job.finished_at is not None
+
+
+def test_only_one_full_regrade():
+    """Asking for a regrade while one is pending returns the pending job"""
+    release = None
+
+    async def refresh(self, progress=None):
+        await release.wait()
+        return 0
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        job_svc = GradingJobService()
+        try:
+            first = job_svc.enqueue_refresh()
+            await asyncio.sleep(0)
+            second = job_svc.enqueue_refresh()
+            assert first.id == second.id
+
+            release.set()
+            await wait_for(job_svc, first.id)
+            third = job_svc.enqueue_refresh()
+            assert third.id != first.id
+            await wait_for(job_svc, third.id)
+        finally:
+            await GradingJobService.stop()
+
+    with patch.object(ScoreService, "refresh", refresh):
+        asyncio.run(run())
+
+
+def test_failed_job_records_error():
+    """An exception during grading marks the job failed with its message"""
+
+    async def refresh(self, progress=None):
+        raise RuntimeError("Judge0 is down")
+
+    async def run():
+        job_svc = GradingJobService()
+        job = job_svc.enqueue_refresh()
+        try:
+            return await wait_for(job_svc, job.id)
+        finally:
+            await GradingJobService.stop()
+
+    with patch.object(ScoreService, "refresh", refresh):
+        job = asyncio.run(run())
+
+    assert job.status == "failed"
+    assert job.error == "Judge0 is down"
+
+
+def test_get_job_not_found():
+    """Getting a job that does not exist raises ResourceNotFoundException"""
+    with pytest.raises(ResourceNotFoundException):
+        GradingJobService().get_job(42)
@@ -0,0 +1,155 @@
+"""File to contain all autograder JSONTestRunner related tests"""
+
+import importlib
+import io
+import json
+import signal
+import sys
+import time
+import unittest
+import pytest
+
+from pathlib import Path
+
+from backend.autograder_utils.decorators import partial_credit, timeout, weight
+from backend.autograder_utils.json_test_runner import JSONTestRunner
+
+UTILS_DIR = Path(__file__).parent.parent / "autograder_utils"
+
+__authors__ = ["Andrew Lockard"]
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(signal, "setitimer"), reason="Timeouts rely on SIGALRM"
+)
+
+
+class Cases(unittest.TestCase):
+    __test__ = False  # Only run through JSONTestRunner, pytest would run the loops forever
+
+    @weight(1)
+    def test_a_fast(self):
+        """Fast"""
+
+    @weight(2)
+    @timeout(0.1)
+    def test_b_loops(self):
+        """Loops"""
+        while True:
+            pass
+
+    @weight(3)
+    def test_c_sleeps(self):
+        """Sleeps"""
+        time.sleep(0.5)
+
+    @partial_credit(4)
+    @timeout(0.1)
+    def test_d_swallows(self, set_score=None):
+        """Swallows"""
+        set_score(2)
+        while True:
+            try:
+                time.sleep(1)
+            except Exception:
+                pass
+
+
+@timeout(0.1)
+class LimitedCases(unittest.TestCase):
+    __test__ = False
+
+    def test_loops(self):
+        """Class limit"""
+        while True:
+            pass
+
+    @timeout(0.3)
+    def test_sleeps(self):
+        """Own limit"""
+        time.sleep(0.2)
+
+
+class LoopingCases(unittest.TestCase):
+    __test__ = False
+
+    def test_loops(self):
+        """Loops"""
+        while True:
+            pass
+
+    def test_fast(self):
+        """Fast"""
+
+
+def run(cases=Cases, **kwargs) -> dict[str, dict]:
+    """Runs a TestCase and returns its test results by name"""
+    stream = io.StringIO()
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(cases)
+    JSONTestRunner(stream=stream, **kwargs).run(suite)
+    return {test["name"]: test for test in json.loads(stream.getvalue())["tests"]}
+
+
+def test_timeout_decorator():
+    """Tests past their @timeout fail with no points while the rest still run"""
+    start = time.perf_counter()
+    results = run()
+
+    assert time.perf_counter() - start < 2
+    assert results["Fast"]["status"] == "passed"
+    assert results["Sleeps"]["status"] == "passed"
+    for name in ("Loops", "Swallows"):
+        assert results[name]["status"] == "failed"
+        assert results[name]["score"] == 0.0
+        assert "Test timed out after 0.1 seconds" in results[name]["output"]
+    assert signal.getsignal(signal.SIGALRM) == signal.SIG_DFL
+
+
+def test_suite_timeout():
+    """The runner's timeout applies to tests without their own"""
+    results = run(timeout=0.2)
+
+    assert results["Fast"]["status"] == "passed"
+    assert results["Sleeps"]["status"] == "failed"
+    assert "Test timed out after 0.2 seconds" in results["Sleeps"]["output"]
+    assert "Test timed out after 0.1 seconds" in results["Loops"]["output"]
+
+
+def test_class_timeout():
+    """A @timeout on the class applies to its tests without their own"""
+    results = run(LimitedCases, timeout=5)
+
+    assert results["Class limit"]["status"] == "failed"
+    assert "Test timed out after 0.1 seconds" in results["Class limit"]["output"]
+    assert results["Own limit"]["status"] == "passed"
+
+
+def load_run_tests(monkeypatch):
+    """Imports run_tests.py the way the autograder runs it"""
+    # A __pycache__ folder would be packaged with the autograder utils
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(UTILS_DIR))
+    import run_tests
+
+    return importlib.reload(run_tests)
+
+
+def test_default_timeout(monkeypatch):
+    """A looping test without a @timeout fails at the default while its siblings still report"""
+    run_tests = load_run_tests(monkeypatch)
+
+    assert run_tests.TEST_TIMEOUT == 2
+    results = run(LoopingCases, timeout=run_tests.TEST_TIMEOUT)
+
+    assert results["Loops"]["status"] == "failed"
+    assert "Test timed out after 2 seconds" in results["Loops"]["output"]
+    assert results["Fast"]["status"] == "passed"
+
+
+def test_usage():
+    """Each test reports its wall time, CPU time and the peak memory so far"""
+    results = run()
+
+    assert results["Sleeps"]["wall_time"] >= 0.5
+    assert results["Sleeps"]["cpu_time"] < 0.5
+    assert results["Loops"]["cpu_time"] > 0.05
+    assert all(test["peak_rss_kb"] > 0 for test in results.values())
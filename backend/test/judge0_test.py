@@ -0,0 +1,198 @@
+"""File to contain all Judge0 client related tests"""
+
+import asyncio
+import json
+import httpx
+import pytest
+
+from unittest.mock import patch
+
+from backend.services.judge0 import Judge0Service
+
+
+__authors__ = ["Andrew Lockard"]
+
+
+def finished(token: str, tests: list[dict]) -> dict:
+    """Builds a finished Judge0 submission"""
+    return {
+        "token": token,
+        "stdout": json.dumps({"tests": tests}),
+        "stderr": None,
+        "status": {"id": 3, "description": "Accepted"},
+    }
+
+
+class FakeJudge0:
+    """Records requests and answers them like Judge0 would"""
+
+    def __init__(self, polls_before_done: int = 0):
+        self.batches: list[list[dict]] = []
+        self.polls = 0
+        self.polls_before_done = polls_before_done
+        self.submissions: dict[str, str] = {}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            batch = json.loads(request.content)["submissions"]
+            self.batches.append(batch)
+            tokens = []
+            for entry in batch:
+                token = f"token-{len(self.submissions)}"
+                self.submissions[token] = entry["additional_files"]
+                tokens.append({"token": token})
+            return httpx.Response(201, json=tokens)
+
+        self.polls += 1
+        tokens = request.url.params["tokens"].split(",")
+        if self.polls <= self.polls_before_done:
+            return httpx.Response(
+                200,
+                json={
+                    "submissions": [
+                        {"token": t, "stdout": None, "status": {"id": 2}}
+                        for t in tokens
+                    ]
+                },
+            )
+        return httpx.Response(
+            200,
+            json={
+                "submissions": [
+                    finished(
+                        t, [{"name": self.submissions[t], "status": "passed"}]
+                    )
+                    for t in tokens
+                ]
+            },
+        )
+
+
+@pytest.fixture()
+def fake_judge0():
+    fake = FakeJudge0()
+
+    def new_client():
+        return httpx.AsyncClient(
+            base_url="http://judge0", transport=httpx.MockTransport(fake.handler)
+        )
+
+    with patch.object(Judge0Service, "_new_client", side_effect=new_client), patch.object(
+        Judge0Service, "POLL_INTERVAL", 0
+    ):
+        yield fake
+
+
+def test_run_single_submission(fake_judge0):
+    """A single run returns the autograder's tests for that submission"""
+
+    async def run():
+        try:
+            return await Judge0Service().run(b"zip-a")
+        finally:
+            await Judge0Service.close()
+
+    result = asyncio.run(run())
+    assert result == [{"name": "zip-a", "status": "passed"}]
+    assert len(fake_judge0.batches) == 1
+
+
+def test_concurrent_runs_share_a_batch(fake_judge0):
+    """Submissions sent at the same time go to Judge0 in one batch request"""
+
+    async def run():
+        try:
+            return await Judge0Service().run_many([b"zip-a", b"zip-b", b"zip-c"])
+        finally:
+            await Judge0Service.close()
+
+    results = asyncio.run(run())
+    assert [r[0]["name"] for r in results] == ["zip-a", "zip-b", "zip-c"]
+    assert len(fake_judge0.batches) == 1
+    assert len(fake_judge0.batches[0]) == 3
+    assert fake_judge0.batches[0][0]["language_id"] == Judge0Service.LANGUAGE_ID
+
+
+def test_batches_are_split_at_batch_size(fake_judge0):
+    """More submissions than BATCH_SIZE are split into several batch requests"""
+
+    async def run():
+        try:
+            return await Judge0Service().run_many([b"zip"] * 5)
+        finally:
+            await Judge0Service.close()
+
+    with patch.object(Judge0Service, "BATCH_SIZE", 2):
+        results = asyncio.run(run())
+
+    assert len(results) == 5
+    assert [len(batch) for batch in fake_judge0.batches] == [2, 2, 1]
+
+
+def test_polls_until_finished(fake_judge0):
+    """Results are collected by polling until Judge0 reports the submission finished"""
+    fake_judge0.polls_before_done = 2
+
+    async def run():
+        try:
+            return await Judge0Service().run(b"zip-a")
+        finally:
+            await Judge0Service.close()
+
+    result = asyncio.run(run())
+    assert result[0]["name"] == "zip-a"
+    assert fake_judge0.polls == 3
+
+
+def test_unexpected_tokens_are_skipped(fake_judge0, caplog):
+    """Results for tokens that were not asked for, or were already resolved, are skipped"""
+    handler = fake_judge0.handler
+
+    def handler_with_extras(request: httpx.Request) -> httpx.Response:
+        response = handler(request)
+        if request.method == "POST":
+            return response
+        submissions = response.json()["submissions"]
+        extras = [finished("unknown", []), submissions[0]]
+        return httpx.Response(200, json={"submissions": submissions + extras})
+
+    fake_judge0.handler = handler_with_extras
+
+    async def run():
+        try:
+            return await Judge0Service().run_many([b"zip-a", b"zip-b"])
+        finally:
+            await Judge0Service.close()
+
+    results = asyncio.run(run())
+    assert [r[0]["name"] for r in results] == ["zip-a", "zip-b"]
+    assert "'unknown'" in caplog.text
+    assert "'token-0'" in caplog.text
+
+
+def test_submit_failure_raises():
+    """A non-201 response from Judge0 raises a RuntimeError"""
+
+    def new_client():
+        return httpx.AsyncClient(
+            base_url="http://judge0",
+            transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+        )
+
+    async def run():
+        try:
+            return await Judge0Service().run(b"zip-a")
+        finally:
+            await Judge0Service.close()
+
+    with patch.object(Judge0Service, "_new_client", side_effect=new_client):
+        with pytest.raises(RuntimeError, match="Judge0 did not return as expected"):
+            asyncio.run(run())
+
+
+def test_parse_tests_without_output():
+    """A submission that produced no autograder output raises a RuntimeError"""
+    with pytest.raises(RuntimeError, match="Time Limit Exceeded"):
+        Judge0Service.parse_tests(
+            {"stdout": None, "status": {"id": 5, "description": "Time Limit Exceeded"}}
+        )
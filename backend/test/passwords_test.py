@@ -4,7 +4,10 @@ import pytest
 from sqlmodel import select
 from backend.models import Word
 from backend.models.team import Team, TeamData
-from backend.services.exceptions import ResourceNotFoundException
+from backend.services.exceptions import (
+    ResourceNotFoundException,
+    ResourceNotAllowedException,
+)
 from backend.services.passwords import PasswordService
 from .fixtures import password_svc
 
@@ -82,7 +85,7 @@ def test_generate_password_with_insufficient_words(password_svc, setup_word_list
         PasswordService.reset_word_list = original_reset
 
 
-def test_generate_passwords(password_svc, session, monkeypatch):
+def test_assign_passwords(password_svc, session, monkeypatch):
     """Test generating passwords for a list of teams with different scenarios"""
     class MockTeamService:
         def get_team(self, name):
@@ -93,13 +96,10 @@ def test_generate_passwords(password_svc, session, monkeypatch):
             else:
                 raise ResourceNotFoundException(f"Team with name={name} was not found")
     
-    password_counter = 0
-    def mock_generate_password():
-        nonlocal password_counter
-        password_counter += 1
-        return f"generated-password-{password_counter}"
-    
-    monkeypatch.setattr(password_svc, "generate_password", mock_generate_password)
+    def mock_generate_passwords(count):
+        return [f"generated-password-{i}" for i in range(1, count + 1)]
+
+    monkeypatch.setattr(password_svc, "generate_passwords", mock_generate_passwords)
     mock_team_svc = MockTeamService()
     teams = [
         TeamData(name="existing_with_password", password="temp", session_id=None),  # Existing team with password in DB
@@ -112,8 +112,63 @@ def test_generate_passwords(password_svc, session, monkeypatch):
     teams[1].password = None
     teams[2].password = None
     
-    result = password_svc.generate_passwords(teams, mock_team_svc)
+    result = password_svc.assign_passwords(teams, mock_team_svc)
     assert result[0].password == "existing-password"  
     assert result[1].password == "generated-password-1" 
     assert result[2].password == "generated-password-2"  
-    assert result[3].password == "custom-password"
\ No newline at end of file
+    assert result[3].password == "custom-password"
+
+def test_generate_passwords(password_svc, setup_word_list, session):
+    """Test that a batch of passwords spends distinct words"""
+    setup_word_list.append(Word(word="test6", used=False))
+    session.add(setup_word_list[-1])
+    session.commit()
+
+    passwords = password_svc.generate_passwords(2)
+    session.commit()
+
+    words = [word for password in passwords for word in password.split("-")]
+    assert len(passwords) == 2
+    assert len(set(words)) == 6
+    assert len(session.exec(select(Word).where(Word.used == True)).all()) == 6
+
+
+def test_generate_passwords_resets_used_words(password_svc, setup_word_list, session):
+    """Test that used words are reused once the unused ones run out"""
+    for word in setup_word_list[:4]:
+        word.used = True
+    session.commit()
+
+    passwords = password_svc.generate_passwords(1)
+
+    assert len(set(passwords[0].split("-"))) == 3
+
+
+def test_generate_passwords_too_few_words(password_svc, setup_word_list):
+    """Test that asking for more words than exist is refused"""
+    with pytest.raises(ResourceNotAllowedException):
+        password_svc.generate_passwords(2)
+
+
+def test_generate_passwords_skips_words_spent_elsewhere(
+    password_svc, setup_word_list, session
+):
+    """Test that words marked used after the free list was loaded are not handed out"""
+    PasswordService._free_words = [word.id for word in setup_word_list]
+    for word in setup_word_list[3:]:
+        word.used = True
+    session.commit()
+
+    passwords = password_svc.generate_passwords(1)
+
+    assert sorted(passwords[0].split("-")) == ["test1", "test2", "test3"]
+
+
+def test_generate_passwords_keeps_shuffled_order(password_svc, setup_word_list):
+    """Test that words are joined in the order they were drawn, not the order of their ids"""
+    ids = [word.id for word in setup_word_list]
+    PasswordService._free_words = [ids[4], ids[0], ids[2], ids[1]]
+
+    passwords = password_svc.generate_passwords(1)
+
+    assert passwords == ["test1-test3-test2"]
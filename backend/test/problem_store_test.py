@@ -0,0 +1,143 @@
+"""File to contain all ProblemStore related tests"""
+
+import asyncio
+import pytest
+
+from unittest.mock import patch
+
+from backend.services.problem_store import ProblemStore
+from backend.services.problems import ProblemService
+from .fake_data.problem import setup_problem_data
+
+__authors__ = ["Andrew Lockard"]
+
+
+@pytest.fixture(autouse=True)
+def clear_problem_store():
+    ProblemStore.invalidate()
+    yield
+    ProblemStore.invalidate()
+
+
+@pytest.fixture
+def questions_dir(setup_problem_data, monkeypatch):
+    """Points ProblemService at a fresh directory holding problems 1 and 2"""
+    questions_dir = setup_problem_data() / "es_files" / "questions"
+    monkeypatch.setattr(ProblemService, "QUESTIONS_DIR", str(questions_dir))
+    return questions_dir
+
+
+def test_reads_are_served_from_memory(questions_dir):
+    """Once indexed, problems are read without touching the disk"""
+    assert ProblemStore.get_problem_numbers(str(questions_dir)) == [1, 2]
+
+    with patch("builtins.open", side_effect=AssertionError("read from disk")), patch(
+        "os.listdir", side_effect=AssertionError("listed from disk")
+    ):
+        assert ProblemService.get_problems_list() == [1, 2]
+        assert ProblemService.get_problem(2).prompt == "Prompt for problem 2"
+
+
+def test_files_written_by_service_are_indexed(questions_dir):
+    """Files written through ProblemService are seen without rebuilding the index"""
+    ProblemService.get_problems_list()
+
+    ProblemService.update_problem(1, "New prompt", "starter", "tests", "demo")
+    q_num = ProblemService.create_problem()
+
+    with patch("os.listdir", side_effect=AssertionError("listed from disk")):
+        assert ProblemService.get_problem(1).prompt == "New prompt"
+        assert ProblemService.get_problems_list() == [1, 2, q_num]
+
+
+def test_problems_are_read_only_snapshots(questions_dir):
+    """Callers cannot change the index, and later writes do not change what they were given"""
+    problems = ProblemStore.get_problems(str(questions_dir))
+
+    with pytest.raises(TypeError):
+        problems[3] = {}
+    with pytest.raises(TypeError):
+        problems[1]["prompt.md"] = "Changed"
+
+    ProblemService.update_problem(1, "New prompt", "starter", "tests", "demo")
+    ProblemService.create_problem()
+
+    assert sorted(problems) == [1, 2]
+    assert problems[1]["prompt.md"] == "Prompt for problem 1"
+    assert ProblemStore.get_file(1, "prompt.md", str(questions_dir)) == "New prompt"
+
+
+def test_unreadable_files_are_skipped(questions_dir, caplog):
+    """A file that cannot be read is left out of the index like a missing one"""
+    real_open = open
+
+    def guarded_open(path, *args, **kwargs):
+        if str(path).endswith("q1/prompt.md"):
+            raise PermissionError(13, "Permission denied", path)
+        return real_open(path, *args, **kwargs)
+
+    with patch("builtins.open", side_effect=guarded_open):
+        assert ProblemStore.get_problem_numbers(str(questions_dir)) == [1, 2]
+
+    assert ProblemStore.get_file(1, "prompt.md", str(questions_dir)) is None
+    assert (
+        ProblemStore.get_file(2, "prompt.md", str(questions_dir))
+        == "Prompt for problem 2"
+    )
+    assert "Permission denied" in caplog.text
+
+
+def test_delete_rebuilds_index(questions_dir):
+    """Deleting a problem renumbers the rest, so the index is rebuilt"""
+    ProblemService.get_problems_list()
+
+    ProblemService.delete_problem(1)
+
+    assert ProblemService.get_problems_list() == [1]
+    assert ProblemService.get_problem(1).prompt == "Prompt for problem 2"
+
+
+def test_edits_by_hand_are_not_seen_until_invalidated(questions_dir):
+    """Files edited on disk are only read again once the index is dropped"""
+    ProblemService.get_problems_list()
+    (questions_dir / "q1" / "prompt.md").write_text("Edited by hand")
+
+    assert ProblemService.get_problem(1).prompt == "Prompt for problem 1"
+    ProblemStore.invalidate()
+    assert ProblemService.get_problem(1).prompt == "Edited by hand"
+
+
+def test_listeners_are_told_of_changes(questions_dir, monkeypatch):
+    """Listeners are called after a file is written and after the index is dropped"""
+    monkeypatch.setattr(ProblemStore, "_listeners", [])
+    calls = []
+
+    def listener():
+        calls.append(ProblemStore.get_file(1, "prompt.md", str(questions_dir)))
+
+    ProblemStore.add_listener(listener)
+    ProblemService.get_problems_list()
+
+    ProblemService.update_problem(1, "New prompt", "starter", "tests", "demo")
+    assert calls[-1] == "New prompt"
+    ProblemStore.invalidate()
+    assert calls[-1] == "New prompt"
+    assert len(calls) == 5  # One for each of the four files written, one for the drop
+
+
+def test_watcher_invalidates(questions_dir):
+    """A change reported by the watcher drops the index"""
+
+    async def awatch(directory):
+        yield {("modified", str(questions_dir / "q1" / "prompt.md"))}
+
+    async def run():
+        ProblemStore.get_problems(str(questions_dir))
+        ProblemStore.start_watching(str(questions_dir))
+        await ProblemStore._watcher
+        await ProblemStore.stop_watching()
+
+    with patch("backend.services.problem_store.awatch", awatch):
+        asyncio.run(run())
+
+    assert ProblemStore._directory is None
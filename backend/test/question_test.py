@@ -1,8 +1,15 @@
 """File to contain all Question related tests"""
 
 from ..models import Question, QuestionsPublic, Document
+import gzip
 import os
 import pytest
+from backend.api.question import preferred_encoding
+from unittest.mock import patch
+from backend.services.docs import DocsService
+from backend.services.problem_store import ProblemStore
+from backend.services.problems import ProblemService
+from backend.services.questions import QuestionService
 from .fixtures import question_svc
 from ..test.fake_data.question import setup_questions, setup_bad_questions
 
@@ -81,17 +88,15 @@ def test_load_question_with_no_starter_code(question_svc, setup_questions):
     assert (question_svc.load_question(1).starter_code) == ""
 
 
-def test_load_questions_generic_exception(question_svc, setup_bad_questions):
-    # Create a test environment that triggers a generic exception
+def test_load_questions_skips_unreadable_prompt(question_svc, setup_bad_questions):
+    """A prompt that cannot be read skips its question instead of failing the load"""
     tmp_path = setup_bad_questions(2)
-    os.chmod(
-        tmp_path / "es_files" / "questions" / "q1" / "prompt.md", 0o000
-    )  # Restrict permissions to cause an exception
+    (tmp_path / "es_files" / "questions" / "q1" / "prompt.md").write_bytes(
+        b"\xff\xfe not utf-8"
+    )
     os.chdir(tmp_path)
 
-    # Ensure the generic exception is raised correctly
-    with pytest.raises(Exception):
-        question_svc.load_questions()
+    assert [q.num for q in question_svc.load_questions().questions] == [2]
 
 
 def test_get_question_count(question_svc, setup_questions):
@@ -142,3 +147,84 @@ def test_load_starter_code_file_not_found(question_svc, setup_questions):
             question_svc.load_starter_code(1)
     finally:
         os.chdir(original_dir)
+
+
+def test_get_bundle(question_svc, setup_questions):
+    """Test that the bundle holds the questions as JSON with a gzip variant"""
+    os.chdir(setup_questions(2))
+
+    bundle = question_svc.get_bundle()
+
+    assert QuestionsPublic.model_validate_json(bundle.body) == question_svc.load_questions()
+    assert gzip.decompress(bundle.encodings["gzip"]) == bundle.body
+    assert question_svc.get_bundle() is bundle
+
+
+def test_get_bundle_rebuilds_on_change(question_svc, setup_questions):
+    """Test that the bundle is rebuilt when the problem store reports a change on disk"""
+    tmp_path = setup_questions(2)
+    os.chdir(tmp_path)
+    bundle = question_svc.get_bundle()
+
+    (tmp_path / "es_files" / "questions" / "q1" / "prompt.md").write_text(
+        "A much longer prompt for question 1"
+    )
+    assert question_svc.get_bundle() is bundle
+
+    ProblemStore.invalidate()  # What the store's watcher does when a file changes
+    rebuilt = question_svc.get_bundle()
+
+    assert rebuilt.etag != bundle.etag
+    assert b"A much longer prompt" in rebuilt.body
+
+
+def test_get_bundle_does_not_touch_disk(question_svc, setup_questions):
+    """Test that serving a built bundle reads and checks no files"""
+    os.chdir(setup_questions(2))
+    bundle = question_svc.get_bundle()
+
+    with patch("os.stat", side_effect=AssertionError("checked on disk")), patch(
+        "builtins.open", side_effect=AssertionError("read from disk")
+    ):
+        assert question_svc.get_bundle() is bundle
+
+
+def test_get_bundle_invalidated_by_docs_service(
+    question_svc, setup_questions, monkeypatch
+):
+    """Test that uploading a global doc through DocsService rebuilds the bundle"""
+    tmp_path = setup_questions(2)
+    os.chdir(tmp_path)
+    monkeypatch.setattr(
+        DocsService, "GLOBAL_DOCS_DIR", str(tmp_path / "es_files" / "global_docs")
+    )
+    question_svc.get_bundle()
+
+    DocsService.upload_document("# New doc", "new")
+
+    assert b"# New doc" in question_svc.get_bundle().body
+
+
+def test_get_bundle_invalidated_by_problem_service(
+    question_svc, setup_questions, monkeypatch
+):
+    """Test that writing a problem through ProblemService rebuilds the bundle right away"""
+    os.chdir(setup_questions(2))
+    monkeypatch.setattr(ProblemService, "QUESTIONS_DIR", "es_files/questions")
+    bundle = question_svc.get_bundle()
+
+    ProblemService.write_file(2, "prompt.md", "Updated prompt")
+
+    assert b"Updated prompt" in question_svc.get_bundle().body
+    assert question_svc.get_bundle().etag != bundle.etag
+
+
+def test_preferred_encoding():
+    """Test picking the response encoding from an Accept-Encoding header"""
+    available = {"gzip": b"", "br": b""}
+    assert preferred_encoding("gzip, deflate, br", available) == "br"
+    assert preferred_encoding("gzip, br;q=0", available) == "gzip"
+    assert preferred_encoding("gzip", {"gzip": b""}) == "gzip"
+    assert preferred_encoding("*", {"gzip": b""}) == "gzip"
+    assert preferred_encoding("identity", available) is None
+    assert preferred_encoding(None, available) is None
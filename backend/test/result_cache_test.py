@@ -0,0 +1,69 @@
+"""File to contain all ResultCache related tests"""
+
+import pytest
+
+from unittest.mock import patch
+
+from backend.services.problems import ProblemService
+from backend.services.result_cache import ResultCache
+from .fake_data.problem import setup_problem_data
+
+__authors__ = ["Andrew Lockard"]
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    ResultCache.clear()
+    yield
+    ResultCache.clear()
+
+
+def test_get_and_put():
+    """Stored results are returned by the same key"""
+    key = ResultCache.key("tests", "code")
+    assert ResultCache.get(key) is None
+
+    ResultCache.put(key, 1, [{"name": "Test 1"}])
+    assert ResultCache.get(key) == [{"name": "Test 1"}]
+    assert ResultCache.get(ResultCache.key("tests", "other code")) is None
+    assert ResultCache.get(ResultCache.key("other tests", "code")) is None
+
+
+def test_evicts_least_recently_used():
+    """Once full, the least recently used entry is evicted"""
+    with patch.object(ResultCache, "MAX_ENTRIES", 2):
+        ResultCache.put("a", 1, [])
+        ResultCache.put("b", 1, [])
+        ResultCache.get("a")
+        ResultCache.put("c", 1, [])
+
+        assert ResultCache.size() == 2
+        assert ResultCache.get("a") is not None
+        assert ResultCache.get("b") is None
+        assert ResultCache.get("c") is not None
+
+
+def test_invalidate_question():
+    """Only the results of the invalidated question are removed"""
+    ResultCache.put("a", 1, [])
+    ResultCache.put("b", 2, [])
+
+    ResultCache.invalidate_question(1)
+
+    assert ResultCache.get("a") is None
+    assert ResultCache.get("b") is not None
+
+
+def test_update_problem_invalidates_results(setup_problem_data):
+    """Editing a problem through ProblemService drops its stored results"""
+    temp_dir = setup_problem_data()
+    ResultCache.put("a", 1, [])
+    ResultCache.put("b", 2, [])
+
+    with patch.object(
+        ProblemService, "QUESTIONS_DIR", str(temp_dir / "es_files" / "questions")
+    ):
+        ProblemService.update_problem(1, "prompt", "starter", "tests", "demo")
+
+    assert ResultCache.get("a") is None
+    assert ResultCache.get("b") is not None
@@ -0,0 +1,218 @@
+"""File to contain all local sandbox executor related tests"""
+
+import asyncio
+import os
+import sys
+import pytest
+
+from unittest.mock import AsyncMock, patch
+
+from backend.services.executor import get_executor
+from backend.services.sandbox import SandboxService
+from backend.services.submissions import SubmissionService
+from .fixtures import submission_svc
+
+__authors__ = ["Andrew Lockard"]
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="Sandbox workers rely on POSIX resource limits"
+)
+# Workers only run once they have chrooted and changed uid, which needs root on Linux
+needs_root = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or os.geteuid() != 0,
+    reason="Sandbox workers need root to isolate themselves",
+)
+
+DEMO_CASES = '''
+import unittest
+from submission import first_five
+from decorators import weight
+
+
+class Test(unittest.TestCase):
+    @weight(1)
+    def test_hello(self):
+        """Hello"""
+        self.assertEqual(first_five("Hello World"), "Hello")
+
+    @weight(1)
+    def test_four(self):
+        """Four"""
+        self.assertEqual(first_five("Four"), "Four")
+'''
+
+
+@pytest.fixture
+def package(tmp_path):
+    """Packages submitted code with DEMO_CASES like SubmissionService would"""
+    test_path = tmp_path / "demo_cases.py"
+    test_path.write_text(DEMO_CASES)
+    base_archive, _ = SubmissionService.get_base_archive(
+        SandboxService.UTILS_DIR, str(test_path), "demo_cases.py"
+    )
+    return lambda content: SubmissionService.append_submission(base_archive, content)
+
+
+def run(*submission_zips: bytes) -> list:
+    """Runs submissions on a warm pool, returning each one's tests or exception"""
+
+    async def main():
+        await SandboxService.start()
+        try:
+            return await asyncio.gather(
+                *(SandboxService().run(zip) for zip in submission_zips),
+                return_exceptions=True,
+            )
+        finally:
+            await SandboxService.close()
+
+    return asyncio.run(main())
+
+
+@needs_root
+def test_run(package):
+    """Submissions are graded by the autograder in a worker"""
+    passing, failing = run(
+        package("def first_five(s):\n    return s[:5]"),
+        package("def first_five(s):\n    return s"),
+    )
+
+    assert [(test["name"], test["status"]) for test in passing] == [
+        ("Four", "passed"),
+        ("Hello", "passed"),
+    ]
+    assert [(test["name"], test["status"]) for test in failing] == [
+        ("Four", "passed"),
+        ("Hello", "failed"),
+    ]
+    assert "Hello World" in failing[1]["output"]
+
+
+@needs_root
+def test_run_more_than_pool_size(package, monkeypatch):
+    """Runs beyond the number of workers wait for a fresh one"""
+    monkeypatch.setattr(SandboxService, "WORKERS", 2)
+
+    results = run(*[package("def first_five(s):\n    return s[:5]")] * 5)
+
+    assert all(test["status"] == "passed" for tests in results for test in tests)
+
+
+@needs_root
+def test_run_cpu_limit(package, monkeypatch):
+    """A submission that never finishes is stopped by its CPU time limit"""
+    monkeypatch.setattr(SandboxService, "CPU_SECONDS", 1)
+
+    (result,) = run(package("while True:\n    pass"))
+
+    assert isinstance(result, RuntimeError)
+    assert "CPU time limit" in str(result)
+
+
+@needs_root
+def test_run_test_timeout(package):
+    """A looping test times out on its own without the run being stopped"""
+    (tests,) = run(
+        package(
+            "def first_five(s):\n"
+            "    while s != 'Four':\n"
+            "        pass\n"
+            "    return s"
+        )
+    )
+
+    assert [(test["name"], test["status"]) for test in tests] == [
+        ("Four", "passed"),
+        ("Hello", "failed"),
+    ]
+    assert "Test timed out after 2 seconds" in tests[1]["output"]
+
+
+@needs_root
+def test_run_timeout(package, monkeypatch):
+    """A submission that waits without using CPU is stopped by the wall clock timeout"""
+    monkeypatch.setattr(SandboxService, "TIMEOUT", 0.5)
+
+    (result,) = run(package("import time\ntime.sleep(30)"))
+
+    assert isinstance(result, RuntimeError)
+    assert "in time" in str(result)
+
+
+@needs_root
+def test_run_memory_limit(package, monkeypatch):
+    """Allocations beyond the memory limit fail inside the worker"""
+    monkeypatch.setattr(SandboxService, "MEMORY_MB", 256)
+
+    (tests,) = run(package("data = bytearray(1024 ** 3)\ndef first_five(s): pass"))
+
+    assert all(test["status"] == "failed" for test in tests)
+    assert "MemoryError" in tests[0]["output"]
+
+
+@needs_root
+def test_run_is_isolated(package, tmp_path):
+    """Submissions run as their own uid and only see a read-only copy of the tests"""
+    secret = tmp_path / "secret.txt"
+    secret.write_text("server secret")
+    code = f"""
+import os
+
+
+def attempt(action):
+    try:
+        action()
+        return "allowed"
+    except OSError as e:
+        return type(e).__name__
+
+
+def first_five(s):
+    return " ".join(
+        [
+            str(os.getuid()),
+            os.getcwd(),
+            attempt(lambda: open({str(secret)!r}).read()),
+            attempt(lambda: open("demo_cases.py", "a")),
+            attempt(lambda: open("/new_file", "w")),
+        ]
+    )
+"""
+
+    (tests,) = run(package(code))
+
+    # The failed assertion shows what first_five returned
+    uid, cwd, *attempts = tests[1]["output"].split("'")[1].split()
+    assert int(uid) >= SandboxService.FIRST_UID
+    assert cwd == "/work"
+    assert attempts == ["FileNotFoundError", "OSError", "OSError"]
+
+
+def test_start_refuses_without_isolation(tmp_path, monkeypatch):
+    """The pool does not start if its workers cannot isolate themselves"""
+    worker = tmp_path / "worker.py"
+    worker.write_text('print("unisolated unshare failed: Operation not permitted")\n')
+    monkeypatch.setattr(SandboxService, "WORKER_PATH", str(worker))
+
+    async def main():
+        try:
+            await SandboxService.start()
+        finally:
+            await SandboxService.close()
+
+    with pytest.raises(RuntimeError, match="unshare failed: Operation not permitted"):
+        asyncio.run(main())
+
+
+def test_execute_uses_demo_executor(submission_svc):
+    """Only demo runs go to DEMO_EXECUTOR, grading always goes through Judge0"""
+    with patch("backend.services.submissions.DEMO_EXECUTOR", "local"), patch.object(
+        SandboxService, "run", AsyncMock(return_value=["local"])
+    ), patch.object(
+        submission_svc, "send_to_judge0", AsyncMock(return_value=["judge0"])
+    ):
+        assert asyncio.run(submission_svc.execute(b"zip", True)) == ["local"]
+        assert asyncio.run(submission_svc.execute(b"zip", False)) == ["judge0"]
+
+    with pytest.raises(ValueError):
+        get_executor("unknown")
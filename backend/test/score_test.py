@@ -0,0 +1,302 @@
+"""File to contain all ScoreService related tests"""
+
+import asyncio
+import json
+import polars as pl
+import pytest
+
+from unittest.mock import patch
+from sqlmodel import select
+
+from backend.models import ScoredTest, Submission, SubmissionResult, Team
+from backend.api.scores import etag_matches
+from backend.services import QuestionService, ScoreService, SubmissionService
+from .fixtures import score_svc, team_svc
+from .fake_data.team import fake_team_fixture
+from .fake_data.session_obj import fake_session_fixture
+from .fake_data.submission import setup_submission_data
+
+__authors__ = ["Andrew Lockard"]
+
+
+def scored(team_name: str, q_num: int, score: float = 1.0) -> list[ScoredTest]:
+    """Builds the graded tests returned for a fake submission"""
+    return [
+        ScoredTest(
+            console_log="Passed",
+            test_name=f"{team_name} q{q_num}",
+            question_num=q_num,
+            score=score,
+            max_score=1.0,
+            wall_time=0.5 * q_num,
+            cpu_time=0.25 * q_num,
+            peak_rss_kb=10000 * q_num,
+        )
+    ]
+
+
+@pytest.fixture()
+def fake_grading():
+    """Patches submissions, fingerprinting and grading so no files or Judge0 are needed
+
+    Yields a dict mapping (team id, question number) to the hash of that pair's latest submission
+    """
+    hashes = {}
+
+    async def grade_submission(self, q_num, team_name):
+        return scored(team_name, q_num)
+
+    def get_latest_hashes(self):
+        return {pair: (None, content_hash) for pair, content_hash in hashes.items()}
+
+    def fingerprint(self, q_num, content_hash):
+        return f"{q_num}:{content_hash}"
+
+    with patch.object(QuestionService, "get_question_count", return_value=2), patch.object(
+        SubmissionService, "get_latest_hashes", get_latest_hashes
+    ), patch.object(
+        SubmissionService, "fingerprint", fingerprint
+    ), patch.object(
+        SubmissionService, "grade_submission", autospec=True, side_effect=grade_submission
+    ) as mock_grade:
+        yield hashes, mock_grade
+
+
+def test_refresh_grades_everything_first(score_svc, fake_team_fixture, fake_grading):
+    """The first refresh grades every team on every question"""
+    fake_team_fixture()
+    _, mock_grade = fake_grading
+
+    assert asyncio.run(score_svc.refresh()) == 8
+    assert mock_grade.call_count == 8
+    assert len(score_svc.get_test_table()) == 8
+
+
+def test_refresh_only_regrades_changes(score_svc, fake_team_fixture, fake_grading):
+    """A second refresh only regrades the pairs whose fingerprint changed"""
+    fake_team_fixture()
+    hashes, mock_grade = fake_grading
+    asyncio.run(score_svc.refresh())
+    mock_grade.reset_mock()
+
+    assert asyncio.run(score_svc.refresh()) == 0
+    assert mock_grade.call_count == 0
+
+    hashes[(2, 1)] = "v2"  # B2 resubmits question 1
+    assert asyncio.run(score_svc.refresh()) == 1
+    mock_grade.assert_called_once()
+    assert mock_grade.call_args.args[1:] == (1, "B2")
+    # The regraded pair replaced its old rows instead of adding to them
+    assert len(score_svc.get_test_table()) == 8
+
+
+def test_refresh_drops_deleted_teams(
+    score_svc, team_svc, fake_team_fixture, fake_grading
+):
+    """Results of deleted teams are removed from the store"""
+    fake_team_fixture()
+    asyncio.run(score_svc.refresh())
+
+    team_svc.delete_team_by_id(1)
+    asyncio.run(score_svc.refresh())
+
+    assert "B1" not in score_svc.get_test_table()["Team Number"].to_list()
+    assert len(score_svc.get_test_table()) == 6
+
+
+def test_refresh_records_grader_failures(score_svc, session, fake_team_fixture):
+    """A job that raises is stored as a single zero score row"""
+    fake_team_fixture()
+
+    async def fail(self, q_num, team_name):
+        raise RuntimeError("Judge0 is down")
+
+    with patch.object(QuestionService, "get_question_count", return_value=1), patch.object(
+        SubmissionService, "fingerprint", return_value="v1"
+    ), patch.object(SubmissionService, "grade_submission", fail):
+        asyncio.run(score_svc.refresh())
+
+    results = session.exec(select(SubmissionResult)).all()
+    assert len(results) == 4
+    assert all(r.score == 0.0 for r in results)
+    assert all(r.error == "Judge0 is down" for r in results)
+    assert "Judge0 is down" in results[0].console_log
+    assert score_svc.count_failures() == 4
+
+
+def test_get_total_table(score_svc, fake_team_fixture, fake_grading):
+    """Totals are summed per team"""
+    fake_team_fixture()
+    asyncio.run(score_svc.refresh())
+
+    totals = {row["Team Number"]: row for row in score_svc.get_total_table().to_dicts()}
+    assert totals["B1"]["Score"] == 2.0
+    assert totals["B1"]["Max Score"] == 2.0
+    assert len(totals) == 4
+
+
+def test_refresh_links_latest_submission(score_svc, session, setup_submission_data):
+    """Stored results point at the submission they graded and a resubmission regrades"""
+    temp_dir = setup_submission_data()
+
+    async def grade_submission(self, q_num, team_name):
+        return scored(team_name, q_num)
+
+    with patch.object(QuestionService, "get_question_count", return_value=1), patch.object(
+        SubmissionService, "grade_submission", grade_submission
+    ), patch(
+        "backend.services.submissions.submissions_dir",
+        str(temp_dir / "es_files" / "submissions"),
+    ):
+        # Teams A1 and B2 submitted question 1, C3 did not
+        assert asyncio.run(score_svc.refresh()) == 3
+        linked = session.exec(
+            select(SubmissionResult).where(SubmissionResult.submission_id != None)
+        ).all()
+        assert len(linked) == 2
+
+        a1 = session.exec(select(Team).where(Team.name == "A1")).one()
+        SubmissionService(session).submit(
+            a1, Submission(question_num="1", file_contents="def v2(): pass")
+        )
+        assert asyncio.run(score_svc.refresh()) == 1
+        assert asyncio.run(score_svc.refresh()) == 0
+
+
+def test_aggregate_tables(score_svc, fake_team_fixture, fake_grading):
+    """Totals, pass rates and ranks are computed per team, question and test"""
+    fake_team_fixture()
+    _, mock_grade = fake_grading
+
+    async def grade_submission(self, q_num, team_name):
+        # B2 fails question 2, everyone else passes everything
+        if (team_name, q_num) == ("B2", 2):
+            return [
+                ScoredTest(
+                    console_log="Wrong answer",
+                    test_name=f"{team_name} q{q_num}",
+                    question_num=q_num,
+                    score=0.0,
+                    max_score=1.0,
+                )
+            ]
+        return scored(team_name, q_num)
+
+    mock_grade.side_effect = grade_submission
+    asyncio.run(score_svc.refresh())
+
+    totals = {row["Team Number"]: row for row in score_svc.get_total_table().to_dicts()}
+    assert totals["B1"]["Rank"] == 1
+    assert totals["B3"]["Rank"] == 1
+    assert totals["B2"]["Rank"] == 4
+    assert totals["B2"]["Tests Passed"] == 1
+    assert totals["B2"]["Pass Rate"] == 0.5
+
+    questions = score_svc.get_question_table().to_dicts()
+    assert [q["Question Number"] for q in questions] == [1, 2]
+    assert questions[0]["Pass Rate"] == 1.0
+    assert questions[1]["Average Score"] == 0.75
+    assert questions[1]["Teams With Full Marks"] == 3
+
+    tests = score_svc.get_test_stats_table()
+    assert len(tests) == 8
+    assert tests.filter(pl.col("Test Name") == "B2 q2")["Pass Rate"].item() == 0.0
+    timed = tests.filter(pl.col("Test Name") == "B1 q2").row(0, named=True)
+    assert (timed["Median Wall Time"], timed["Max Peak RSS (KB)"]) == (1.0, 20000)
+    assert tests.filter(pl.col("Test Name") == "B2 q2")["Max Wall Time"].item() is None
+
+
+def test_write_csv(score_svc, fake_team_fixture, fake_grading, tmp_path):
+    """Frames are written to CSV whether or not their query can be streamed"""
+    fake_team_fixture()
+    asyncio.run(score_svc.refresh())
+
+    score_svc.write_csv(score_svc.scan_tests(), str(tmp_path / "tests.csv"))
+    score_svc.write_csv(
+        score_svc.scan_tests()
+        .group_by("Team Number")
+        .agg(pl.col("Score").sum())
+        .with_columns(pl.col("Score").rank().alias("Rank")),
+        str(tmp_path / "ranks.csv"),
+    )
+
+    assert pl.read_csv(tmp_path / "tests.csv").equals(score_svc.get_test_table())
+    assert len(pl.read_csv(tmp_path / "ranks.csv")) == 4
+
+
+def test_empty_tables(score_svc):
+    """Aggregates of an empty store are empty instead of failing"""
+    assert score_svc.get_test_table().is_empty()
+    assert score_svc.get_total_table().is_empty()
+    assert score_svc.get_question_table().is_empty()
+
+
+def test_scoreboard(score_svc, fake_team_fixture, fake_grading):
+    """The scoreboard is ordered by rank and holds per question scores"""
+    fake_team_fixture()
+    hashes, mock_grade = fake_grading
+
+    async def grade_submission(self, q_num, team_name):
+        return scored(team_name, q_num, 0.0 if team_name == "B1" else 1.0)
+
+    mock_grade.side_effect = grade_submission
+    asyncio.run(score_svc.refresh())
+
+    etag, body = score_svc.get_scoreboard()
+    board = json.loads(body)
+    assert [row["Team Number"] for row in board] == ["B2", "B3", "B4", "B1"]
+    assert [row["Rank"] for row in board] == [1, 1, 1, 4]
+    assert board[0]["Question Scores"] == {"1": 1.0, "2": 1.0}
+    assert board[0]["Last Updated"]
+
+
+def test_scoreboard_rebuilt_only_on_changes(score_svc, fake_team_fixture, fake_grading):
+    """The stored scoreboard is reused until results are regraded"""
+    fake_team_fixture()
+    hashes, _ = fake_grading
+    asyncio.run(score_svc.refresh())
+    etag, _ = score_svc.get_scoreboard()
+
+    with patch.object(ScoreService, "build_scoreboard", side_effect=AssertionError):
+        assert score_svc.get_scoreboard()[0] == etag
+
+    hashes[(2, 1)] = "v2"
+    asyncio.run(score_svc.refresh())
+    with patch.object(ScoreService, "build_scoreboard", return_value=[]) as mock_build:
+        assert score_svc.get_scoreboard()[0] != etag
+        mock_build.assert_called_once()
+
+
+def test_scoreboard_rebuilt_on_team_changes(
+    score_svc, team_svc, session, fake_team_fixture, fake_grading
+):
+    """The stored scoreboard is rebuilt when teams without results are added, changed or deleted"""
+    fake_team_fixture()
+    asyncio.run(score_svc.refresh())
+    score_svc.get_scoreboard()
+
+    def assert_rebuilt():
+        with patch.object(ScoreService, "build_scoreboard", return_value=[]) as mock_build:
+            score_svc.get_scoreboard()
+            mock_build.assert_called_once()
+
+    # Added by another process, which cannot invalidate this one's scoreboard
+    session.add(Team(name="B5", password="pass"))
+    session.commit()
+    assert_rebuilt()
+
+    team = team_svc.get_team("B5")
+    team.session_id = None
+    team_svc.update_team(team)
+    assert_rebuilt()
+
+    team_svc.delete_team(team)
+    assert_rebuilt()
+
+
+def test_etag_matches():
+    """If-None-Match matches the current ETag in a list, weakly or by wildcard"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"old", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"old"', '"abc"')
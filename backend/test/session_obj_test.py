@@ -2,6 +2,7 @@
 
 from datetime import datetime, timedelta
 from typing import List
+from sqlalchemy import event
 from sqlmodel import select
 from backend.models import Session_Obj, Team
 from .fixtures import session_obj_svc
@@ -251,4 +252,103 @@ def test_add_teams_to_nonexistent_session(session_obj_svc, fake_session_fixture,
     
     # Verify the exception contains the correct resource type and ID
     assert "Session" in str(excinfo.value)
-    assert str(non_existent_session_id) in str(excinfo.value)
\ No newline at end of file
+    assert str(non_existent_session_id) in str(excinfo.value)
+
+
+def test_get_all_sessions_query_count(session_obj_svc, session):
+    """Test that listing sessions does not load each session's teams separately"""
+    now = datetime.now()
+    sessions = [
+        Session_Obj(name=f"Session {i}", start_time=now, end_time=now)
+        for i in range(50)
+    ]
+    session.add_all(sessions)
+    session.commit()
+    session.add_all(
+        Team(name=f"T{i}", password="a-b-c", session_id=sessions[i % 50].id)
+        for i in range(100)
+    )
+    session.commit()
+    session.expunge_all()
+
+    statements = []
+    engine = session.get_bind()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        listed = session_obj_svc.get_all_session_objs()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) <= 2
+    assert len(listed) == 50
+    assert listed[0].teams == [1, 51]
+
+
+def test_add_teams_is_one_update(session_obj_svc, fake_session_fixture, fake_team_fixture, session):
+    """Test that assigning teams writes them with a single statement"""
+    fake_session_fixture()
+    fake_team_fixture()
+
+    statements = []
+    engine = session.get_bind()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        updated_session = session_obj_svc.add_teams_to_session(4, [3])
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
+    assert updated_session.teams == [3]
+
+
+def test_add_teams_partly_assigned(session_obj_svc, fake_session_fixture, fake_team_fixture, session):
+    """Test that no team is assigned when one of them is already in another session"""
+    fake_session_fixture()
+    fake_team_fixture()
+
+    with pytest.raises(ResourceNotAllowedException):
+        session_obj_svc.add_teams_to_session(4, [3, 1])
+
+    assert session.get(Team, 3).session_id is None
+    assert session.get(Team, 1).session_id == 1
+
+
+def test_move_teams(session_obj_svc, fake_session_fixture, fake_team_fixture):
+    """Test moving teams between sessions"""
+    fake_session_fixture()
+    fake_team_fixture()
+
+    moved_from, moved_to = session_obj_svc.move_teams(1, 2, [1])
+
+    assert moved_from.teams == []
+    assert moved_to.teams == [1, 2]
+
+
+def test_move_teams_not_in_session(session_obj_svc, fake_session_fixture, fake_team_fixture, session):
+    """Test that no team moves when one of them is not in the session moved from"""
+    fake_session_fixture()
+    fake_team_fixture()
+
+    with pytest.raises(ResourceNotAllowedException):
+        session_obj_svc.move_teams(1, 2, [1, 3])
+
+    assert session.get(Team, 1).session_id == 1
+    assert session.get(Team, 3).session_id is None
+
+
+def test_move_teams_session_not_exist(session_obj_svc, fake_session_fixture, fake_team_fixture):
+    """Test that moving teams to a session that does not exist results in an Error"""
+    fake_session_fixture()
+    fake_team_fixture()
+
+    with pytest.raises(ResourceNotFoundException):
+        session_obj_svc.move_teams(1, 52, [1])
@@ -1,20 +1,31 @@
 """File to contain all Submission related tests"""
 
+import asyncio
 import base64
 import json
 import os
+import threading
 import pytest
 
 from io import BytesIO
 from pathlib import Path
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import MagicMock, patch
 from zipfile import ZipFile
 
-from backend.models.submission import ConsoleLog, ScoredTest, Submission
+from sqlmodel import Session, select
+
+from backend.models.submission import (
+    ConsoleLog,
+    ScoredTest,
+    Submission,
+    SubmissionRecord,
+)
 from backend.models.team import Team
 from backend.services.exceptions import ResourceNotFoundException
 from ..services import ProblemService
 from ..services import SubmissionService
+from ..services.judge0 import Judge0Service
+from ..services.result_cache import ResultCache
 from .fake_data.submission import setup_submission_data
 from .fixtures import submission_svc
 
@@ -22,7 +33,15 @@ from .fixtures import submission_svc
 __authors__ = ["Michelle Nguyen"]
 
 
-def test_get_all_submissions(setup_submission_data):
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Keeps stored Judge0 results from leaking between tests"""
+    ResultCache.clear()
+    yield
+    ResultCache.clear()
+
+
+def test_get_all_submissions(setup_submission_data, submission_svc):
     """Test retrieving all teams' submissions for all questions."""
     test_env = setup_submission_data()
 
@@ -31,7 +50,7 @@ def test_get_all_submissions(setup_submission_data):
         str(test_env / "es_files" / "submissions"),
     ):
         with patch.object(ProblemService, "get_problems_list", return_value=[1, 2, 3]):
-            submissions = SubmissionService.get_all_submissions()
+            submissions = submission_svc.get_all_submissions()
 
             assert sorted(submissions.keys()) == ["A1", "B2", "C3"]
 
@@ -54,7 +73,7 @@ def test_get_all_submissions(setup_submission_data):
             assert 3 in submissions["C3"]
 
 
-def test_get_team_submissions(setup_submission_data):
+def test_get_team_submissions(setup_submission_data, submission_svc):
     """Test retrieving a specific team's submissions for all questions."""
     test_env = setup_submission_data()
 
@@ -63,7 +82,7 @@ def test_get_team_submissions(setup_submission_data):
         str(test_env / "es_files" / "submissions"),
     ):
         with patch.object(ProblemService, "get_problems_list", return_value=[1, 2, 3]):
-            team_submissions = SubmissionService.get_team_submissions("A1")
+            team_submissions = submission_svc.get_team_submissions("A1")
 
             assert sorted(team_submissions.keys()) == [1, 2]
             assert (
@@ -73,7 +92,7 @@ def test_get_team_submissions(setup_submission_data):
                 team_submissions[2] == "def solve_q2_A1(): return 'A1 solution for q2'"
             )
 
-            team_submissions = SubmissionService.get_team_submissions("B2")
+            team_submissions = submission_svc.get_team_submissions("B2")
 
             assert sorted(team_submissions.keys()) == [1, 3]
             assert (
@@ -84,10 +103,10 @@ def test_get_team_submissions(setup_submission_data):
             )
 
             with pytest.raises(ValueError):
-                SubmissionService.get_team_submissions("D4")
+                submission_svc.get_team_submissions("D4")
 
 
-def test_get_specific_submission(setup_submission_data):
+def test_get_specific_submission(setup_submission_data, submission_svc):
     """Test retrieving a specific team's submission for a specific question."""
     test_env = setup_submission_data()
 
@@ -96,31 +115,31 @@ def test_get_specific_submission(setup_submission_data):
         str(test_env / "es_files" / "submissions"),
     ):
         # Test successful submission retrieval
-        submission = SubmissionService.get_specific_submission("A1", 1)
+        submission = submission_svc.get_specific_submission("A1", 1)
         assert submission == "def solve_q1_A1(): return 'A1 solution for q1'"
 
-        submission = SubmissionService.get_specific_submission("C3", 3)
+        submission = submission_svc.get_specific_submission("C3", 3)
         assert submission == "def solve_q3_C3(): return 'C3 solution for q3'"
 
         # Test non-existent submission for an existing team
         with pytest.raises(ValueError) as excinfo:
-            SubmissionService.get_specific_submission("A1", 3)
+            submission_svc.get_specific_submission("A1", 3)
         assert "No submission found for team A1 on problem 3" in str(excinfo.value)
 
         # Test submission for non-existent team
         with pytest.raises(ValueError) as excinfo:
-            SubmissionService.get_specific_submission("D4", 1)
+            submission_svc.get_specific_submission("D4", 1)
         assert "No submission found for team D4 on problem 1" in str(excinfo.value)
 
         # Test non-existent problem
         problem_path = test_env / "es_files" / "submissions" / "q4"
         if not problem_path.exists():
             with pytest.raises(ValueError) as excinfo:
-                SubmissionService.get_specific_submission("A1", 4)
+                submission_svc.get_specific_submission("A1", 4)
             assert "Problem 4 does not exist" in str(excinfo.value)
 
 
-def test_delete_team_submissions(setup_submission_data):
+def test_delete_team_submissions(setup_submission_data, submission_svc):
     """Test deleting a specific team's submissions."""
     test_env = setup_submission_data()
 
@@ -134,7 +153,7 @@ def test_delete_team_submissions(setup_submission_data):
             assert (Path(submissions_path) / "q2" / "A1.py").exists()
 
             # Delete team A1's submissions
-            result = SubmissionService.delete_submissions("A1")
+            result = submission_svc.delete_submissions("A1")
 
             # Ensure files are deleted
             assert not (Path(submissions_path) / "q1" / "A1.py").exists()
@@ -148,13 +167,16 @@ def test_delete_team_submissions(setup_submission_data):
 
             # Check the return message
             assert result == "Deleted 2 submission(s) for team 'A1'."
+            with pytest.raises(ValueError):
+                submission_svc.get_team_submissions("A1")
+            assert submission_svc.get_team_submissions("B2")
 
             # Try deleting a team with no submissions
-            result_no_submissions = SubmissionService.delete_submissions("D4")
+            result_no_submissions = submission_svc.delete_submissions("D4")
             assert result_no_submissions == "No submissions found for deletion."
 
 
-def test_delete_all_submissions_removes_everything(setup_submission_data):
+def test_delete_all_submissions_removes_everything(setup_submission_data, submission_svc):
     """Test that delete_all_submissions clears out all files and folders."""
     test_env = setup_submission_data()
     submissions_path = str(test_env / "es_files" / "submissions")
@@ -170,27 +192,28 @@ def test_delete_all_submissions_removes_everything(setup_submission_data):
         assert any(q3.iterdir())
 
         # call the method under test
-        result = SubmissionService.delete_all_submissions()
+        result = submission_svc.delete_all_submissions()
         assert result == "All submissions deleted successfully."
 
         # the root submissions directory should still exist but be empty
         root = Path(submissions_path)
         assert root.exists(), "submissions_dir should still exist"
         assert not any(root.iterdir()), "submissions_dir should now be empty"
+        assert submission_svc.get_all_submissions() == {}
 
         # calling it again on an empty directory should still succeed
-        result2 = SubmissionService.delete_all_submissions()
+        result2 = submission_svc.delete_all_submissions()
         assert result2 == "All submissions deleted successfully."
 
 
-def test_delete_all_submissions_on_empty_dir(setup_submission_data):
+def test_delete_all_submissions_on_empty_dir(setup_submission_data, submission_svc):
     """Test delete_all_submissions when there are no submissions at all."""
     test_env = setup_submission_data()
     submissions_path = str(test_env / "es_files" / "submissions")
 
     # first clear everything so it's empty
     with patch("backend.services.submissions.submissions_dir", submissions_path):
-        SubmissionService.delete_all_submissions()
+        submission_svc.delete_all_submissions()
 
         # now directory exists but is empty
         root = Path(submissions_path)
@@ -198,7 +221,7 @@ def test_delete_all_submissions_on_empty_dir(setup_submission_data):
         assert not any(root.iterdir())
 
         # second call should not raise and should return the same message
-        result = SubmissionService.delete_all_submissions()
+        result = submission_svc.delete_all_submissions()
         assert result == "All submissions deleted successfully."
 
 
@@ -289,6 +312,57 @@ def test_package_submission_demo_mode(setup_submission_data, submission_svc):
         os.chdir(original_dir)
 
 
+def test_package_submission_reuses_base_archive(setup_submission_data, submission_svc):
+    """Test that the autograder files are only re-read when one of them changes"""
+    temp_dir = setup_submission_data()
+    question_number = 1
+
+    utils_dir = temp_dir / "backend" / "autograder_utils"
+    utils_dir.mkdir(parents=True, exist_ok=True)
+    (utils_dir / "util.py").write_text("def helper():\n    pass")
+
+    q_dir = temp_dir / "es_files" / "questions" / f"q{question_number}"
+    q_dir.mkdir(parents=True, exist_ok=True)
+    test_file = q_dir / "test_cases.py"
+    test_file.write_text("def test_case():\n    pass")
+
+    original_dir = os.getcwd()
+    os.chdir(temp_dir)
+
+    try:
+        with patch(
+            "backend.services.submissions.submissions_dir",
+            str(temp_dir / "es_files" / "submissions"),
+        ):
+            first = submission_svc.package_submission("A1", question_number)
+
+            with patch.object(
+                ZipFile, "write", side_effect=ZipFile.write, autospec=True
+            ) as mock_write:
+                second = submission_svc.package_submission("B2", question_number)
+                # Only the submission is added, the base archive comes from memory
+                assert mock_write.call_count == 0
+
+            with ZipFile(BytesIO(base64.b64decode(second)), "r") as zip_file:
+                assert sorted(zip_file.namelist()) == [
+                    "submission.py",
+                    "test_cases.py",
+                    "util.py",
+                ]
+                assert zip_file.read("submission.py") == (
+                    b"def solve_q1_B2(): return 'B2 solution for q1'"
+                )
+            assert first != second
+
+            # Editing the tests rebuilds the base archive
+            test_file.write_text("def test_case():\n    assert False\n")
+            third = submission_svc.package_submission("B2", question_number)
+            with ZipFile(BytesIO(base64.b64decode(third)), "r") as zip_file:
+                assert b"assert False" in zip_file.read("test_cases.py")
+    finally:
+        os.chdir(original_dir)
+
+
 def test_package_submission_nonexistent_team(setup_submission_data, submission_svc):
     """Test that package_submission raises ResourceNotFoundException for non-existent team"""
     temp_dir = setup_submission_data()
@@ -322,45 +396,29 @@ def test_package_submission_nonexistent_team(setup_submission_data, submission_s
 
 
 def test_send_to_judge0(submission_svc):
-    """Test that send_to_judge0 correctly sends submission to judge0 API"""
+    """Test that send_to_judge0 runs the submission through the Judge0 client"""
     mock_submission_zip = base64.b64encode(b"test zip content")
 
-    # Mock successful response from judge0
-    mock_response = MagicMock()
-    mock_response.status_code = 201
-    mock_response.json.return_value = {
-        "stdout": json.dumps(
-            {
-                "tests": [
-                    {
-                        "name": "Test 1",
-                        "status": "passed",
-                        "score": 10,
-                        "max_score": 10,
-                    },
-                    {
-                        "name": "Test 2",
-                        "status": "failed",
-                        "score": 0,
-                        "max_score": 10,
-                        "output": "Error message",
-                    },
-                ]
-            }
-        )
-    }
+    mock_tests = [
+        {
+            "name": "Test 1",
+            "status": "passed",
+            "score": 10,
+            "max_score": 10,
+        },
+        {
+            "name": "Test 2",
+            "status": "failed",
+            "score": 0,
+            "max_score": 10,
+            "output": "Error message",
+        },
+    ]
 
-    with patch("requests.post", return_value=mock_response) as mock_post:
-        result = submission_svc.send_to_judge0(mock_submission_zip)
+    with patch.object(Judge0Service, "run", return_value=mock_tests) as mock_run:
+        result = asyncio.run(submission_svc.send_to_judge0(mock_submission_zip))
 
-        mock_post.assert_called_once_with(
-            "http://host.docker.internal:2358/submissions?wait=true",
-            headers={"Content-Type": "application/json"},
-            json={
-                "additional_files": mock_submission_zip.decode("utf-8"),
-                "language_id": 89,
-            },
-        )
+        mock_run.assert_called_once_with(mock_submission_zip)
 
         assert len(result) == 2
         assert result[0]["name"] == "Test 1"
@@ -370,51 +428,100 @@ def test_send_to_judge0(submission_svc):
 
 
 def test_get_max_points(setup_submission_data, submission_svc):
-    """Test that get_max_points correctly calculates total weight from test cases"""
+    """Test that get_max_points adds up the weights of the graded test cases without reading them again"""
     temp_dir = setup_submission_data()
     question_num = 1
 
     q_dir = temp_dir / "es_files" / "questions" / f"q{question_num}"
     q_dir.mkdir(parents=True, exist_ok=True)
     test_cases_content = """
-def test_case1():
-    '''Test case 1'''
-    @weight(5.0)
-    assert True
+import unittest
+from autograder_utils.decorators import weight, partial_credit
+
 
-def test_case2():
-    '''Test case 2'''
-    @weight(10.0)
-    assert True
-    """
+class TestCases(unittest.TestCase):
+    @weight(5.0)
+    def test_case1(self):
+        '''Test case 1'''
+        self.assertTrue(True)
+
+    @partial_credit(10)
+    def test_case2(self, set_score=None):
+        '''Test case 2 is not @weight(100)'''
+        set_score(10)
+
+    # @weight(20.0)
+    def test_case3(self):
+        '''Test case 3 is not worth anything'''
+        self.assertTrue(True)
+"""
     (q_dir / "test_cases.py").write_text(test_cases_content)
+    (temp_dir / "backend" / "autograder_utils").mkdir(parents=True, exist_ok=True)
 
     original_dir = os.getcwd()
     os.chdir(temp_dir)
 
     try:
-        with patch("os.path.join", side_effect=os.path.join), patch(
-            "os.path.exists", return_value=True
-        ), patch("builtins.open", mock_open(read_data=test_cases_content)):
+        assert submission_svc.get_max_points(question_num) == 15.0
+
+        with patch("builtins.open", side_effect=Exception("Should not be called")):
+            assert submission_svc.get_max_points(question_num) == 15.0
+
+        # Tests edited by hand are graded and counted the same way
+        (q_dir / "test_cases.py").write_text(
+            test_cases_content.replace("@weight(5.0)", "@weight(7.25)")
+        )
+        assert submission_svc.get_max_points(question_num) == 17.25
+    finally:
+        os.chdir(original_dir)
+
 
-            max_points = submission_svc.get_max_points(question_num)
+def test_get_max_points_missing_file(setup_submission_data, submission_svc):
+    """Test that get_max_points raises ResourceNotFoundException without a test_cases.py"""
+    temp_dir = setup_submission_data()
+    (temp_dir / "es_files" / "questions" / "q1").mkdir(parents=True, exist_ok=True)
 
-            assert max_points == 15.0
+    original_dir = os.getcwd()
+    os.chdir(temp_dir)
 
-            with patch("builtins.open", side_effect=Exception("Should not be called")):
-                cached_points = submission_svc.get_max_points(question_num)
-                assert cached_points == 15.0
+    try:
+        with pytest.raises(ResourceNotFoundException):
+            submission_svc.get_max_points(1)
     finally:
         os.chdir(original_dir)
 
 
-def test_grade_submission(submission_svc):
+@pytest.fixture()
+def fake_package(submission_svc):
+    """Patches packaging so a submission can be run without any files or teams"""
+    record = SubmissionRecord(
+        team_id=1, question_num=1, content="code", content_hash="code hash"
+    )
+    with patch.object(
+        submission_svc, "get_test_package", return_value=(b"", "test hash")
+    ), patch.object(
+        submission_svc, "get_latest_submission", return_value=record
+    ), patch.object(
+        submission_svc, "append_submission", return_value=b"zip_content"
+    ):
+        yield record
+
+
+def test_grade_submission(submission_svc, fake_package):
     """Test grade_submission functionality"""
     team_name = "A1"
     question_num = 1
 
     mock_test_results = [
-        {"name": "Test 1", "status": "passed", "score": 5.0, "max_score": 5.0},
+        {
+            "name": "Test 1",
+            "status": "passed",
+            "score": 5.0,
+            "max_score": 5.0,
+            "wall_time": 0.25,
+            "cpu_time": 0.2,
+            "peak_rss_kb": 20480,
+        },
         {
             "name": "Test 2",
             "status": "failed",
@@ -425,14 +532,10 @@ def test_grade_submission(submission_svc):
     ]
 
     with patch.object(
-        submission_svc, "package_submission", return_value=b"zip_content"
-    ), patch.object(
         submission_svc, "send_to_judge0", return_value=mock_test_results
-    ), patch.object(
-        submission_svc, "get_max_points", return_value=15.0
-    ):
+    ), patch.object(submission_svc, "get_max_points", return_value=15.0):
 
-        result = submission_svc.grade_submission(question_num, team_name)
+        result = asyncio.run(submission_svc.grade_submission(question_num, team_name))
 
         assert len(result) == 2
         assert isinstance(result[0], ScoredTest)
@@ -440,11 +543,14 @@ def test_grade_submission(submission_svc):
         assert result[0].score == 5.0
         assert result[0].max_score == 5.0
         assert result[0].console_log == "Passed"
+        assert (result[0].wall_time, result[0].cpu_time) == (0.25, 0.2)
+        assert result[0].peak_rss_kb == 20480
 
         assert result[1].test_name == "Test 2"
         assert result[1].score == 0.0
         assert result[1].max_score == 10.0
         assert result[1].console_log == "Failed assertion"
+        assert result[1].wall_time is None
 
 
 def test_grade_submission_resource_not_found(submission_svc):
@@ -454,19 +560,20 @@ def test_grade_submission_resource_not_found(submission_svc):
 
     with patch.object(
         submission_svc,
-        "package_submission",
+        "get_test_package",
         side_effect=ResourceNotFoundException("Test not found"),
     ), patch.object(submission_svc, "get_max_points", return_value=15.0):
 
-        result = submission_svc.grade_submission(question_num, team_name)
+        result = asyncio.run(submission_svc.grade_submission(question_num, team_name))
 
         assert len(result) == 1
         assert result[0].score == 0.0
         assert result[0].max_score == 15.0
+        assert result[0].error == "Test not found"
         assert "Failed to Run Grader: Test not found" in result[0].console_log
 
 
-def test_run_submission(submission_svc):
+def test_run_submission(submission_svc, fake_package):
     """Test run_submission functionality"""
     team_name = "A1"
     question_num = 1
@@ -477,14 +584,10 @@ def test_run_submission(submission_svc):
     ]
 
     with patch.object(
-        submission_svc, "package_submission", return_value=b"zip_content"
-    ), patch.object(
         submission_svc, "send_to_judge0", return_value=mock_test_results
-    ), patch(
-        "builtins.print"
-    ):
+    ), patch("builtins.print"):
 
-        result = submission_svc.run_submission(question_num, team_name)
+        result = asyncio.run(submission_svc.run_submission(question_num, team_name))
 
         assert isinstance(result, ConsoleLog)
         assert (
@@ -498,10 +601,12 @@ def test_run_submission(submission_svc):
         assert '"message": "Assertion Error"' in result.console_log
 
 
-def test_submit(setup_submission_data, submission_svc):
+def test_submit(setup_submission_data, submission_svc, session):
     """Test submit functionality"""
     temp_dir = setup_submission_data()
-    team_name = "new_team"
+    team = Team(name="new_team", password="a-b-c")
+    session.add(team)
+    session.commit()
     question_num = 1
     file_contents = "def solution():\n    return 'new solution'"
 
@@ -513,18 +618,21 @@ def test_submit(setup_submission_data, submission_svc):
     os.chdir(temp_dir)
 
     try:
-        submissions_dir = temp_dir / "es_files" / "submissions" / f"q{question_num}"
-        submissions_dir.mkdir(parents=True, exist_ok=True)
-
         with patch(
             "backend.services.submissions.submissions_dir",
             str(temp_dir / "es_files" / "submissions"),
         ):
 
-            submission_svc.submit(team_name, submission)
+            submission_svc.submit(team, submission)
 
+            # The submission is stored in the database...
+            record = submission_svc.get_latest_submission("new_team", question_num)
+            assert record.content == file_contents
+            assert record.content_hash == SubmissionService.hash_content(file_contents)
+
+            # ...and mirrored to the submission folder
             submission_path = os.path.join(
-                "es_files", "submissions", f"q{question_num}", f"{team_name}.py"
+                "es_files", "submissions", f"q{question_num}", f"{team.name}.py"
             )
             assert os.path.exists(submission_path)
 
@@ -535,6 +643,32 @@ def test_submit(setup_submission_data, submission_svc):
         os.chdir(original_dir)
 
 
+def test_submit_keeps_history(setup_submission_data, submission_svc, session):
+    """Test that resubmitting adds a new record and the latest one is used"""
+    temp_dir = setup_submission_data()
+    team = session.exec(select(Team).where(Team.name == "A1")).one()
+
+    with patch(
+        "backend.services.submissions.submissions_dir",
+        str(temp_dir / "es_files" / "submissions"),
+    ):
+        submission_svc.submit(
+            team, Submission(question_num="1", file_contents="def v2(): pass")
+        )
+
+    history = submission_svc.get_submission_history("A1", 1)
+    assert [record.content for record in history] == [
+        "def solve_q1_A1(): return 'A1 solution for q1'",
+        "def v2(): pass",
+    ]
+    assert submission_svc.get_team_submissions("A1")[1] == "def v2(): pass"
+    assert submission_svc.get_all_submissions()["A1"][1] == "def v2(): pass"
+    assert submission_svc.get_latest_hashes()[(team.id, 1)] == (
+        history[-1].id,
+        SubmissionService.hash_content("def v2(): pass"),
+    )
+
+
 def test_submit_and_run(submission_svc):
     """Test submit_and_run functionality"""
     team_name = "test_team"
@@ -553,8 +687,222 @@ def test_submit_and_run(submission_svc):
         submission_svc, "run_submission", return_value=mock_console_log
     ) as mock_run:
 
-        result = submission_svc.submit_and_run(team, submission)
+        result = asyncio.run(submission_svc.submit_and_run(team, submission))
 
-        mock_submit.assert_called_once_with(team_name, submission)
+        mock_submit.assert_called_once_with(team, submission)
         mock_run.assert_called_once_with(question_num, team_name)
         assert result.console_log == expected_console_log
+
+
+def test_database_work_runs_off_event_loop(submission_svc, fake_package):
+    """Test that submitting and reading the submission to run never block the event loop"""
+    loop_threads = set()
+    db_threads = []
+
+    async def submit_and_run():
+        loop_threads.add(threading.get_ident())
+        return await submission_svc.submit_and_run(
+            Team(id=1, name="A1"), Submission(question_num="1", file_contents="code")
+        )
+
+    def record_thread(*args):
+        db_threads.append(threading.get_ident())
+        return fake_package
+
+    with patch.object(
+        submission_svc, "submit", side_effect=record_thread
+    ), patch.object(
+        submission_svc, "get_latest_submission", side_effect=record_thread
+    ), patch.object(
+        submission_svc, "send_to_judge0", return_value=[]
+    ), patch(
+        "builtins.print"
+    ):
+        asyncio.run(submit_and_run())
+
+    assert len(db_threads) == 2
+    assert not loop_threads & set(db_threads)
+
+
+def test_run_submission_uses_result_cache(submission_svc, fake_package):
+    """Test that running identical code against identical tests only reaches Judge0 once"""
+    mock_test_results = [{"name": "Test 1", "status": "passed"}]
+
+    with patch.object(
+        submission_svc, "send_to_judge0", return_value=mock_test_results
+    ) as mock_send, patch("builtins.print"):
+        first = asyncio.run(submission_svc.run_submission(1, "A1"))
+        second = asyncio.run(submission_svc.run_submission(1, "A1"))
+
+        assert mock_send.call_count == 1
+        assert first.console_log == second.console_log
+
+
+def test_grade_submission_reruns_changed_code(submission_svc, fake_package):
+    """Test that changed code is sent to Judge0 instead of using stored results"""
+    mock_test_results = [
+        {"name": "Test 1", "status": "passed", "score": 5.0, "max_score": 5.0}
+    ]
+
+    with patch.object(
+        submission_svc, "send_to_judge0", return_value=mock_test_results
+    ) as mock_send:
+        asyncio.run(submission_svc.grade_submission(1, "A1"))
+        fake_package.content_hash = "changed hash"
+        asyncio.run(submission_svc.grade_submission(1, "A1"))
+
+        assert mock_send.call_count == 2
+
+
+def test_fingerprint(setup_submission_data, submission_svc):
+    """Test that the fingerprint changes with the submitted code and with the tests"""
+    temp_dir = setup_submission_data()
+
+    utils_dir = temp_dir / "backend" / "autograder_utils"
+    utils_dir.mkdir(parents=True, exist_ok=True)
+    (utils_dir / "util.py").write_text("def helper():\n    pass")
+
+    original_dir = os.getcwd()
+    os.chdir(temp_dir)
+
+    try:
+        # Without tests the fingerprint still depends on the code
+        missing_tests = submission_svc.fingerprint(1, "a")
+        assert missing_tests != submission_svc.fingerprint(1, "b")
+
+        q_dir = temp_dir / "es_files" / "questions" / "q1"
+        q_dir.mkdir(parents=True, exist_ok=True)
+        test_file = q_dir / "test_cases.py"
+        test_file.write_text("def test_case():\n    pass")
+
+        first = submission_svc.fingerprint(1, "a")
+        assert first != missing_tests
+        assert submission_svc.fingerprint(1, "a") == first
+        assert submission_svc.fingerprint(1, "b") != first
+        assert submission_svc.fingerprint(1, None) != first
+
+        test_file.write_text("def test_case():\n    assert False\n")
+        assert submission_svc.fingerprint(1, "a") != first
+    finally:
+        os.chdir(original_dir)
+
+
+def test_package_submission_is_deterministic(
+    setup_submission_data, submission_svc, session
+):
+    """Test that resubmitting identical code produces an identical package"""
+    temp_dir = setup_submission_data()
+    team = session.exec(select(Team).where(Team.name == "A1")).one()
+
+    utils_dir = temp_dir / "backend" / "autograder_utils"
+    utils_dir.mkdir(parents=True, exist_ok=True)
+    (utils_dir / "util.py").write_text("def helper():\n    pass")
+
+    q_dir = temp_dir / "es_files" / "questions" / "q1"
+    q_dir.mkdir(parents=True, exist_ok=True)
+    (q_dir / "test_cases.py").write_text("def test_case():\n    pass")
+
+    original_dir = os.getcwd()
+    os.chdir(temp_dir)
+
+    try:
+        with patch(
+            "backend.services.submissions.submissions_dir",
+            str(temp_dir / "es_files" / "submissions"),
+        ):
+            first = submission_svc.package_submission("A1", 1)
+
+            content = submission_svc.get_latest_submission("A1", 1).content
+            submission_svc.submit(
+                team, Submission(question_num="1", file_contents=content)
+            )
+            assert submission_svc.package_submission("A1", 1) == first
+
+            submission_svc.submit(
+                team,
+                Submission(
+                    question_num="1",
+                    file_contents="def solve_q1_A1(): return 'changed'",
+                ),
+            )
+            assert submission_svc.package_submission("A1", 1) != first
+    finally:
+        os.chdir(original_dir)
+
+
+def test_stream_zip(setup_submission_data, submission_svc, session):
+    """Test that the exported zip holds every team's latest submission as q{n}/{team}.py"""
+    temp_dir = setup_submission_data()
+    team = session.exec(select(Team).where(Team.name == "A1")).one()
+    with patch(
+        "backend.services.submissions.submissions_dir",
+        str(temp_dir / "es_files" / "submissions"),
+    ):
+        submission_svc.submit(
+            team, Submission(question_num="1", file_contents="def v2(): pass")
+        )
+
+    chunks = list(submission_svc.stream_zip())
+    # A chunk is produced per submission rather than one at the end
+    assert len(chunks) == 7
+
+    with ZipFile(BytesIO(b"".join(chunks)), "r") as zip_file:
+        assert zip_file.namelist() == [
+            "q1/A1.py",
+            "q1/B2.py",
+            "q2/A1.py",
+            "q2/C3.py",
+            "q3/B2.py",
+            "q3/C3.py",
+        ]
+        assert zip_file.read("q1/A1.py") == b"def v2(): pass"
+        assert zip_file.testzip() is None
+
+
+def test_export_endpoint(setup_submission_data, session, test_engine, monkeypatch):
+    """Test that the export route streams on its own session and gives its connection back"""
+    from fastapi.testclient import TestClient
+    from backend.db import db_session
+
+    setup_submission_data()
+    # The app serves ./frontend, so it is imported from the repository root
+    monkeypatch.chdir(Path(__file__).parents[2])
+    from backend.main import app
+
+    def request_session():
+        # Like db_session, closed as soon as the route returns its response
+        with Session(test_engine) as request_session:
+            yield request_session
+
+    app.dependency_overrides[db_session] = request_session
+    try:
+        response = TestClient(app).get("/api/submissions/export?format=ndjson")
+    finally:
+        app.dependency_overrides.pop(db_session)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["question_num"], line["team"]) for line in lines] == [
+        (1, "A1"),
+        (1, "B2"),
+        (2, "A1"),
+        (2, "C3"),
+        (3, "B2"),
+        (3, "C3"),
+    ]
+    assert test_engine.pool.checkedout() == 0
+
+
+def test_stream_ndjson(setup_submission_data, submission_svc):
+    """Test that the NDJSON export has one submission per line"""
+    setup_submission_data()
+
+    lines = list(submission_svc.stream_ndjson())
+
+    assert len(lines) == 6
+    assert all(line.endswith("\n") for line in lines)
+    assert json.loads(lines[0]) == {
+        "team": "A1",
+        "question_num": 1,
+        "content": "def solve_q1_A1(): return 'A1 solution for q1'",
+    }
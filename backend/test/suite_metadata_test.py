@@ -0,0 +1,130 @@
+"""File to contain all SuiteMetadataService related tests"""
+
+import pytest
+
+from unittest.mock import patch
+
+from backend.services.problem_store import ProblemStore
+from backend.services.suite_metadata import CaseMetadata, SuiteMetadataService
+
+__authors__ = ["Andrew Lockard"]
+
+TEST_CASES = '''
+import unittest
+from autograder_utils.decorators import weight, partial_credit, visibility, tags, number, timeout
+from autograder_utils import decorators
+
+
+def helper():
+    """Not a test"""
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.value = 1
+
+    @weight(2)
+    @visibility("hidden")
+    @tags("loops", "strings")
+    @number("1.1")
+    @timeout(3)
+    def test_first(self):
+        """First test
+
+        More detail that is not part of the name
+        """
+
+    @partial_credit(3.5)
+    def test_partial(self, set_score=None):
+        pass
+
+    @weight(4)
+    @decorators.weight(1)
+    def test_outer_weight_wins(self):
+        """Outer weight"""
+
+
+@timeout(5)
+class SlowTestCases(unittest.TestCase):
+    def test_slow(self):
+        """Slow"""
+
+    @timeout(1)
+    def test_own_timeout(self):
+        """Own timeout"""
+
+
+class NotATestCase:
+    @weight(100)
+    def test_ignored(self):
+        pass
+'''
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    SuiteMetadataService.clear()
+    ProblemStore.invalidate()
+    yield
+    SuiteMetadataService.clear()
+    ProblemStore.invalidate()
+
+
+def test_parse():
+    """Every decorator of every test is read, in the order the tests are defined"""
+    suite = SuiteMetadataService.parse(TEST_CASES)
+
+    assert suite.tests == (
+        CaseMetadata(
+            name="First test",
+            method="test_first",
+            weight=2.0,
+            visibility="hidden",
+            tags=("loops", "strings"),
+            number="1.1",
+            timeout=3.0,
+        ),
+        CaseMetadata(
+            name="test_partial (test_cases.TestCases.test_partial)",
+            method="test_partial",
+            weight=3.5,
+            partial_credit=True,
+        ),
+        CaseMetadata(name="Outer weight", method="test_outer_weight_wins", weight=4.0),
+        CaseMetadata(name="Slow", method="test_slow", weight=0.0, timeout=5.0),
+        CaseMetadata(
+            name="Own timeout", method="test_own_timeout", weight=0.0, timeout=1.0
+        ),
+    )
+    assert suite.max_points == 9.5
+
+
+def test_parse_is_cached():
+    """An unchanged source is only parsed once"""
+    first = SuiteMetadataService.parse(TEST_CASES)
+
+    with patch("ast.parse", side_effect=AssertionError("parsed again")):
+        assert SuiteMetadataService.parse(TEST_CASES) is first
+
+    changed = SuiteMetadataService.parse(
+        TEST_CASES.replace("@weight(2)", "@weight(3)")
+    )
+    assert changed.max_points == 10.5
+
+
+def test_get(tmp_path, monkeypatch):
+    """Test and demo cases are read from the problem store"""
+    questions_dir = tmp_path / "es_files" / "questions"
+    (questions_dir / "q1").mkdir(parents=True)
+    (questions_dir / "q1" / "test_cases.py").write_text(TEST_CASES)
+    (questions_dir / "q1" / "demo_cases.py").write_text(
+        TEST_CASES.replace("TestCases", "DemoCases")
+    )
+    monkeypatch.chdir(tmp_path)
+
+    assert SuiteMetadataService.get(1).max_points == 9.5
+    demo = SuiteMetadataService.get(1, demo=True)
+    assert demo.tests[1].name == "test_partial (demo_cases.DemoCases.test_partial)"
+
+    with pytest.raises(FileNotFoundError):
+        SuiteMetadataService.get(2)
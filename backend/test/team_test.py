@@ -1,7 +1,7 @@
 """File to contain all Team and TeamMember related tests"""
 
 from datetime import datetime, timedelta
-from backend.models import Team, TeamMember
+from backend.models import Team, TeamMember, Word
 import polars as pl
 import select
 from ..db import db_session
@@ -18,6 +18,8 @@ import pytest
 from backend.test.fixtures import team_svc
 from backend.test.fake_data.team import fake_team_fixture
 from backend.test.fake_data.team_members import fake_team_members_fixture
+from backend.test.fake_data.session_obj import fake_session_fixture
+from sqlalchemy import event
 
 # TODO: Test table reading and exporting functions
 
@@ -195,6 +197,58 @@ def test_get_team_with_credentials_incorrect(team_svc, fake_team_fixture):
         team_svc.get_team_with_credentials("B1", "password")
 
 
+def test_get_teams_with_members(
+    team_svc, session, fake_team_fixture, fake_team_members_fixture, fake_session_fixture
+):
+    """Test that teams are listed with their members and session in a constant number of queries"""
+    fake_session_fixture()
+    fake_team_fixture()
+    fake_team_members_fixture()
+    session.expunge_all()
+
+    statements = []
+    engine = session.get_bind()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        teams = team_svc.get_teams_with_members()
+        members = {team.name: len(team.members) for team in teams}
+        sessions = {team.name: team.session and team.session.name for team in teams}
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 3
+    assert members == {"B1": 3, "B2": 2, "B3": 0, "B4": 0}
+    assert sessions == {
+        "B1": "Session 1",
+        "B2": "Session 2",
+        "B3": None,
+        "B4": "Session 3",
+    }
+
+
+def test_get_teams_with_members_filter_and_page(team_svc, fake_team_fixture):
+    """Test filtering the listed teams by session and paging through them"""
+    fake_team_fixture()
+
+    assert [team.name for team in team_svc.get_teams_with_members(session_id=2)] == [
+        "B2"
+    ]
+    assert [
+        team.name for team in team_svc.get_teams_with_members(offset=1, limit=2)
+    ] == ["B2", "B3"]
+
+
+def test_get_team_with_credentials_unknown_team(team_svc, fake_team_fixture):
+    """Test getting a team that does not exist with credentials"""
+    fake_team_fixture()
+    with pytest.raises(InvalidCredentialsException):
+        team_svc.get_team_with_credentials("Z9", "a-b-c")
+
+
 def test_delete_all_teams_basic(team_svc, fake_team_fixture):
     """Test deleting all teams in the database"""
     fake_team_fixture()
@@ -272,6 +326,24 @@ def test_teams_to_df_basic(team_svc, fake_team_fixture):
     assert "End Time" in df.columns
 
 
+def test_teams_to_df_format(team_svc):
+    """Test that times are formatted and missing times are left blank"""
+    teams = [
+        TeamData(
+            name="C4",
+            password="a-b-c",
+            session_id=None,
+            start_time=datetime(2025, 3, 1, 9, 30),
+        ),
+        TeamData(name="C5", password="d-e-f", session_id=2),
+    ]
+    df = team_svc.teams_to_df(teams)
+    assert df["Start Time"].to_list() == ["03/01/2025 09:30", ""]
+    assert df["End Time"].to_list() == ["", ""]
+    assert df["Session ID"].to_list() == [None, 2]
+    assert team_svc.teams_to_df([]).is_empty()
+
+
 def test_create_team_team_data(team_svc, fake_team_fixture):
     """Test creating a team from TeamData"""
     fake_team_fixture()
@@ -350,12 +422,11 @@ def test_create_batch_teams_basic(team_svc, fake_team_fixture, monkeypatch):
         session_id=None
     )
     
-    # Mock the generate_password method to avoid the issue with reset_word_list
-    def mock_generate_password(self):
-        return "mocked-password-1"
+    # Mock the password generation so no word list is needed
+    def mock_generate_passwords(self, count):
+        return ["mocked-password-1"] * count
     
-    # Apply the mock to avoid the problematic code path
-    monkeypatch.setattr(team_svc._pwd_svc.__class__, "generate_password", mock_generate_password)
+    monkeypatch.setattr(team_svc._pwd_svc.__class__, "generate_passwords", mock_generate_passwords)
     
     batch_size = 3
     teams = team_svc.create_batch_teams("Batch", batch_size, template)
@@ -399,12 +470,11 @@ def test_create_batch_teams_with_session(team_svc, fake_team_fixture, monkeypatc
     """Test creating a batch of teams assigned to a session"""
     fake_team_fixture()
     
-    # Mock the generate_password method to avoid the issue with reset_word_list
-    def mock_generate_password(self):
-        return "mocked-password-2"
+    # Mock the password generation so no word list is needed
+    def mock_generate_passwords(self, count):
+        return ["mocked-password-2"] * count
     
-    # Apply the mock to avoid the problematic code path
-    monkeypatch.setattr(team_svc._pwd_svc.__class__, "generate_password", mock_generate_password)
+    monkeypatch.setattr(team_svc._pwd_svc.__class__, "generate_passwords", mock_generate_passwords)
     
     # Create a template with session_id
     template = TeamData(
@@ -434,6 +504,47 @@ def test_create_batch_teams_with_session(team_svc, fake_team_fixture, monkeypatc
         assert team.session_id == 1
 
 
+def test_create_batch_teams_bulk(team_svc, fake_team_fixture, session):
+    """Test that batch creation skips existing names and spends unique password words"""
+    fake_team_fixture()
+    session.add_all(Word(word=f"word{i}") for i in range(9))
+    session.commit()
+
+    template = TeamData(
+        name="Template",
+        start_time=datetime.now(),
+        end_time=datetime.now() + timedelta(hours=1),
+        password="",
+        session_id=None,
+    )
+    teams = team_svc.create_batch_teams(["B1", "C1", "C2", "C3"], template)
+
+    assert [team.name for team in teams] == ["C1", "C2", "C3"]
+    for team in teams:
+        assert team_svc.get_team(team.id).password == team.password
+
+    words = [word for team in teams for word in team.password.split("-")]
+    assert len(set(words)) == 9
+    assert len(session.exec(select(Word).where(Word.used == True)).all()) == 9
+
+
+def test_create_batch_teams_prefix_continues_numbering(
+    team_svc, fake_team_fixture, monkeypatch
+):
+    """Test that prefixed batches continue after the highest existing number"""
+    fake_team_fixture()
+    monkeypatch.setattr(
+        team_svc._pwd_svc.__class__,
+        "generate_passwords",
+        lambda self, count: ["a-b-c"] * count,
+    )
+    template = TeamData(name="Template", password="", session_id=None)
+
+    teams = team_svc.create_batch_teams("B", 2, template)
+
+    assert [team.name for team in teams] == ["B5", "B6"]
+
+
 def test_delete_team_by_id(team_svc, fake_team_fixture):
     """Test deleting a team by ID"""
     fake_team_fixture()
@@ -523,6 +634,53 @@ def test_delete_team_removes_members(team_svc, fake_team_fixture, fake_team_memb
     assert session.get(Team, team.id) is None
 
 
+def test_teams_to_db_deletes_removed_teams_submissions(session, test_engine, tmp_path, monkeypatch):
+    """Test that teams missing from the CSV lose their submissions and graded results too"""
+    from backend.script import teams_to_db
+    from backend.models import SubmissionRecord, SubmissionResult
+
+    for name in ("kept", "removed"):
+        team = Team(name=name, password=f"{name}-pass")
+        session.add(team)
+        session.commit()
+        record = SubmissionRecord(
+            team_id=team.id, question_num=1, content="code", content_hash="hash"
+        )
+        session.add(record)
+        session.commit()
+        session.add(
+            SubmissionResult(
+                team_id=team.id,
+                submission_id=record.id,
+                fingerprint="fingerprint",
+                console_log="Passed",
+                test_name="Test 1",
+                question_num=1,
+                score=1.0,
+                max_score=1.0,
+            )
+        )
+        session.commit()
+    removed_id = team.id
+
+    csv = tmp_path / "teams.csv"
+    csv.write_text(
+        "Team Number,Password,Start Time,End Time\n"
+        "kept,kept-pass,01/01/2025 09:00,01/01/2025 12:00\n"
+    )
+    monkeypatch.setattr(teams_to_db, "engine", test_engine)
+    monkeypatch.setattr("sys.argv", ["teams_to_db", "-f", str(csv)])
+
+    teams_to_db.teams_to_db()
+    session.expire_all()
+
+    assert [team.name for team in session.exec(select(Team)).all()] == ["kept"]
+    for model in (SubmissionRecord, SubmissionResult):
+        rows = session.exec(select(model)).all()
+        assert len(rows) == 1
+        assert removed_id not in {row.team_id for row in rows}
+
+
 def test_get_all_teams_implementation(team_svc, fake_team_fixture):
     """Test that get_all_teams returns the correct team objects"""
     fake_team_fixture()
@@ -25,12 +25,6 @@ interface Submissions {
   [problemNum: string]: string;
 }
 
-interface AllSubmissions {
-  [teamName: string]: {
-    [taskId: string]: string;
-  };
-}
-
 export default function GetTeamSubmissionWidget({
   teamNames,
 }: {
@@ -139,27 +133,15 @@ export default function GetTeamSubmissionWidget({
 
   const fetchAndDownloadAllSubmissions = async () => {
     try {
-      const response = await fetch("/api/submissions/all", {
+      const response = await fetch("/api/submissions/export", {
         method: "GET",
         headers: {
-          "Content-Type": "application/json",
           Authorization: `Bearer ${localStorage.getItem("token")}`,
         },
       });
 
-      const data: AllSubmissions = (await response.json()) as AllSubmissions;
-      const zip = new JSZip();
-
-      Object.entries(data).forEach(([teamName, submissions]) => {
-        const teamFolder = zip.folder(teamName);
-        Object.entries(submissions as Record<string, string>).forEach(
-          ([problemNum, code]) => {
-            teamFolder?.file(`problem_${problemNum}.py`, code);
-          }
-        );
-      });
-
-      const content = await zip.generateAsync({ type: "blob" });
+      if (!response.ok) throw new Error("Failed to export submissions");
+      const content = await response.blob();
       saveAs(content, "all_submissions.zip");
     } catch (error) {
       console.error("Download error:", error);
@@ -8,3 +8,14 @@ export interface Session {
   end_time: string;
   teams: number[];
 }
+
+export interface SessionWindow {
+  /**
+   * Represents the logged in team's testing window as seen by the server's clock
+   */
+  start_time: string;
+  end_time: string;
+  now: string;
+  active: boolean;
+  seconds_remaining: number;
+}
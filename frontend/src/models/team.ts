@@ -20,11 +20,33 @@ export interface TeamMember {
   id: number;
 }
 
+export interface TeamWithMembers extends Team {
+  /**
+   * Represents a team listed together with its members
+   */
+  members: TeamMember[];
+}
+
 export interface TeamScore {
   /**
    * Represents a team's score in a competition.
    */
+  Rank: number;
   "Team Number": string;
   Score: number;
   "Max Score": number;
+  "Question Scores": Record<string, number>;
+  "Last Updated": string;
+}
+
+export interface GradingJob {
+  /**
+   * Represents a background regrade started by the event supervisor
+   */
+  id: number;
+  status: "queued" | "running" | "finished" | "failed";
+  completed: number;
+  total: number;
+  regraded: number | null;
+  error: string | null;
 }
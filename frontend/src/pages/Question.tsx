@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import SubmissionWidget from "../components/SubmissionWidget";
 import { QuestionsPublic, Question, Document } from "../models/questions";
+import { SessionWindow } from "../models/session";
 import LeftSideBar from "../components/LeftSideBar";
 import Markdown from "react-markdown";
 import remarkGfm from "remark-gfm";
@@ -29,47 +30,30 @@ const QuestionPage = () => {
 
     const init = async () => {
       const token = localStorage.getItem("token") ?? "";
-      const nowRes = await fetch("/api/now", {
+      // Fetch how much testing time is left, measured by the server's clock
+      const windowRes = await fetch("/api/auth/window", {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
         },
       });
-      if (!nowRes.ok) {
-        console.error("Failed to fetch server time");
-        navigate("/login");
+      if (windowRes.status === 401 || windowRes.status === 403) {
+        handleUnauthorized(windowRes.status);
         return;
       }
-      const { now } = await nowRes.json(); // { now: "2025-04-16T18:30:00.000Z" }
-      const serverMs = new Date(now).getTime();
-
-      // 1b) fetch team/session info
-      const teamRes = await fetch("/api/team", {
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${token}`,
-        },
-      });
-      if (teamRes.status === 401 || teamRes.status === 403) {
-        handleUnauthorized(teamRes.status);
-        return;
-      }
-      if (!teamRes.ok) {
-        console.error("Could not load team info");
+      if (!windowRes.ok) {
+        console.error("Could not load testing window");
         navigate("/thank-you");
         return;
       }
-      const teamData = (await teamRes.json()) as {
-        session: { end_time: string };
-      };
-      const endMs = new Date(teamData.session.end_time).getTime();
+      const testWindow = (await windowRes.json()) as SessionWindow;
 
-      if (serverMs > endMs) {
+      if (!testWindow.active) {
         navigate("/thank-you");
         return;
       }
 
-      const msUntilEnd = endMs - serverMs;
+      const msUntilEnd = testWindow.seconds_remaining * 1000;
       redirectTimer = setTimeout(() => {
         navigate("/thank-you");
       }, msUntilEnd);
@@ -27,7 +27,12 @@ import {
   TableRow,
 } from "@/components/ui/table";
 
-import { Team, TeamMember, TeamScore } from "@/models/team";
+import {
+  GradingJob,
+  Team,
+  TeamScore,
+  TeamWithMembers,
+} from "@/models/team";
 
 import { Trash2, Download } from "lucide-react";
 
@@ -51,9 +56,6 @@ export default function TeamManager() {
   const [scores, setScores] = useState<TeamScore[]>([]);
   const [isLoadingTeams, setIsLoadingTeams] = useState(true);
   const [isLoadingScores, setIsLoadingScores] = useState(true);
-  const [loadingMembers, setLoadingMembers] = useState<{
-    [key: number]: boolean;
-  }>({});
 
   const getUserRole = (token: string): boolean => {
     try {
@@ -68,7 +70,8 @@ export default function TeamManager() {
   const fetchTeams = useCallback(async () => {
     setIsLoadingTeams(true);
     try {
-      const response = await fetch("/api/team/all", {
+      // Teams come with their members so the table needs a single request
+      const response = await fetch("/api/team/details", {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
@@ -81,16 +84,17 @@ export default function TeamManager() {
         return;
       }
 
-      const data: Team[] = (await response.json()) as Team[];
+      const data: TeamWithMembers[] =
+        (await response.json()) as TeamWithMembers[];
       setTeams(data);
-
-      // Initialize loading state for each team's members
-      const membersLoadingState: { [key: number]: boolean } = {};
-      data.forEach((team: { id: number }) => {
-        membersLoadingState[team.id] = true;
-        void fetchTeamMembers(team.id);
-      });
-      setLoadingMembers(membersLoadingState);
+      setTeamMembers(
+        Object.fromEntries(
+          data.map((team) => [
+            team.id,
+            team.members.map((m) => `${m.first_name} ${m.last_name}`),
+          ])
+        )
+      );
 
       console.log("Teams:", data);
     } catch (error) {
@@ -142,41 +146,6 @@ export default function TeamManager() {
     }
   };
 
-  const fetchTeamMembers = async (teamId: number) => {
-    try {
-      const response = await fetch(`/api/team/${teamId}/members`, {
-        // Path parameter instead of query
-        method: "GET",
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${localStorage.getItem("token")}`,
-        },
-      });
-
-      if (!response.ok) {
-        console.error(`Failed to fetch members for team ${teamId}`);
-        return;
-      }
-
-      const data: TeamMember[] = (await response.json()) as TeamMember[];
-      setTeamMembers((prev) => ({
-        ...prev,
-        [teamId]: data.map(
-          (m: { first_name: string; last_name: string }) =>
-            `${m.first_name} ${m.last_name}`
-        ),
-      }));
-      console.log(`Team ${teamId} members:`, data);
-    } catch (error) {
-      console.error("Error fetching team members:", error);
-    } finally {
-      setLoadingMembers((prev) => ({
-        ...prev,
-        [teamId]: false,
-      }));
-    }
-  };
-
   // const handleEdit = (teamId: number) => {
   //   // Handle edit team
   //   console.log("Edit team:", teamId);
@@ -227,14 +196,29 @@ export default function TeamManager() {
     void fetchTeams();
   };
 
+  const waitForRegrade = async () => {
+    const headers = {
+      Authorization: `Bearer ${localStorage.getItem("token")}`,
+    };
+    const response = await fetch("/api/score/refresh", {
+      method: "POST",
+      headers,
+    });
+    if (!response.ok) throw new Error("Failed to start grading");
+
+    let job = (await response.json()) as GradingJob;
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const poll = await fetch(`/api/score/jobs/${job.id}`, { headers });
+      if (!poll.ok) throw new Error("Failed to check grading progress");
+      job = (await poll.json()) as GradingJob;
+    }
+    if (job.status === "failed") throw new Error(job.error ?? "Grading failed");
+  };
+
   const handleDownload = async () => {
     try {
-      await fetch("/api/score", {
-        method: "POST",
-        headers: {
-          Authorization: `Bearer ${localStorage.getItem("token")}`,
-        },
-      });
+      await waitForRegrade();
 
       const response = await fetch("/api/score/download", {
         headers: {
@@ -316,9 +300,7 @@ export default function TeamManager() {
                         </TableCell>
                         <TableCell>{team.password}</TableCell>
                         <TableCell>
-                          {loadingMembers[team.id] ? (
-                            <Skeleton className="h-5 w-[250px]" />
-                          ) : teamMembers[team.id]?.length ? (
+                          {teamMembers[team.id]?.length ? (
                             teamMembers[team.id].join(", ")
                           ) : (
                             "No members"